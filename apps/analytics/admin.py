@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import DashboardMetric, ReportTemplate
+from .models import DailyGivingFact, DashboardMetric, MonthlyRevenueRollup, ReportTemplate
 
 
 @admin.register(DashboardMetric)
@@ -15,6 +15,33 @@ class DashboardMetricAdmin(admin.ModelAdmin):
         return False  # Metrics are immutable once calculated
 
 
+@admin.register(MonthlyRevenueRollup)
+class MonthlyRevenueRollupAdmin(admin.ModelAdmin):
+    list_display = ['month', 'type', 'campaign', 'payment_method', 'completed_amount', 'completed_count',
+                    'refunded_amount', 'refunded_count']
+    list_filter = ['type', 'payment_method', 'month']
+    
+    def has_add_permission(self, request):
+        return False  # Rollups are maintained from transactions
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyGivingFact)
+class DailyGivingFactAdmin(admin.ModelAdmin):
+    list_display = ['date', 'contact', 'campaign', 'event', 'type', 'status', 'payment_method',
+                    'amount', 'transaction_count', 'deductible_amount']
+    list_filter = ['type', 'status', 'payment_method', 'date']
+    raw_id_fields = ['contact', 'campaign', 'event']
+    
+    def has_add_permission(self, request):
+        return False  # Facts are maintained from transactions
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(ReportTemplate)
 class ReportTemplateAdmin(admin.ModelAdmin):
     list_display = ['name', 'report_type', 'created_by', 'is_public', 'created_at']
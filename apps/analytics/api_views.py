@@ -0,0 +1,101 @@
+from django.db.models import Count, Q, Sum
+from rest_framework import viewsets
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.contacts.models import Contact, RFMThresholdSet
+from .models import DashboardMetric, ReportTemplate
+from .serializers import DashboardMetricSerializer, ReportTemplateSerializer
+from .services import MetricComputationService, RevenueRollupService
+
+
+class DashboardMetricViewSet(viewsets.ReadOnlyModelViewSet):
+    """Stored metric snapshots, optionally filtered by ``metric_type``"""
+    queryset = DashboardMetric.objects.all()
+    serializer_class = DashboardMetricSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        metric_type = self.request.query_params.get('metric_type')
+        if metric_type:
+            queryset = queryset.filter(metric_type=metric_type)
+        return queryset.order_by('-period_start', 'metric_type')
+
+
+class ReportTemplateViewSet(viewsets.ModelViewSet):
+    """Saved report configurations visible to the current user"""
+    queryset = ReportTemplate.objects.all()
+    serializer_class = ReportTemplateSerializer
+
+    def get_queryset(self):
+        user = self.request.user
+        return super().get_queryset().filter(
+            Q(is_public=True) | Q(created_by=user) | Q(shared_with=user)
+        ).distinct()
+
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user)
+
+
+class DashboardDataAPIView(APIView):
+    """
+    Latest dashboard metric snapshot.
+    GET returns the stored values with their "as of" time; POST recomputes them.
+    """
+
+    def get(self, request):
+        return Response(self.snapshot_data(MetricComputationService.latest_snapshot()))
+
+    def post(self, request):
+        MetricComputationService.compute_all()
+        return Response(self.snapshot_data(MetricComputationService.latest_snapshot()))
+
+    def snapshot_data(self, metrics):
+        return {
+            'as_of': min((metric.calculated_at for metric in metrics.values()), default=None),
+            'metrics': {
+                metric_type: DashboardMetricSerializer(metric).data
+                for metric_type, metric in metrics.items()
+            },
+        }
+
+
+class RFMAnalysisAPIView(APIView):
+    """Donor segment and RFM score distribution with the active thresholds"""
+
+    def get(self, request):
+        donors = Contact.objects.filter(donation_count__gt=0)
+        thresholds = RFMThresholdSet.get_active()
+
+        segments = donors.values('donor_segment').annotate(
+            count=Count('id'),
+            total_giving=Sum('total_lifetime_giving')
+        ).order_by('-total_giving')
+        scores = donors.values('rfm_score').annotate(count=Count('id')).order_by('-rfm_score')
+
+        return Response({
+            'thresholds': {
+                'version': thresholds.pk,
+                'recency_days': thresholds.recency_days,
+                'frequency_counts': thresholds.frequency_counts,
+                'monetary_amounts': thresholds.monetary_amounts,
+            },
+            'segments': list(segments),
+            'scores': list(scores),
+        })
+
+
+class RevenueTrendsAPIView(APIView):
+    """
+    Monthly revenue from the rollup.
+    Accepts ``months`` (12-60) and ``type`` (transaction type, default donation).
+    """
+
+    def get(self, request):
+        try:
+            months = int(request.query_params.get('months', RevenueRollupService.MIN_MONTHS))
+        except ValueError:
+            months = RevenueRollupService.MIN_MONTHS
+        transaction_type = request.query_params.get('type', 'donation')
+
+        return Response(RevenueRollupService.monthly_totals(months, transaction_type))
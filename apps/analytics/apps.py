@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class AnalyticsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.analytics'
-    verbose_name = 'Analytics and Reporting'
\ No newline at end of file
+    verbose_name = 'Analytics and Reporting'
+    
+    def ready(self):
+        """Import signal handlers when the app is ready"""
+        import apps.analytics.signals
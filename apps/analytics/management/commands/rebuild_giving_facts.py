@@ -0,0 +1,23 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.analytics.services import GivingFactService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily giving fact table from transactions, optionally for a date range'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last date to rebuild (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+
+        rows = GivingFactService.rebuild(start=start, end=end)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} daily giving facts'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.analytics.services import RevenueRollupService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the monthly revenue rollup from the transaction table'
+
+    def handle(self, *args, **options):
+        rows = RevenueRollupService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} monthly revenue rollup rows'))
@@ -10,6 +10,7 @@ class DashboardMetric(models.Model):
     Model for storing calculated dashboard metrics
     """
     METRIC_TYPES = [
+        ('total_contacts', 'Total Contacts'),
         ('total_donors', 'Total Donors'),
         ('total_revenue', 'Total Revenue'),
         ('monthly_revenue', 'Monthly Revenue'),
@@ -37,6 +38,103 @@ class DashboardMetric(models.Model):
         return f"{self.get_metric_type_display()}: {self.value}"
 
 
+class MonthlyRevenueRollup(models.Model):
+    """
+    Completed and refunded transaction totals per month, type, campaign and
+    payment method. Kept current by the transaction signal handlers so revenue
+    trends never have to scan the transaction table.
+    """
+    month = models.DateField(help_text="First day of the month")
+    type = models.CharField(max_length=50)
+    campaign = models.ForeignKey('transactions.Campaign', on_delete=models.CASCADE, null=True, blank=True,
+                                 related_name='revenue_rollups')
+    payment_method = models.CharField(max_length=50)
+    
+    completed_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    completed_count = models.IntegerField(default=0)
+    refunded_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    refunded_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['month', 'type']
+        indexes = [
+            models.Index(fields=['type', 'month']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['month', 'type', 'campaign', 'payment_method'],
+                condition=models.Q(campaign__isnull=False),
+                name='unique_revenue_rollup_per_campaign'
+            ),
+            models.UniqueConstraint(
+                fields=['month', 'type', 'payment_method'],
+                condition=models.Q(campaign__isnull=True),
+                name='unique_revenue_rollup_without_campaign'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.month:%b %Y} {self.type} ({self.payment_method}): {self.completed_amount}"
+
+
+class DailyGivingFact(models.Model):
+    """
+    Daily transaction fact table for reporting.
+    One row per (date, contact, campaign, event, type, status, payment_method)
+    holding the summed amount, transaction count and deductible amount, so
+    reports never scan the transaction table.
+    """
+    date = models.DateField()
+    contact = models.ForeignKey('contacts.Contact', on_delete=models.CASCADE, related_name='giving_facts')
+    campaign = models.ForeignKey('transactions.Campaign', on_delete=models.CASCADE, null=True, blank=True,
+                                 related_name='giving_facts')
+    event = models.ForeignKey('events.Event', on_delete=models.CASCADE, null=True, blank=True,
+                              related_name='giving_facts')
+    type = models.CharField(max_length=50)
+    status = models.CharField(max_length=20)
+    payment_method = models.CharField(max_length=50)
+    
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    transaction_count = models.IntegerField(default=0)
+    deductible_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    
+    class Meta:
+        ordering = ['date']
+        indexes = [
+            models.Index(fields=['date', 'type', 'status']),
+            models.Index(fields=['campaign', 'date']),
+            models.Index(fields=['contact', 'date']),
+        ]
+        # Campaign and event are nullable, so uniqueness of the grain needs
+        # one partial constraint per null combination
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'contact', 'campaign', 'event', 'type', 'status', 'payment_method'],
+                condition=models.Q(campaign__isnull=False, event__isnull=False),
+                name='unique_giving_fact_campaign_event'
+            ),
+            models.UniqueConstraint(
+                fields=['date', 'contact', 'campaign', 'type', 'status', 'payment_method'],
+                condition=models.Q(campaign__isnull=False, event__isnull=True),
+                name='unique_giving_fact_campaign'
+            ),
+            models.UniqueConstraint(
+                fields=['date', 'contact', 'event', 'type', 'status', 'payment_method'],
+                condition=models.Q(campaign__isnull=True, event__isnull=False),
+                name='unique_giving_fact_event'
+            ),
+            models.UniqueConstraint(
+                fields=['date', 'contact', 'type', 'status', 'payment_method'],
+                condition=models.Q(campaign__isnull=True, event__isnull=True),
+                name='unique_giving_fact'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} {self.contact_id} {self.type}/{self.status}: {self.amount}"
+
+
 class ReportTemplate(models.Model):
     """
     Model for saving custom report configurations
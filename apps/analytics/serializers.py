@@ -0,0 +1,24 @@
+from rest_framework import serializers
+
+from .models import DashboardMetric, ReportTemplate
+
+
+class DashboardMetricSerializer(serializers.ModelSerializer):
+    metric_label = serializers.CharField(source='get_metric_type_display', read_only=True)
+
+    class Meta:
+        model = DashboardMetric
+        fields = ['id', 'metric_type', 'metric_label', 'value', 'period_start', 'period_end', 'calculated_at']
+        read_only_fields = fields
+
+
+class ReportTemplateSerializer(serializers.ModelSerializer):
+    created_by = serializers.StringRelatedField(read_only=True)
+
+    class Meta:
+        model = ReportTemplate
+        fields = [
+            'id', 'name', 'report_type', 'description', 'filters', 'columns', 'grouping',
+            'is_public', 'created_by', 'shared_with', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'created_by', 'created_at', 'updated_at']
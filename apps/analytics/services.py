@@ -0,0 +1,707 @@
+"""
+Analytics services for MAKE CRM
+Computes the dashboard metric snapshots stored in DashboardMetric and
+maintains the monthly revenue rollup and daily giving fact table
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from django.db import IntegrityError, transaction as db_transaction
+from django.db.models import DEFERRED, Avg, Case, Count, DecimalField, F, Min, Q, Sum, Value, When
+from django.db.models.functions import ExtractYear, Greatest, TruncDate, TruncMonth
+from django.utils import timezone
+
+from apps.communications.models import EmailCampaign
+from apps.contacts.models import Contact
+from apps.events.models import Event
+from apps.transactions.models import Campaign, Transaction
+from .models import DailyGivingFact, DashboardMetric, MonthlyRevenueRollup
+
+logger = logging.getLogger(__name__)
+
+
+def _apply_additive_delta(model, key: dict, deltas: dict, count_fields: List[str]) -> bool:
+    """
+    Add ``deltas`` to the additive rollup row identified by ``key`` with
+    ``F()`` increments, creating the row when adding and deleting it once all
+    of its ``count_fields`` reach zero. Returns False when a withdrawal finds
+    no row to subtract from.
+    """
+    withdrawing = any(deltas[field] < 0 for field in count_fields if field in deltas)
+    increments = {field: F(field) + value for field, value in deltas.items()}
+
+    if model.objects.filter(**key).update(**increments):
+        if withdrawing:
+            model.objects.filter(**key, **{f'{field}__lte': 0 for field in count_fields}).delete()
+        return True
+
+    if withdrawing:
+        return False
+
+    try:
+        with db_transaction.atomic():
+            model.objects.create(**key, **deltas)
+    except IntegrityError:
+        # A concurrent transaction created the row first
+        model.objects.filter(**key).update(**increments)
+    return True
+
+
+class MetricComputationService:
+    """
+    Fills DashboardMetric with one row per metric type and period.
+
+    Each metric is computed for the current calendar month or the current
+    calendar year. Recomputing within the same period overwrites the row, so
+    the table keeps the latest value for every past period as history.
+    Point-in-time counts such as total contacts use the month period.
+    """
+
+    MONTHLY_METRICS = [
+        'total_contacts',
+        'total_donors',
+        'monthly_revenue',
+        'average_gift_size',
+        'event_attendance_rate',
+        'email_open_rate',
+        'new_donors_this_month',
+        'lapsed_donors',
+        'major_gift_prospects',
+    ]
+    YEARLY_METRICS = [
+        'total_revenue',
+        'donor_retention_rate',
+    ]
+
+    LAPSED_AFTER_DAYS = 365
+    MAJOR_GIFT_THRESHOLD = Decimal('1000')
+
+    @staticmethod
+    def month_period(day: date):
+        start = day.replace(day=1)
+        next_month = (start + timedelta(days=32)).replace(day=1)
+        return start, next_month - timedelta(days=1)
+
+    @staticmethod
+    def year_period(day: date):
+        return day.replace(month=1, day=1), day.replace(month=12, day=31)
+
+    @staticmethod
+    def current_periods(today: Optional[date] = None) -> Dict[str, tuple]:
+        """Period each metric type is reported for as of ``today``"""
+        today = today or timezone.now().date()
+        month = MetricComputationService.month_period(today)
+        year = MetricComputationService.year_period(today)
+
+        periods = {metric_type: month for metric_type in MetricComputationService.MONTHLY_METRICS}
+        periods.update({metric_type: year for metric_type in MetricComputationService.YEARLY_METRICS})
+        return periods
+
+    @staticmethod
+    def compute_all(today: Optional[date] = None) -> List[DashboardMetric]:
+        """Compute every metric for its current period and store the snapshot"""
+        today = today or timezone.now().date()
+        calculated_at = timezone.now()
+
+        metrics = []
+        for metric_type, (period_start, period_end) in MetricComputationService.current_periods(today).items():
+            try:
+                value = MetricComputationService.compute_metric(metric_type, period_start, min(period_end, today))
+            except Exception as e:
+                logger.error(f"Error computing dashboard metric {metric_type}: {str(e)}")
+                continue
+
+            metric, _ = DashboardMetric.objects.update_or_create(
+                metric_type=metric_type,
+                period_start=period_start,
+                period_end=period_end,
+                defaults={'value': value, 'calculated_at': calculated_at}
+            )
+            metrics.append(metric)
+
+        logger.info(f"Computed {len(metrics)} dashboard metrics as of {today}")
+        return metrics
+
+    @staticmethod
+    def latest_snapshot(today: Optional[date] = None) -> Dict[str, DashboardMetric]:
+        """Stored metrics for the current periods, keyed by metric type"""
+        periods = MetricComputationService.current_periods(today)
+        metrics = DashboardMetric.objects.filter(
+            metric_type__in=periods.keys(),
+            period_start__in={start for start, _ in periods.values()}
+        )
+        return {
+            metric.metric_type: metric
+            for metric in metrics
+            if periods[metric.metric_type] == (metric.period_start, metric.period_end)
+        }
+
+    @staticmethod
+    def compute_metric(metric_type: str, period_start: date, period_end: date) -> Decimal:
+        """Compute a single metric over an inclusive date range"""
+        compute = getattr(MetricComputationService, f'_compute_{metric_type}')
+        value = compute(period_start, period_end)
+        return Decimal(value or 0).quantize(Decimal('0.01'))
+
+    @staticmethod
+    def _datetime_range(period_start: date, period_end: date):
+        """Aware datetime bounds so the transaction_date index can be used"""
+        start = timezone.make_aware(datetime.combine(period_start, time.min))
+        end = timezone.make_aware(datetime.combine(period_end + timedelta(days=1), time.min))
+        return start, end
+
+    @staticmethod
+    def _donations(period_start: date, period_end: date):
+        start, end = MetricComputationService._datetime_range(period_start, period_end)
+        return Transaction.objects.filter(
+            type='donation',
+            status='completed',
+            transaction_date__gte=start,
+            transaction_date__lt=end
+        )
+
+    @staticmethod
+    def _rate(numerator, denominator):
+        if not denominator:
+            return 0
+        return Decimal(numerator or 0) * 100 / Decimal(denominator)
+
+    @staticmethod
+    def _compute_total_contacts(period_start, period_end):
+        return Contact.objects.count()
+
+    @staticmethod
+    def _compute_total_donors(period_start, period_end):
+        return Contact.objects.filter(donation_count__gt=0).count()
+
+    @staticmethod
+    def _compute_total_revenue(period_start, period_end):
+        return MetricComputationService._donations(period_start, period_end).aggregate(total=Sum('amount'))['total']
+
+    @staticmethod
+    def _compute_monthly_revenue(period_start, period_end):
+        return MetricComputationService._donations(period_start, period_end).aggregate(total=Sum('amount'))['total']
+
+    @staticmethod
+    def _compute_average_gift_size(period_start, period_end):
+        return MetricComputationService._donations(period_start, period_end).aggregate(average=Avg('amount'))['average']
+
+    @staticmethod
+    def _compute_donor_retention_rate(period_start, period_end):
+        """Share of last year's donors who have given again this period"""
+        previous_start = period_start.replace(year=period_start.year - 1)
+        previous_donors = MetricComputationService._donations(
+            previous_start, period_start - timedelta(days=1)
+        ).values('contact_id').distinct()
+
+        retained = MetricComputationService._donations(period_start, period_end).filter(
+            contact_id__in=previous_donors
+        ).values('contact_id').distinct().count()
+
+        return MetricComputationService._rate(retained, previous_donors.count())
+
+    @staticmethod
+    def _compute_event_attendance_rate(period_start, period_end):
+        totals = Event.objects.filter(
+            event_date__gte=period_start,
+            event_date__lte=period_end,
+            registration_count__gt=0
+        ).aggregate(registered=Sum('registration_count'), attended=Sum('attendance_count'))
+        return MetricComputationService._rate(totals['attended'], totals['registered'])
+
+    @staticmethod
+    def _compute_email_open_rate(period_start, period_end):
+        start, end = MetricComputationService._datetime_range(period_start, period_end)
+        totals = EmailCampaign.objects.filter(
+            sent_time__gte=start,
+            sent_time__lt=end
+        ).aggregate(delivered=Sum('emails_delivered'), opened=Sum('emails_opened'))
+        return MetricComputationService._rate(totals['opened'], totals['delivered'])
+
+    @staticmethod
+    def _compute_new_donors_this_month(period_start, period_end):
+        """Donors whose first completed gift falls in the period"""
+        start, end = MetricComputationService._datetime_range(period_start, period_end)
+        return Transaction.objects.filter(
+            type='donation',
+            status='completed'
+        ).values('contact_id').annotate(
+            first_gift=Min('transaction_date')
+        ).filter(
+            first_gift__gte=start,
+            first_gift__lt=end
+        ).count()
+
+    @staticmethod
+    def _compute_lapsed_donors(period_start, period_end):
+        cutoff = period_end - timedelta(days=MetricComputationService.LAPSED_AFTER_DAYS)
+        return Contact.objects.filter(donation_count__gt=0, last_donation_date__lt=cutoff).count()
+
+    @staticmethod
+    def _compute_major_gift_prospects(period_start, period_end):
+        return Contact.objects.filter(
+            total_lifetime_giving__gte=MetricComputationService.MAJOR_GIFT_THRESHOLD
+        ).count()
+
+
+class RevenueRollupService:
+    """
+    Maintenance of MonthlyRevenueRollup.
+
+    Each completed or refunded transaction contributes its amount to exactly
+    one rollup row. Saves and deletes move that contribution with ``F()``
+    deltas; ``rebuild`` regenerates whole months from the transaction table
+    when the previous values of a change are unknown.
+    """
+
+    TRACKED_FIELDS = ['type', 'status', 'amount', 'transaction_date', 'campaign_id', 'payment_method']
+    STATUS_COLUMNS = {
+        'completed': ('completed_amount', 'completed_count'),
+        'refunded': ('refunded_amount', 'refunded_count'),
+    }
+    MIN_MONTHS = 12
+    MAX_MONTHS = 60
+
+    @staticmethod
+    def month_of(transaction_date) -> date:
+        """First day of the month a transaction date falls in, in local time"""
+        if timezone.is_aware(transaction_date):
+            transaction_date = timezone.localtime(transaction_date)
+        return transaction_date.date().replace(day=1)
+
+    @staticmethod
+    def _contribution(values: Optional[dict]):
+        """Rollup key and status a transaction's values count under, if any"""
+        if values is None or values['status'] not in RevenueRollupService.STATUS_COLUMNS:
+            return None
+        key = {
+            'month': RevenueRollupService.month_of(values['transaction_date']),
+            'type': values['type'],
+            'campaign_id': values['campaign_id'],
+            'payment_method': values['payment_method'],
+        }
+        return key, values['status']
+
+    @staticmethod
+    def _apply_delta(key: dict, status: str, amount: Decimal, count: int):
+        amount_field, count_field = RevenueRollupService.STATUS_COLUMNS[status]
+        applied = _apply_additive_delta(
+            MonthlyRevenueRollup, key, {amount_field: amount, count_field: count},
+            count_fields=['completed_count', 'refunded_count']
+        )
+        if not applied:
+            # The rollup has drifted from the transactions; rebuild the month
+            RevenueRollupService.schedule_rebuild([key['month']])
+
+    @staticmethod
+    def apply_change(previous: Optional[dict], current: Optional[dict]):
+        """Move a transaction's contribution from its previous values to its current ones"""
+        before = RevenueRollupService._contribution(previous)
+        after = RevenueRollupService._contribution(current)
+
+        if before and after and before == after and previous['amount'] == current['amount']:
+            return
+
+        if before:
+            RevenueRollupService._apply_delta(*before, -previous['amount'], -1)
+        if after:
+            RevenueRollupService._apply_delta(*after, current['amount'], 1)
+
+    @staticmethod
+    def apply_transaction_change(instance, previous: Optional[dict], deleted: bool = False):
+        """
+        Update the rollup for a saved or deleted transaction.
+        ``previous`` holds the values loaded before the save, or None when new.
+        """
+        if deleted:
+            # A deleted row cannot load deferred fields, so prefer the snapshot
+            previous = previous or {field: getattr(instance, field) for field in RevenueRollupService.TRACKED_FIELDS}
+            current = None
+        else:
+            current = instance.current_values(RevenueRollupService.TRACKED_FIELDS, previous)
+
+        if previous is not None and any(
+            previous.get(field, DEFERRED) is DEFERRED for field in RevenueRollupService.TRACKED_FIELDS
+        ):
+            # Nothing reliable to diff against, so rebuild the months involved
+            dates = [previous.get('transaction_date', DEFERRED)]
+            if current is not None:
+                dates.append(current['transaction_date'])
+            RevenueRollupService.schedule_rebuild(
+                RevenueRollupService.month_of(value) for value in dates if value is not DEFERRED
+            )
+            return
+
+        RevenueRollupService.apply_change(previous, current)
+
+    @staticmethod
+    def schedule_rebuild(months=None):
+        """Rebuild the given months (or everything) once the current transaction commits"""
+        months = None if months is None else sorted(set(months))
+        db_transaction.on_commit(lambda: RevenueRollupService.rebuild(months))
+
+    @staticmethod
+    def rebuild(months=None) -> int:
+        """Regenerate rollup rows from the transaction table, for all months or the given ones"""
+        transactions = Transaction.objects.filter(status__in=RevenueRollupService.STATUS_COLUMNS.keys())
+        rollups = MonthlyRevenueRollup.objects.all()
+
+        if months is not None:
+            if not months:
+                return 0
+            in_months = Q()
+            for month in months:
+                start, end = MetricComputationService._datetime_range(
+                    month, MetricComputationService.month_period(month)[1]
+                )
+                in_months |= Q(transaction_date__gte=start, transaction_date__lt=end)
+            transactions = transactions.filter(in_months)
+            rollups = rollups.filter(month__in=months)
+
+        grouped = transactions.annotate(
+            rollup_month=TruncMonth('transaction_date')
+        ).values(
+            'rollup_month', 'type', 'campaign_id', 'payment_method', 'status'
+        ).annotate(
+            total=Sum('amount'),
+            count=Count('id')
+        ).order_by()
+
+        rows = {}
+        for group in grouped:
+            key = (group['rollup_month'].date(), group['type'], group['campaign_id'], group['payment_method'])
+            row = rows.setdefault(key, MonthlyRevenueRollup(
+                month=key[0], type=key[1], campaign_id=key[2], payment_method=key[3]
+            ))
+            amount_field, count_field = RevenueRollupService.STATUS_COLUMNS[group['status']]
+            setattr(row, amount_field, group['total'])
+            setattr(row, count_field, group['count'])
+
+        with db_transaction.atomic():
+            rollups.delete()
+            MonthlyRevenueRollup.objects.bulk_create(rows.values(), batch_size=1000)
+
+        logger.info(f"Rebuilt {len(rows)} monthly revenue rollup rows")
+        return len(rows)
+
+    @staticmethod
+    def monthly_totals(months: int = MIN_MONTHS, transaction_type: str = 'donation',
+                       today: Optional[date] = None) -> List[dict]:
+        """
+        Revenue per month for the last ``months`` months (clamped to 12-60),
+        including empty months, read from the rollup
+        """
+        months = max(RevenueRollupService.MIN_MONTHS, min(months, RevenueRollupService.MAX_MONTHS))
+        today = today or timezone.localdate()
+
+        month_starts = [today.replace(day=1)]
+        while len(month_starts) < months:
+            month_starts.append((month_starts[-1] - timedelta(days=1)).replace(day=1))
+        month_starts.reverse()
+
+        totals = {
+            row['month']: row
+            for row in MonthlyRevenueRollup.objects.filter(
+                type=transaction_type,
+                month__gte=month_starts[0]
+            ).values('month').annotate(
+                completed=Sum('completed_amount'),
+                gifts=Sum('completed_count'),
+                refunded=Sum('refunded_amount')
+            ).order_by()
+        }
+
+        return [
+            {
+                'month': month,
+                'total': totals.get(month, {}).get('completed') or Decimal('0.00'),
+                'count': totals.get(month, {}).get('gifts') or 0,
+                'refunded': totals.get(month, {}).get('refunded') or Decimal('0.00'),
+            }
+            for month in month_starts
+        ]
+
+
+class GivingFactService:
+    """
+    Maintenance of the DailyGivingFact table.
+
+    Every transaction contributes its amount, a count of one and its
+    deductible amount to the fact row for its local date and dimensions.
+    Saves and deletes move that contribution with ``F()`` deltas; ``rebuild``
+    regenerates any date range from the transaction table.
+    """
+
+    TRACKED_FIELDS = [
+        'transaction_date', 'contact_id', 'campaign_id', 'event_id', 'type', 'status', 'payment_method',
+        'amount', 'is_tax_deductible', 'tax_deductible_amount', 'quid_pro_quo_value',
+    ]
+
+    @staticmethod
+    def date_of(transaction_date) -> date:
+        """Local calendar date of a transaction"""
+        if timezone.is_aware(transaction_date):
+            transaction_date = timezone.localtime(transaction_date)
+        return transaction_date.date()
+
+    @staticmethod
+    def _contribution(values: dict):
+        key = {
+            'date': GivingFactService.date_of(values['transaction_date']),
+            'contact_id': values['contact_id'],
+            'campaign_id': values['campaign_id'],
+            'event_id': values['event_id'],
+            'type': values['type'],
+            'status': values['status'],
+            'payment_method': values['payment_method'],
+        }
+        measures = {
+            'amount': values['amount'],
+            'deductible_amount': Transaction.deductible_amount_for(
+                values['is_tax_deductible'], values['tax_deductible_amount'],
+                values['amount'], values['quid_pro_quo_value']
+            ),
+        }
+        return key, measures
+
+    @staticmethod
+    def _apply_delta(key: dict, measures: dict, sign: int):
+        deltas = {field: value * sign for field, value in measures.items()}
+        deltas['transaction_count'] = sign
+
+        if not _apply_additive_delta(DailyGivingFact, key, deltas, count_fields=['transaction_count']):
+            # The facts have drifted from the transactions; rebuild the day
+            GivingFactService.schedule_rebuild([key['date']])
+
+    @staticmethod
+    def apply_change(previous: Optional[dict], current: Optional[dict]):
+        """Move a transaction's contribution from its previous values to its current ones"""
+        before = GivingFactService._contribution(previous) if previous is not None else None
+        after = GivingFactService._contribution(current) if current is not None else None
+
+        if before == after:
+            return
+
+        if before:
+            GivingFactService._apply_delta(*before, -1)
+        if after:
+            GivingFactService._apply_delta(*after, 1)
+
+    @staticmethod
+    def apply_transaction_change(instance, previous: Optional[dict], deleted: bool = False):
+        """
+        Update the facts for a saved or deleted transaction.
+        ``previous`` holds the values loaded before the save, or None when new.
+        """
+        if deleted:
+            # A deleted row cannot load deferred fields, so prefer the snapshot
+            previous = previous or {field: getattr(instance, field) for field in GivingFactService.TRACKED_FIELDS}
+            current = None
+        else:
+            current = instance.current_values(GivingFactService.TRACKED_FIELDS, previous)
+
+        if previous is not None and any(
+            previous.get(field, DEFERRED) is DEFERRED for field in GivingFactService.TRACKED_FIELDS
+        ):
+            # Nothing reliable to diff against, so rebuild the dates involved
+            dates = [previous.get('transaction_date', DEFERRED)]
+            if current is not None:
+                dates.append(current['transaction_date'])
+            GivingFactService.schedule_rebuild(
+                GivingFactService.date_of(value) for value in dates if value is not DEFERRED
+            )
+            return
+
+        GivingFactService.apply_change(previous, current)
+
+    @staticmethod
+    def schedule_rebuild(dates=None):
+        """Rebuild the given dates (or everything) once the current transaction commits"""
+        dates = None if dates is None else sorted(set(dates))
+        db_transaction.on_commit(lambda: GivingFactService.rebuild(dates=dates))
+
+    @staticmethod
+    def rebuild(start: Optional[date] = None, end: Optional[date] = None, dates=None) -> int:
+        """
+        Regenerate facts from the transaction table for an inclusive date
+        range, a list of dates, or everything when neither is given
+        """
+        transactions = Transaction.objects.all()
+        facts = DailyGivingFact.objects.all()
+
+        if dates is not None:
+            if not dates:
+                return 0
+            on_dates = Q()
+            for day in dates:
+                day_start, day_end = MetricComputationService._datetime_range(day, day)
+                on_dates |= Q(transaction_date__gte=day_start, transaction_date__lt=day_end)
+            transactions = transactions.filter(on_dates)
+            facts = facts.filter(date__in=dates)
+        if start is not None:
+            transactions = transactions.filter(
+                transaction_date__gte=MetricComputationService._datetime_range(start, start)[0]
+            )
+            facts = facts.filter(date__gte=start)
+        if end is not None:
+            transactions = transactions.filter(
+                transaction_date__lt=MetricComputationService._datetime_range(end, end)[1]
+            )
+            facts = facts.filter(date__lte=end)
+
+        deductible = Case(
+            When(is_tax_deductible=False, then=Value(Decimal('0.00'))),
+            When(tax_deductible_amount__isnull=False, then=F('tax_deductible_amount')),
+            default=Greatest(F('amount') - F('quid_pro_quo_value'), Value(Decimal('0.00'))),
+            output_field=DecimalField(max_digits=14, decimal_places=2)
+        )
+
+        grouped = transactions.annotate(
+            fact_date=TruncDate('transaction_date')
+        ).values(
+            'fact_date', 'contact_id', 'campaign_id', 'event_id', 'type', 'status', 'payment_method'
+        ).annotate(
+            total=Sum('amount'),
+            count=Count('id'),
+            deductible=Sum(deductible)
+        ).order_by()
+
+        rows = [
+            DailyGivingFact(
+                date=group['fact_date'],
+                contact_id=group['contact_id'],
+                campaign_id=group['campaign_id'],
+                event_id=group['event_id'],
+                type=group['type'],
+                status=group['status'],
+                payment_method=group['payment_method'],
+                amount=group['total'],
+                transaction_count=group['count'],
+                deductible_amount=group['deductible']
+            )
+            for group in grouped.iterator()
+        ]
+
+        with db_transaction.atomic():
+            facts.delete()
+            DailyGivingFact.objects.bulk_create(rows, batch_size=1000)
+
+        logger.info(f"Rebuilt {len(rows)} daily giving facts")
+        return len(rows)
+
+
+class GivingReportService:
+    """Report queries answered from the DailyGivingFact table"""
+
+    @staticmethod
+    def facts(start: Optional[date] = None, end: Optional[date] = None, status: str = 'completed',
+              transaction_type: Optional[str] = None):
+        facts = DailyGivingFact.objects.filter(status=status)
+        if start:
+            facts = facts.filter(date__gte=start)
+        if end:
+            facts = facts.filter(date__lte=end)
+        if transaction_type:
+            facts = facts.filter(type=transaction_type)
+        return facts
+
+    @staticmethod
+    def _measures():
+        return {
+            'total': Sum('amount'),
+            'count': Sum('transaction_count'),
+            'deductible': Sum('deductible_amount'),
+        }
+
+    @staticmethod
+    def giving_summary(start: Optional[date] = None, end: Optional[date] = None,
+                       transaction_type: Optional[str] = 'donation') -> dict:
+        """Completed giving totals for a date range, broken down by month, type and payment method"""
+        facts = GivingReportService.facts(start, end, transaction_type=transaction_type)
+        measures = GivingReportService._measures()
+
+        totals = facts.aggregate(donors=Count('contact_id', distinct=True), **measures)
+
+        return {
+            'totals': totals,
+            'by_month': list(
+                facts.annotate(month=TruncMonth('date')).values('month').annotate(**measures).order_by('month')
+            ),
+            'by_type': list(facts.values('type').annotate(**measures).order_by('-total')),
+            'by_payment_method': list(facts.values('payment_method').annotate(**measures).order_by('-total')),
+        }
+
+    @staticmethod
+    def campaign_summary(start: Optional[date] = None, end: Optional[date] = None) -> List[dict]:
+        """Completed giving per campaign with distinct donor counts"""
+        rows = GivingReportService.facts(start, end).filter(
+            campaign__isnull=False
+        ).values('campaign_id').annotate(
+            donors=Count('contact_id', distinct=True),
+            **GivingReportService._measures()
+        ).order_by('-total')
+
+        campaigns = Campaign.objects.in_bulk([row['campaign_id'] for row in rows])
+        report = []
+        for row in rows:
+            campaign = campaigns[row['campaign_id']]
+            row.update({
+                'campaign': campaign,
+                'goal': campaign.goal_amount,
+                'progress': min(100, float(row['total'] / campaign.goal_amount * 100)) if campaign.goal_amount else 0,
+            })
+            report.append(row)
+        return report
+
+    @staticmethod
+    def household_summary(start: Optional[date] = None, end: Optional[date] = None,
+                          limit: int = 100) -> List[dict]:
+        """Completed donations per household, grouped on the contacts' stored household ids"""
+        rows = list(GivingReportService.facts(start, end, transaction_type='donation').values(
+            household_id=F('contact__household_id')
+        ).annotate(
+            donors=Count('contact_id', distinct=True),
+            **GivingReportService._measures()
+        ).order_by('-total')[:limit])
+
+        # The household id is a member's contact id, which carries the lifetime totals
+        households = Contact.objects.in_bulk([row['household_id'] for row in rows if row['household_id']])
+        for row in rows:
+            row['household'] = households.get(row['household_id'])
+        return rows
+
+    @staticmethod
+    def retention_by_year(start_year: int, end_year: int) -> List[dict]:
+        """Donors per year with how many were retained from the previous year or new"""
+        donor_years = GivingReportService.facts(
+            date(start_year - 1, 1, 1), date(end_year, 12, 31), transaction_type='donation'
+        ).annotate(year=ExtractYear('date')).values_list('year', 'contact_id').distinct()
+
+        donors_by_year = {}
+        for year, contact_id in donor_years:
+            donors_by_year.setdefault(year, set()).add(contact_id)
+
+        first_gift_years = {
+            row['contact_id']: row['first_gift'].year
+            for row in GivingReportService.facts(
+                end=date(end_year, 12, 31), transaction_type='donation'
+            ).values('contact_id').annotate(first_gift=Min('date')).order_by()
+        }
+
+        report = []
+        for year in range(start_year, end_year + 1):
+            donors = donors_by_year.get(year, set())
+            previous = donors_by_year.get(year - 1, set())
+            retained = len(donors & previous)
+            report.append({
+                'year': year,
+                'donors': len(donors),
+                'retained': retained,
+                'new': sum(1 for contact_id in donors if first_gift_years.get(contact_id) == year),
+                'lapsed': len(previous - donors),
+                'retention_rate': round(retained * 100 / len(previous), 1) if previous else None,
+            })
+        return report
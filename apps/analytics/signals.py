@@ -0,0 +1,53 @@
+"""
+Django signals keeping analytics rollups in step with transactions
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.events.models import Event
+from apps.transactions.models import Campaign, Transaction
+from .models import DailyGivingFact, MonthlyRevenueRollup
+from .services import GivingFactService, RevenueRollupService
+
+
+@receiver(post_save, sender=Transaction)
+def update_transaction_rollups(sender, instance, created, raw=False, **kwargs):
+    """
+    Move the transaction's contribution in the revenue rollup and giving facts.
+    Transaction keeps the values it was loaded with until save() returns.
+    """
+    if raw:
+        return
+
+    previous = None if created else getattr(instance, '_loaded_values', {})
+    RevenueRollupService.apply_transaction_change(instance, previous)
+    GivingFactService.apply_transaction_change(instance, previous)
+
+
+@receiver(post_delete, sender=Transaction)
+def withdraw_from_transaction_rollups(sender, instance, **kwargs):
+    """Remove a deleted transaction from the revenue rollup and giving facts"""
+    previous = getattr(instance, '_loaded_values', None)
+    RevenueRollupService.apply_transaction_change(instance, previous, deleted=True)
+    GivingFactService.apply_transaction_change(instance, previous, deleted=True)
+
+
+@receiver(pre_delete, sender=Campaign)
+def rebuild_campaign_rollups(sender, instance, **kwargs):
+    """
+    Deleting a campaign cascades to its rollup rows while its transactions
+    are kept without a campaign, so regenerate the affected periods
+    """
+    months = MonthlyRevenueRollup.objects.filter(campaign=instance).values_list('month', flat=True)
+    RevenueRollupService.schedule_rebuild(set(months))
+
+    dates = DailyGivingFact.objects.filter(campaign=instance).values_list('date', flat=True)
+    GivingFactService.schedule_rebuild(set(dates))
+
+
+@receiver(pre_delete, sender=Event)
+def rebuild_event_giving_facts(sender, instance, **kwargs):
+    """Same as for campaigns: the event's transactions survive without an event"""
+    dates = DailyGivingFact.objects.filter(event=instance).values_list('date', flat=True)
+    GivingFactService.schedule_rebuild(set(dates))
@@ -0,0 +1,13 @@
+"""
+Celery tasks for analytics and reporting
+"""
+
+from celery import shared_task
+
+from .services import MetricComputationService
+
+
+@shared_task
+def compute_dashboard_metrics():
+    """Refresh the DashboardMetric snapshot for the current periods"""
+    return len(MetricComputationService.compute_all())
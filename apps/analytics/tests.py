@@ -0,0 +1,358 @@
+"""
+Tests for the dashboard metric snapshots, revenue rollup and giving facts
+
+The rollup and fact tables move by deltas as transactions change; tests
+compare them with a rebuild from the transaction table.
+These tests need PostgreSQL, which Contact's ArrayField columns require.
+"""
+
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.contacts.models import Contact
+from apps.events.models import Event
+from apps.transactions.models import Campaign, Transaction
+from .models import DailyGivingFact, DashboardMetric, MonthlyRevenueRollup
+from .services import GivingFactService, GivingReportService, MetricComputationService, RevenueRollupService
+
+requires_postgres = skipUnless(connection.vendor == 'postgresql', 'Needs PostgreSQL for ArrayField columns')
+
+
+def aware(year, month, day, hour=12):
+    return timezone.make_aware(datetime(year, month, day, hour))
+
+
+class AnalyticsTestCase(TestCase):
+
+    def setUp(self):
+        self.contact = Contact.objects.create(first_name='Ada', last_name='Donor', email='ada@example.com')
+        self.other = Contact.objects.create(first_name='Bo', last_name='Donor', email='bo@example.com')
+        self.campaign = Campaign.objects.create(
+            name='Spring Appeal', start_date=date(2024, 1, 1), goal_amount=Decimal('1000.00')
+        )
+
+    def give(self, contact, amount, when, campaign=None, status='completed', type='donation', **extra):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Transaction.objects.create(
+                contact=contact,
+                type=type,
+                amount=Decimal(amount),
+                status=status,
+                payment_method='credit_card',
+                campaign=campaign,
+                transaction_date=when,
+                **extra
+            )
+
+    def edit(self, transaction, **changes):
+        for field, value in changes.items():
+            setattr(transaction, field, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction.save()
+
+    def assertMatchesRebuild(self, model, rebuild, fields):
+        maintained = list(model.objects.values_list(*fields))
+        rebuild()
+        self.assertCountEqual(maintained, model.objects.values_list(*fields))
+
+
+@requires_postgres
+class MetricSnapshotTest(AnalyticsTestCase):
+    """MetricComputationService fills and reads DashboardMetric"""
+
+    today = date(2024, 3, 15)
+
+    def test_compute_all_stores_one_row_per_metric(self):
+        self.give(self.contact, '100.00', aware(2024, 3, 1))
+        self.give(self.other, '50.00', aware(2024, 1, 10))
+
+        metrics = MetricComputationService.compute_all(self.today)
+
+        self.assertEqual(len(metrics), len(DashboardMetric.METRIC_TYPES))
+        values = {metric.metric_type: metric.value for metric in metrics}
+        self.assertEqual(values['monthly_revenue'], Decimal('100.00'))
+        self.assertEqual(values['total_revenue'], Decimal('150.00'))
+        self.assertEqual(values['average_gift_size'], Decimal('100.00'))
+        self.assertEqual(values['total_donors'], Decimal('2.00'))
+        self.assertEqual(values['new_donors_this_month'], Decimal('1.00'))
+
+    def test_periods(self):
+        metrics = {metric.metric_type: metric for metric in MetricComputationService.compute_all(self.today)}
+
+        self.assertEqual(
+            (metrics['monthly_revenue'].period_start, metrics['monthly_revenue'].period_end),
+            (date(2024, 3, 1), date(2024, 3, 31))
+        )
+        self.assertEqual(
+            (metrics['total_revenue'].period_start, metrics['total_revenue'].period_end),
+            (date(2024, 1, 1), date(2024, 12, 31))
+        )
+
+    def test_recompute_overwrites_current_period(self):
+        MetricComputationService.compute_all(self.today)
+        self.give(self.contact, '100.00', aware(2024, 3, 1))
+
+        MetricComputationService.compute_all(self.today)
+
+        monthly = DashboardMetric.objects.filter(metric_type='monthly_revenue')
+        self.assertEqual([metric.value for metric in monthly], [Decimal('100.00')])
+
+    def test_latest_snapshot_ignores_past_periods(self):
+        MetricComputationService.compute_all(date(2024, 2, 15))
+        snapshot = MetricComputationService.latest_snapshot(self.today)
+
+        self.assertEqual(set(snapshot), set(MetricComputationService.YEARLY_METRICS))
+
+        MetricComputationService.compute_all(self.today)
+        snapshot = MetricComputationService.latest_snapshot(self.today)
+
+        self.assertEqual(len(snapshot), len(DashboardMetric.METRIC_TYPES))
+        self.assertEqual(snapshot['monthly_revenue'].period_start, date(2024, 3, 1))
+
+    def test_snapshot_read_is_one_query(self):
+        MetricComputationService.compute_all(self.today)
+
+        with self.assertNumQueries(1):
+            MetricComputationService.latest_snapshot(self.today)
+
+    def test_donor_retention_rate(self):
+        self.give(self.contact, '10.00', aware(2023, 5, 1))
+        self.give(self.other, '10.00', aware(2023, 6, 1))
+        self.give(self.contact, '10.00', aware(2024, 2, 1))
+
+        value = MetricComputationService.compute_metric('donor_retention_rate', date(2024, 1, 1), self.today)
+
+        self.assertEqual(value, Decimal('50.00'))
+
+
+@requires_postgres
+class RevenueRollupTest(AnalyticsTestCase):
+    """MonthlyRevenueRollup follows transaction saves and deletes"""
+
+    FIELDS = [
+        'month', 'type', 'campaign_id', 'payment_method',
+        'completed_amount', 'completed_count', 'refunded_amount', 'refunded_count',
+    ]
+
+    def assertRollupMatchesTransactions(self):
+        self.assertMatchesRebuild(MonthlyRevenueRollup, RevenueRollupService.rebuild, self.FIELDS)
+
+    def test_gifts_in_one_month_share_a_row(self):
+        self.give(self.contact, '10.00', aware(2024, 2, 1))
+        self.give(self.other, '15.00', aware(2024, 2, 20))
+
+        rollup = MonthlyRevenueRollup.objects.get()
+        self.assertEqual((rollup.completed_amount, rollup.completed_count), (Decimal('25.00'), 2))
+        self.assertRollupMatchesTransactions()
+
+    def test_month_is_local(self):
+        # 03:00 UTC on March 1st is still February in Chicago
+        self.give(self.contact, '10.00', datetime(2024, 3, 1, 3, tzinfo=dt_timezone.utc))
+
+        self.assertEqual(MonthlyRevenueRollup.objects.get().month, date(2024, 2, 1))
+        self.assertRollupMatchesTransactions()
+
+    def test_edits(self):
+        gift = self.give(self.contact, '10.00', aware(2024, 2, 1), self.campaign)
+        self.give(self.other, '20.00', aware(2024, 2, 1), self.campaign)
+
+        for changes in (
+            {'amount': Decimal('12.50')},
+            {'transaction_date': aware(2024, 4, 1)},
+            {'campaign': None},
+            {'payment_method': 'check'},
+            {'status': 'refunded'},
+            {'status': 'pending'},
+            {'status': 'completed', 'type': 'membership'},
+        ):
+            with self.subTest(changes=changes):
+                self.edit(gift, **changes)
+                self.assertRollupMatchesTransactions()
+
+    def test_deletes(self):
+        gift = self.give(self.contact, '10.00', aware(2024, 2, 1))
+        self.give(self.contact, '20.00', aware(2024, 2, 2))
+        self.give(self.other, '30.00', aware(2024, 3, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            gift.delete()
+        self.assertRollupMatchesTransactions()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.filter(contact=self.contact).delete()
+        self.assertRollupMatchesTransactions()
+
+    def test_save_of_deferred_instance(self):
+        gift = self.give(self.contact, '10.00', aware(2024, 2, 1))
+        transaction = Transaction.objects.only('id', 'transaction_date').get(pk=gift.pk)
+
+        self.edit(transaction, transaction_date=aware(2024, 5, 1))
+
+        self.assertRollupMatchesTransactions()
+
+    def test_campaign_delete_rebuilds_its_months(self):
+        self.give(self.contact, '10.00', aware(2024, 2, 1), self.campaign)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.campaign.delete()
+
+        self.assertRollupMatchesTransactions()
+
+    def test_monthly_totals(self):
+        self.give(self.contact, '10.00', aware(2024, 1, 5))
+        self.give(self.other, '20.00', aware(2024, 1, 6), status='refunded')
+        self.give(self.contact, '40.00', aware(2024, 3, 5))
+        self.give(self.contact, '99.00', aware(2024, 3, 5), type='membership')
+
+        totals = RevenueRollupService.monthly_totals(today=date(2024, 3, 15))
+
+        self.assertEqual(len(totals), RevenueRollupService.MIN_MONTHS)
+        self.assertEqual(totals[0]['month'], date(2023, 4, 1))
+        by_month = {row['month']: row for row in totals}
+        self.assertEqual(by_month[date(2024, 1, 1)]['total'], Decimal('10.00'))
+        self.assertEqual(by_month[date(2024, 1, 1)]['refunded'], Decimal('20.00'))
+        self.assertEqual(by_month[date(2024, 2, 1)]['count'], 0)
+        self.assertEqual(by_month[date(2024, 3, 1)]['total'], Decimal('40.00'))
+
+    def test_monthly_totals_window_is_clamped(self):
+        today = date(2024, 3, 15)
+
+        self.assertEqual(len(RevenueRollupService.monthly_totals(1, today=today)), RevenueRollupService.MIN_MONTHS)
+        self.assertEqual(len(RevenueRollupService.monthly_totals(600, today=today)), RevenueRollupService.MAX_MONTHS)
+
+
+@requires_postgres
+class GivingFactTest(AnalyticsTestCase):
+    """DailyGivingFact follows transaction saves and deletes"""
+
+    FIELDS = [
+        'date', 'contact_id', 'campaign_id', 'event_id', 'type', 'status', 'payment_method',
+        'amount', 'transaction_count', 'deductible_amount',
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.event = Event.objects.create(name='Poetry Night', event_type='reading', event_date=date(2024, 2, 1))
+
+    def assertFactsMatchTransactions(self):
+        self.assertMatchesRebuild(DailyGivingFact, GivingFactService.rebuild, self.FIELDS)
+
+    def test_edits(self):
+        gift = self.give(self.contact, '100.00', aware(2024, 2, 1), self.campaign, event=self.event)
+        self.give(self.contact, '20.00', aware(2024, 2, 1), self.campaign, event=self.event)
+
+        for changes in (
+            {'amount': Decimal('80.00')},
+            {'quid_pro_quo_value': Decimal('30.00')},
+            {'tax_deductible_amount': Decimal('10.00')},
+            {'is_tax_deductible': False},
+            {'event': None},
+            {'campaign': None},
+            {'contact': self.other},
+            {'transaction_date': aware(2024, 2, 2)},
+            {'status': 'refunded'},
+        ):
+            with self.subTest(changes=changes):
+                self.edit(gift, **changes)
+                self.assertFactsMatchTransactions()
+
+    def test_deductible_amount(self):
+        self.give(self.contact, '100.00', aware(2024, 2, 1), quid_pro_quo_value=Decimal('30.00'))
+
+        self.assertEqual(DailyGivingFact.objects.get().deductible_amount, Decimal('70.00'))
+        self.assertFactsMatchTransactions()
+
+    def test_deletes(self):
+        gift = self.give(self.contact, '10.00', aware(2024, 2, 1))
+        self.give(self.contact, '20.00', aware(2024, 2, 1))
+        self.give(self.other, '30.00', aware(2024, 2, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            gift.delete()
+        self.assertFactsMatchTransactions()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.filter(contact=self.contact).delete()
+        self.assertFactsMatchTransactions()
+
+    def test_event_delete_rebuilds_its_dates(self):
+        self.give(self.contact, '10.00', aware(2024, 2, 1), event=self.event)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.delete()
+
+        self.assertFactsMatchTransactions()
+        self.assertIsNone(DailyGivingFact.objects.get().event_id)
+
+    def test_rebuild_of_a_date_range(self):
+        self.give(self.contact, '10.00', aware(2024, 2, 1))
+        self.give(self.contact, '20.00', aware(2024, 3, 1))
+        DailyGivingFact.objects.all().delete()
+
+        GivingFactService.rebuild(start=date(2024, 3, 1), end=date(2024, 3, 31))
+
+        self.assertEqual(list(DailyGivingFact.objects.values_list('date', flat=True)), [date(2024, 3, 1)])
+
+
+@requires_postgres
+class GivingReportTest(AnalyticsTestCase):
+    """Reports answered from the fact table"""
+
+    def setUp(self):
+        super().setUp()
+        self.give(self.contact, '100.00', aware(2023, 6, 1))
+        self.give(self.contact, '50.00', aware(2024, 2, 1), self.campaign)
+        self.give(self.contact, '25.00', aware(2024, 2, 2), self.campaign)
+        self.give(self.other, '200.00', aware(2024, 3, 1), self.campaign)
+        self.give(self.other, '500.00', aware(2024, 3, 1), status='pending')
+        self.give(self.other, '40.00', aware(2024, 3, 1), type='membership')
+
+    def test_giving_summary(self):
+        summary = GivingReportService.giving_summary(date(2024, 1, 1), date(2024, 12, 31))
+
+        self.assertEqual(summary['totals']['total'], Decimal('275.00'))
+        self.assertEqual(summary['totals']['count'], 3)
+        self.assertEqual(summary['totals']['donors'], 2)
+        self.assertEqual(
+            [(row['month'], row['total']) for row in summary['by_month']],
+            [(date(2024, 2, 1), Decimal('75.00')), (date(2024, 3, 1), Decimal('200.00'))]
+        )
+
+    def test_giving_summary_of_all_types(self):
+        summary = GivingReportService.giving_summary(date(2024, 1, 1), date(2024, 12, 31), transaction_type=None)
+
+        self.assertEqual(
+            [(row['type'], row['total']) for row in summary['by_type']],
+            [('donation', Decimal('275.00')), ('membership', Decimal('40.00'))]
+        )
+
+    def test_campaign_summary(self):
+        [row] = GivingReportService.campaign_summary()
+
+        self.assertEqual(row['campaign'], self.campaign)
+        self.assertEqual((row['total'], row['count'], row['donors']), (Decimal('275.00'), 3, 2))
+        self.assertEqual(row['progress'], 27.5)
+
+    def test_retention_by_year(self):
+        report = {row['year']: row for row in GivingReportService.retention_by_year(2023, 2024)}
+
+        self.assertEqual(
+            (report[2023]['donors'], report[2023]['new'], report[2023]['retention_rate']), (1, 1, None)
+        )
+        self.assertEqual(
+            (report[2024]['donors'], report[2024]['retained'], report[2024]['new'], report[2024]['lapsed']),
+            (2, 1, 1, 0)
+        )
+        self.assertEqual(report[2024]['retention_rate'], 100.0)
+
+    def test_reports_do_not_read_transactions(self):
+        Transaction.objects.update(amount=Decimal('0.00'))
+
+        summary = GivingReportService.giving_summary(date(2024, 1, 1), date(2024, 12, 31))
+
+        self.assertEqual(summary['totals']['total'], Decimal('275.00'))
@@ -5,6 +5,7 @@ app_name = 'analytics'
 
 urlpatterns = [
     path('', views.DashboardView.as_view(), name='dashboard'),
+    path('refresh/', views.refresh_dashboard_metrics, name='refresh_metrics'),
     path('donors/', views.DonorAnalyticsView.as_view(), name='donor_analytics'),
     path('events/', views.EventAnalyticsView.as_view(), name='event_analytics'),
     path('communications/', views.CommunicationAnalyticsView.as_view(), name='communication_analytics'),
@@ -1,4 +1,4 @@
-from django.shortcuts import render
+from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import TemplateView
@@ -6,13 +6,14 @@ from django.http import JsonResponse
 from django.db.models import Sum, Count, Avg
 from django.utils import timezone
 from datetime import datetime, timedelta
-from decimal import Decimal
 
 from apps.contacts.models import Contact
+from apps.contacts.services import RFMScoringService
 from apps.transactions.models import Transaction, Campaign
 from apps.events.models import Event, EventAttendance
 from apps.communications.models import EmailCampaign, Communication
 from .models import DashboardMetric, ReportTemplate
+from .services import MetricComputationService, RevenueRollupService
 
 
 class DashboardView(LoginRequiredMixin, TemplateView):
@@ -21,17 +22,20 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Get current year and month
         now = timezone.now()
-        current_year = now.year
-        current_month = now.month
         
-        # Basic metrics
+        # Headline figures come from the precomputed DashboardMetric snapshot
+        metrics = self.get_metric_snapshot()
+        
+        values = {metric_type: metric.value for metric_type, metric in metrics.items()}
+        
         context.update({
-            'total_contacts': Contact.objects.count(),
-            'total_donors': Contact.objects.filter(donation_count__gt=0).count(),
-            'total_revenue_ytd': self.get_revenue_ytd(),
-            'monthly_revenue': self.get_monthly_revenue(),
+            'total_contacts': values.get('total_contacts'),
+            'total_donors': values.get('total_donors'),
+            'total_revenue_ytd': values.get('total_revenue'),
+            'monthly_revenue': values.get('monthly_revenue'),
+            'metrics': values,
+            'metrics_as_of': min((metric.calculated_at for metric in metrics.values()), default=None),
             'recent_transactions': Transaction.objects.filter(
                 status='completed'
             ).select_related('contact', 'campaign').order_by('-transaction_date')[:10],
@@ -48,24 +52,15 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         
         return context
     
-    def get_revenue_ytd(self):
-        """Get year-to-date revenue"""
-        current_year = timezone.now().year
-        return Transaction.objects.filter(
-            transaction_date__year=current_year,
-            status='completed',
-            type='donation'
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-    
-    def get_monthly_revenue(self):
-        """Get current month revenue"""
-        now = timezone.now()
-        return Transaction.objects.filter(
-            transaction_date__year=now.year,
-            transaction_date__month=now.month,
-            status='completed',
-            type='donation'
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+    def get_metric_snapshot(self):
+        """Get the latest metric snapshot, computing it if the period has none yet"""
+        metrics = MetricComputationService.latest_snapshot()
+        # Metrics missing from a partial snapshot failed or are not due yet;
+        # the 15-minute beat task retries them rather than every page load
+        if not metrics:
+            MetricComputationService.compute_all()
+            metrics = MetricComputationService.latest_snapshot()
+        return metrics
     
     def get_donor_segments(self):
         """Get donor segment distribution"""
@@ -80,8 +75,11 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     
     def get_campaign_performance(self):
         """Get recent campaign performance"""
+        # Totals and donor counts are maintained incrementally on Campaign
         campaigns = Campaign.objects.filter(
             is_active=True
+        ).only(
+            'name', 'goal_amount', 'total_raised', 'donor_count'
         ).order_by('-start_date')[:5]
         
         performance = []
@@ -129,19 +127,19 @@ class RunReportView(LoginRequiredMixin, TemplateView):
 @login_required
 def revenue_trends_api(request):
     """API endpoint for revenue trends chart"""
-    # Get last 12 months of revenue data
-    end_date = timezone.now().date()
-    start_date = end_date - timedelta(days=365)
+    # Months of donation revenue from the monthly rollup (12-60)
+    try:
+        months = int(request.GET.get('months', RevenueRollupService.MIN_MONTHS))
+    except ValueError:
+        months = RevenueRollupService.MIN_MONTHS
+    
+    totals = RevenueRollupService.monthly_totals(months)
     
-    # This would typically query monthly aggregated data
-    # For now, return sample data
     data = {
-        'labels': ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
-                  'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'],
+        'labels': [row['month'].strftime('%b %Y') for row in totals],
         'datasets': [{
             'label': 'Revenue',
-            'data': [15000, 18000, 22000, 19000, 25000, 21000, 
-                    23000, 27000, 24000, 28000, 26000, 30000],
+            'data': [float(row['total']) for row in totals],
             'backgroundColor': 'rgba(54, 162, 235, 0.2)',
             'borderColor': 'rgba(54, 162, 235, 1)',
             'borderWidth': 1
@@ -212,13 +210,7 @@ def campaign_performance_api(request):
 def update_rfm_scores(request):
     """Update RFM scores for all contacts"""
     if request.method == 'POST':
-        contacts = Contact.objects.filter(donation_count__gt=0)
-        updated_count = 0
-        
-        for contact in contacts:
-            contact.calculate_rfm_score()
-            contact.save(update_fields=['rfm_score', 'donor_segment'])
-            updated_count += 1
+        updated_count = RFMScoringService.bulk_update_scores()
         
         return JsonResponse({
             'success': True,
@@ -227,6 +219,14 @@ def update_rfm_scores(request):
     
     return JsonResponse({'success': False, 'message': 'Invalid request method'})
 
+@login_required
+def refresh_dashboard_metrics(request):
+    """Recompute the dashboard metric snapshot"""
+    if request.method == 'POST':
+        MetricComputationService.compute_all()
+    
+    return redirect('analytics:dashboard')
+
 @login_required
 def export_dashboard_data(request):
     """Export dashboard data as CSV"""
@@ -181,22 +181,21 @@ class EmailCampaign(models.Model):
         
         if self.send_to_all_subscribers:
             contacts = Contact.objects.filter(
-                preferences__email_marketing=True,
+                email_marketing=True,
                 email__isnull=False
             ).exclude(email='')
         else:
-            # Get contacts with specific tags
+            # Get contacts with any of the campaign's tags
             contacts = Contact.objects.filter(
-                tag_assignments__tag__in=self.contact_segments.all(),
-                preferences__email_marketing=True,
+                tag_ids__overlap=list(self.contact_segments.values_list('id', flat=True)),
+                email_marketing=True,
                 email__isnull=False
-            ).exclude(email='').distinct()
+            ).exclude(email='')
         
         # Exclude contacts with exclusion tags
-        if self.exclude_segments.exists():
-            contacts = contacts.exclude(
-                tag_assignments__tag__in=self.exclude_segments.all()
-            )
+        exclude_tag_ids = list(self.exclude_segments.values_list('id', flat=True))
+        if exclude_tag_ids:
+            contacts = contacts.exclude(tag_ids__overlap=exclude_tag_ids)
         
         return contacts
     
@@ -278,7 +277,7 @@ class Communication(models.Model):
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['contact', '-created_at']),
+            models.Index(fields=['contact', '-created_at', '-id']),
             models.Index(fields=['type']),
             models.Index(fields=['scheduled_date']),
             models.Index(fields=['requires_follow_up', 'follow_up_date']),
@@ -390,9 +389,10 @@ class AutomatedWorkflow(models.Model):
         
         # Check if contact is in target audience
         if not self.apply_to_all and self.contact_segments.exists():
-            contact_tags = contact.tag_assignments.values_list('tag', flat=True)
-            workflow_tags = self.contact_segments.values_list('id', flat=True)
-            if not any(tag in workflow_tags for tag in contact_tags):
+            from apps.contacts.models import Contact
+            
+            workflow_tags = list(self.contact_segments.values_list('id', flat=True))
+            if not Contact.objects.filter(pk=contact.pk, tag_ids__overlap=workflow_tags).exists():
                 return None
         
         # Calculate send time
@@ -463,22 +463,19 @@ class UnsubscribeRequest(models.Model):
     def process_unsubscribe(self, user=None):
         """Process the unsubscribe request"""
         # Update contact preferences
-        preferences = self.contact.preferences or {}
-        
         if self.unsubscribe_type == 'all_emails':
-            preferences['email_marketing'] = False
-            preferences['email_newsletters'] = False
-            preferences['email_events'] = False
-            preferences['email_transactional'] = False
+            flags = dict.fromkeys(self.contact.EMAIL_PREFERENCES, False)
         elif self.unsubscribe_type == 'marketing':
-            preferences['email_marketing'] = False
+            flags = {'email_marketing': False}
         elif self.unsubscribe_type == 'newsletters':
-            preferences['email_newsletters'] = False
+            flags = {'email_newsletters': False}
         elif self.unsubscribe_type == 'event_notifications':
-            preferences['email_events'] = False
+            flags = {'email_events': False}
+        else:
+            flags = {}
         
-        self.contact.preferences = preferences
-        self.contact.save()
+        self.contact.set_email_preferences(**flags)
+        self.contact.save(update_fields=['preferences', 'updated_at'])
         
         # Mark as processed
         self.processed = True
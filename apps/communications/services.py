@@ -292,28 +292,7 @@ class WorkflowService:
                 is_active=True
             )
             
-            # Send immediate welcome email
-            WorkflowService._send_workflow_email(
-                contact=contact,
-                template='welcome_immediate',
-                subject='Welcome to MAKE Literary Productions!',
-                delay_minutes=0
-            )
-            
-            # Schedule follow-up emails
-            WorkflowService._schedule_workflow_email(
-                contact=contact,
-                template='literary_events_intro',
-                subject='Discover Our Literary Events',
-                delay_days=3
-            )
-            
-            WorkflowService._schedule_workflow_email(
-                contact=contact,
-                template='ways_to_support',
-                subject='Ways to Support Chicago\'s Literary Scene',
-                delay_days=7
-            )
+            WorkflowService._queue_welcome_series(contact)
             
             logger.info(f"Welcome series triggered for contact {contact.id}")
             
@@ -322,6 +301,45 @@ class WorkflowService:
         except Exception as e:
             logger.error(f"Failed to trigger welcome series: {e}")
     
+    @staticmethod
+    def trigger_welcome_series_bulk(contacts: List[Contact]):
+        """Welcome series for a batch of new contacts, e.g. from an import"""
+        if not AutomatedWorkflow.objects.filter(name='new_contact_welcome', is_active=True).exists():
+            logger.warning("Welcome workflow not configured")
+            return
+        
+        for contact in contacts:
+            if contact.email:
+                WorkflowService._queue_welcome_series(contact)
+        
+        logger.info(f"Welcome series triggered for {len(contacts)} contacts")
+    
+    @staticmethod
+    def _queue_welcome_series(contact: Contact):
+        """Send the welcome email and schedule its follow-ups"""
+        # Send immediate welcome email
+        WorkflowService._send_workflow_email(
+            contact=contact,
+            template='welcome_immediate',
+            subject='Welcome to MAKE Literary Productions!',
+            delay_minutes=0
+        )
+        
+        # Schedule follow-up emails
+        WorkflowService._schedule_workflow_email(
+            contact=contact,
+            template='literary_events_intro',
+            subject='Discover Our Literary Events',
+            delay_days=3
+        )
+        
+        WorkflowService._schedule_workflow_email(
+            contact=contact,
+            template='ways_to_support',
+            subject='Ways to Support Chicago\'s Literary Scene',
+            delay_days=7
+        )
+    
     @staticmethod
     def trigger_donation_thank_you(transaction: Transaction):
         """Trigger donation thank you workflow"""
@@ -553,6 +571,18 @@ def sync_contact_to_mailchimp(contact: Contact):
         logger.warning("Mailchimp main list ID not configured")
         return {'error': 'List ID not configured'}
 
+
+def sync_contacts_to_mailchimp(contacts: List[Contact]):
+    """Helper function to sync many contacts to Mailchimp in one batch request"""
+    mailchimp = MailchimpService()
+    list_id = getattr(settings, 'MAILCHIMP_MAIN_LIST_ID', None)
+    
+    if list_id:
+        return mailchimp.bulk_sync_contacts(contacts, list_id)
+    else:
+        logger.warning("Mailchimp main list ID not configured")
+        return {'error': 'List ID not configured'}
+
 def send_donation_receipt(transaction: Transaction):
     """Helper function to send donation receipt"""
     return ReceiptService.send_receipt_email(transaction)
@@ -4,13 +4,16 @@ Handles automatic triggering of email workflows based on user actions
 """
 
 import logging
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction as db_transaction
+from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth.signals import user_logged_in
 from django.utils import timezone
 from datetime import timedelta
 
 from apps.contacts.models import Contact
+from apps.contacts.services import RFMScoringService
+from apps.contacts.signals import contacts_imported
 from apps.transactions.models import Transaction
 from .services import (
     trigger_automated_workflows,
@@ -20,6 +23,7 @@ from .services import (
     ReceiptService
 )
 from .models import Communication
+from .tasks import process_imported_contacts
 
 logger = logging.getLogger(__name__)
 
@@ -48,44 +52,31 @@ def handle_new_contact(sender, instance, created, **kwargs):
             logger.error(f"Failed to handle new contact {instance.id}: {e}")
 
 
-@receiver(post_save, sender=Contact)
-def handle_contact_update(sender, instance, created, **kwargs):
+@receiver(contacts_imported)
+def handle_imported_contacts(sender, created_ids, updated_ids, **kwargs):
     """
-    Handle contact updates - sync changes to Mailchimp if needed
+    Queue the new-contact follow-up for an import chunk as one background
+    task instead of a welcome workflow and Mailchimp call per contact
     """
-    if not created:
-        try:
-            # Check if email opt-in status changed
-            if hasattr(instance, '_state') and instance._state.adding is False:
-                # Get the previous version from database to compare
-                try:
-                    old_instance = Contact.objects.get(pk=instance.pk)
-                    
-                    # If email opt-in status changed or email changed, sync to Mailchimp
-                    if (old_instance.email_opt_in != instance.email_opt_in or 
-                        old_instance.email != instance.email):
-                        
-                        if instance.email:
-                            sync_contact_to_mailchimp(instance)
-                            logger.info(f"Contact {instance.id} re-synced to Mailchimp due to changes")
-                        
-                except Contact.DoesNotExist:
-                    pass  # This shouldn't happen, but just in case
-                    
-        except Exception as e:
-            logger.error(f"Failed to handle contact update {instance.id}: {e}")
+    if created_ids:
+        contact_ids = [str(pk) for pk in created_ids]
+        db_transaction.on_commit(lambda: process_imported_contacts.delay(contact_ids))
 
 
-@receiver(pre_save, sender=Contact)
-def store_previous_contact_state(sender, instance, **kwargs):
+@receiver(post_save, sender=Contact)
+def handle_contact_update(sender, instance, created, raw=False, **kwargs):
     """
-    Store previous state of contact for comparison in post_save
+    Handle contact updates - re-sync to Mailchimp when the email address or
+    the marketing opt-in changed
     """
-    if instance.pk:
-        try:
-            instance._previous_instance = Contact.objects.get(pk=instance.pk)
-        except Contact.DoesNotExist:
-            pass
+    if created or raw:
+        return
+    try:
+        if {'email', 'email_marketing'} & instance.changed_fields() and instance.email:
+            sync_contact_to_mailchimp(instance)
+            logger.info(f"Contact {instance.id} re-synced to Mailchimp due to changes")
+    except Exception as e:
+        logger.error(f"Failed to handle contact update {instance.id}: {e}")
 
 
 @receiver(post_save, sender=Transaction)
@@ -112,18 +103,7 @@ def handle_new_donation(sender, instance, created, **kwargs):
                 transaction=instance
             )
             
-            # Update contact's giving totals and RFM score
-            instance.contact.update_giving_totals()
-            instance.contact.calculate_rfm_score()
-            instance.contact.save(update_fields=[
-                'total_lifetime_giving', 
-                'donation_count', 
-                'last_donation_date',
-                'rfm_score',
-                'donor_segment'
-            ])
-            
-            logger.info(f"Updated RFM score for donor {instance.contact.id}")
+            # Transaction.save adds the gift to the donor's giving totals as a delta
             
         except Exception as e:
             logger.error(f"Failed to handle new donation {instance.id}: {e}")
@@ -158,16 +138,10 @@ def handle_transaction_status_change(sender, instance, created, **kwargs):
             # Handle refunded transactions
             elif instance.status == 'refunded':
                 logger.info(f"Donation refunded: {instance.id} - ${instance.amount} from {instance.contact.full_name}")
-                
-                # Update contact's giving totals
-                instance.contact.update_giving_totals()
-                instance.contact.calculate_rfm_score()
-                instance.contact.save(update_fields=[
-                    'total_lifetime_giving', 
-                    'donation_count',
-                    'rfm_score',
-                    'donor_segment'
-                ])
+                # Transaction.save subtracts the gift from the donor's giving totals as a delta
+            
+            elif instance.status == 'cancelled':
+                logger.info(f"Donation cancelled: {instance.id} - ${instance.amount} from {instance.contact.full_name}")
                 
         except Exception as e:
             logger.error(f"Failed to handle transaction status change {instance.id}: {e}")
@@ -269,21 +243,10 @@ def check_for_major_gift(sender, instance, created, **kwargs):
 def update_all_rfm_scores():
     """
     Background task to update RFM scores for all donors
-    This would typically be called by a Celery periodic task
+    Scheduled through the apps.contacts.tasks.update_rfm_scores Celery task
     """
     try:
-        contacts = Contact.objects.filter(donation_count__gt=0)
-        updated_count = 0
-        
-        for contact in contacts:
-            try:
-                contact.calculate_rfm_score()
-                contact.save(update_fields=['rfm_score', 'donor_segment'])
-                updated_count += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to update RFM score for contact {contact.id}: {e}")
-        
+        updated_count = RFMScoringService.bulk_update_scores()
         logger.info(f"Updated RFM scores for {updated_count} contacts")
         
     except Exception as e:
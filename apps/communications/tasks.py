@@ -0,0 +1,32 @@
+"""
+Celery tasks for communications follow-up work
+"""
+
+import logging
+
+from celery import shared_task
+
+from apps.contacts.models import Contact
+from .services import WorkflowService, sync_contacts_to_mailchimp
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def process_imported_contacts(contact_ids):
+    """
+    Welcome series and Mailchimp sync for contacts created by an import,
+    the batched equivalent of handle_new_contact
+    """
+    contacts = list(Contact.objects.filter(pk__in=contact_ids))
+    WorkflowService.trigger_welcome_series_bulk(contacts)
+
+    try:
+        subscribers = [contact for contact in contacts if contact.email_opt_in and contact.email]
+        if subscribers:
+            sync_contacts_to_mailchimp(subscribers)
+            logger.info(f"{len(subscribers)} imported contacts synced to Mailchimp")
+    except Exception as e:
+        logger.error(f"Failed to sync imported contacts to Mailchimp: {e}")
+
+    return len(contacts)
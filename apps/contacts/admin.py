@@ -1,14 +1,23 @@
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
-from .models import Contact, ContactRelationship, ContactTag, ContactTagAssignment
+from .services import ContactMergeService
+from .models import (
+    Contact, ContactRelationship, ContactTag, ContactTagAssignment, DuplicateCandidate, RFMScoringRun,
+    RFMThresholdSet
+)
 
 
 @admin.register(Contact)
 class ContactAdmin(admin.ModelAdmin):
     list_display = ['full_name', 'email', 'contact_type', 'donor_segment', 'total_lifetime_giving', 'last_donation_date']
-    list_filter = ['contact_type', 'donor_segment', 'source', 'created_at']
+    list_filter = ['contact_type', 'donor_segment', 'email_marketing', 'source', 'created_at']
     search_fields = ['first_name', 'last_name', 'email']
-    readonly_fields = ['id', 'total_lifetime_giving', 'donation_count', 'last_donation_date', 'rfm_score', 'created_at', 'updated_at']
+    readonly_fields = [
+        'id', 'total_lifetime_giving', 'donation_count', 'last_donation_date', 'rfm_score',
+        'household_id', 'household_total_giving', 'household_donation_count', 'household_last_donation_date',
+        'email_marketing', 'email_newsletters', 'email_events', 'email_transactional', 'created_at', 'updated_at'
+    ]
     
     fieldsets = (
         ('Basic Information', {
@@ -25,8 +34,14 @@ class ContactAdmin(admin.ModelAdmin):
             'fields': ('total_lifetime_giving', 'donation_count', 'last_donation_date', 'rfm_score', 'donor_segment'),
             'classes': ('collapse',)
         }),
+        ('Household', {
+            'fields': ('household_id', 'household_total_giving', 'household_donation_count',
+                       'household_last_donation_date'),
+            'classes': ('collapse',)
+        }),
         ('Preferences & Notes', {
-            'fields': ('preferences', 'notes'),
+            'fields': ('preferences', 'email_marketing', 'email_newsletters', 'email_events',
+                       'email_transactional', 'notes'),
             'classes': ('collapse',)
         }),
         ('System Information', {
@@ -35,10 +50,22 @@ class ContactAdmin(admin.ModelAdmin):
         }),
     )
     
+    actions = ['merge_contacts']
+    
     def full_name(self, obj):
         return obj.full_name
     full_name.short_description = 'Name'
     
+    def merge_contacts(self, request, queryset):
+        contacts = list(queryset)
+        if len(contacts) < 2:
+            self.message_user(request, "Select at least two contacts to merge.", level='error')
+            return
+        survivor = ContactMergeService.choose_survivor(contacts)
+        ContactMergeService.merge_contacts(survivor, contacts, user=request.user)
+        self.message_user(request, f"Merged {len(contacts) - 1} contacts into {survivor}.")
+    merge_contacts.short_description = "Merge selected contacts"
+    
     def save_model(self, request, obj, form, change):
         if not change:  # Creating new object
             obj.created_by = request.user
@@ -71,4 +98,72 @@ class ContactTagAdmin(admin.ModelAdmin):
 class ContactTagAssignmentAdmin(admin.ModelAdmin):
     list_display = ['contact', 'tag', 'assigned_by', 'assigned_at']
     list_filter = ['tag', 'assigned_at']
-    search_fields = ['contact__first_name', 'contact__last_name', 'tag__name']
\ No newline at end of file
+    search_fields = ['contact__first_name', 'contact__last_name', 'tag__name']
+
+
+@admin.register(RFMThresholdSet)
+class RFMThresholdSetAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'recency_days', 'frequency_counts', 'monetary_amounts', 'donor_count', 'is_active', 'created_at']
+    list_filter = ['is_active']
+    readonly_fields = ['recency_days', 'frequency_counts', 'monetary_amounts', 'donor_count', 'is_active', 'created_at']
+    actions = ['activate_thresholds']
+
+    def has_add_permission(self, request):
+        return False
+
+    def activate_thresholds(self, request, queryset):
+        if queryset.count() != 1:
+            self.message_user(request, "Select exactly one threshold set to activate.", level='error')
+            return
+        thresholds = queryset.get()
+        thresholds.activate()
+        self.message_user(request, f"{thresholds} activated. Donors are rescored on the next nightly RFM run.")
+    activate_thresholds.short_description = "Activate selected thresholds"
+
+
+@admin.register(RFMScoringRun)
+class RFMScoringRunAdmin(admin.ModelAdmin):
+    list_display = ['mode', 'scored_as_of', 'contacts_updated', 'thresholds', 'completed_at']
+    list_filter = ['mode']
+    readonly_fields = ['mode', 'scored_as_of', 'contacts_updated', 'thresholds', 'completed_at']
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(DuplicateCandidate)
+class DuplicateCandidateAdmin(admin.ModelAdmin):
+    list_display = ['contact_a', 'contact_b', 'score', 'matched_on', 'status', 'created_at']
+    list_filter = ['status']
+    search_fields = ['contact_a__first_name', 'contact_a__last_name', 'contact_a__email',
+                     'contact_b__first_name', 'contact_b__last_name', 'contact_b__email']
+    list_select_related = ['contact_a', 'contact_b']
+    readonly_fields = ['contact_a', 'contact_b', 'score', 'reasons', 'created_at', 'reviewed_at', 'reviewed_by']
+    actions = ['merge_candidates', 'dismiss_candidates']
+
+    def has_add_permission(self, request):
+        return False
+
+    def matched_on(self, obj):
+        return ', '.join(obj.reasons.get('blocks', []))
+    matched_on.short_description = 'Matched on'
+
+    def merge_candidates(self, request, queryset):
+        merged = 0
+        for candidate in queryset.filter(status='pending').select_related('contact_a', 'contact_b'):
+            # An earlier merge in this batch may already have removed one side
+            contacts = list(Contact.objects.filter(pk__in=[candidate.contact_a_id, candidate.contact_b_id]))
+            if len(contacts) < 2:
+                continue
+            survivor = ContactMergeService.choose_survivor(contacts)
+            ContactMergeService.merge_contacts(survivor, contacts, user=request.user)
+            merged += 1
+        self.message_user(request, f"Merged {merged} duplicate pairs.")
+    merge_candidates.short_description = "Merge selected pairs"
+
+    def dismiss_candidates(self, request, queryset):
+        updated = queryset.filter(status='pending').update(
+            status='dismissed', reviewed_at=timezone.now(), reviewed_by=request.user
+        )
+        self.message_user(request, f"{updated} pairs marked as not duplicates.")
+    dismiss_candidates.short_description = "Mark selected pairs as not duplicates"
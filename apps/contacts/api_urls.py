@@ -9,6 +9,10 @@ router.register(r'tags', api_views.ContactTagViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('<uuid:pk>/summary/', api_views.ContactSummaryAPIView.as_view(), name='contact_summary'),
+    path('<uuid:pk>/timeline/', api_views.ContactTimelineAPIView.as_view(), name='contact_timeline'),
+    path('<uuid:pk>/network/', api_views.ContactNetworkAPIView.as_view(), name='contact_network'),
     path('search/', api_views.ContactSearchAPIView.as_view(), name='contact_search'),
     path('bulk-update/', api_views.ContactBulkUpdateAPIView.as_view(), name='bulk_update'),
+    path('bulk-tag/', api_views.ContactBulkTagAPIView.as_view(), name='bulk_tag'),
 ]
\ No newline at end of file
@@ -0,0 +1,155 @@
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import status, viewsets
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+from .models import Contact, ContactRelationship, ContactTag
+from .pagination import ContactKeysetPagination, InvalidCursor
+from .serializers import (
+    ContactBulkTagSerializer, ContactBulkUpdateSerializer, ContactRelationshipSerializer, ContactSerializer,
+    ContactTagSerializer
+)
+from .services import ContactNetworkService, ContactSearchService, ContactSummaryService, ContactTagService
+from .timeline import ContactTimeline
+
+
+class ContactViewSet(viewsets.ModelViewSet):
+    """
+    Contacts ordered by name and paged with keyset cursors.
+    Accepts the contact list filters ``search``, ``type``, ``segment`` and ``tag``.
+    """
+    queryset = Contact.objects.all()
+    serializer_class = ContactSerializer
+    pagination_class = ContactKeysetPagination
+
+    def get_queryset(self):
+        queryset = ContactSearchService.filter_contacts(
+            self.request.query_params, super().get_queryset(), ranked=False
+        )
+        return queryset.order_by('last_name', 'first_name', 'id')
+
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user)
+
+    def perform_update(self, serializer):
+        serializer.save(updated_by=self.request.user)
+
+
+class ContactRelationshipViewSet(viewsets.ModelViewSet):
+    """Relationships between contacts, optionally filtered by ``contact``"""
+    queryset = ContactRelationship.objects.select_related('from_contact', 'to_contact')
+    serializer_class = ContactRelationshipSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        contact = self.request.query_params.get('contact')
+        if contact:
+            queryset = queryset.filter(from_contact_id=contact)
+        return queryset.order_by('-created_at')
+
+
+class ContactTagViewSet(viewsets.ModelViewSet):
+    queryset = ContactTag.objects.all()
+    serializer_class = ContactTagSerializer
+
+
+class ContactSearchAPIView(APIView):
+    """Best matches for ``q`` by name or email (at most 25)"""
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        if len(query.strip()) < 2:
+            return Response({'results': []})
+
+        contacts = ContactSearchService.search(query)[:25]
+        return Response({'results': ContactSerializer(contacts, many=True).data})
+
+
+class ContactBulkUpdateAPIView(APIView):
+    """Set the contact type and/or source on a list of contacts"""
+
+    def post(self, request):
+        serializer = ContactBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        changes = dict(serializer.validated_data)
+        contact_ids = changes.pop('contact_ids')
+        updated = Contact.objects.filter(pk__in=contact_ids).update(
+            updated_by=request.user, updated_at=timezone.now(), **changes
+        )
+
+        return Response({'updated': updated}, status=status.HTTP_200_OK)
+
+
+class ContactBulkTagAPIView(APIView):
+    """Add or remove a tag on a list of contacts or on every contact matching a filter"""
+
+    def post(self, request):
+        serializer = ContactBulkTagSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        data = serializer.validated_data
+        contacts = ContactTagService.select_contacts(
+            contact_ids=data.get('contact_ids'), filters=data.get('filters')
+        )
+        affected = ContactTagService.apply(data['tag'], data['action'], contacts, user=request.user)
+
+        return Response({'action': data['action'], 'affected': affected}, status=status.HTTP_200_OK)
+
+
+class ContactSummaryAPIView(APIView):
+    """A contact with its recent transactions, communications, event attendance, relationships and tags"""
+
+    def get(self, request, pk):
+        contact = get_object_or_404(Contact.objects.select_related('primary_contact'), pk=pk)
+        summary = ContactSummaryService.get_summary(contact)
+        return Response({'contact': ContactSerializer(contact).data, **summary})
+
+
+class ContactTimelineAPIView(APIView):
+    """
+    A contact's transactions, communications and event attendance in one
+    newest-first feed, paged with ``cursor`` and ``page_size``
+    """
+    pagination_class = ContactKeysetPagination
+
+    def get(self, request, pk):
+        contact = get_object_or_404(Contact.objects.only('pk'), pk=pk)
+        paginator = self.pagination_class()
+
+        timeline = ContactTimeline(contact, per_page=paginator.get_page_size(request))
+        try:
+            page = timeline.page(request.query_params.get(paginator.cursor_query_param))
+        except InvalidCursor as e:
+            raise NotFound(str(e))
+
+        next_link = None
+        if page.next_cursor:
+            next_link = replace_query_param(
+                request.build_absolute_uri(), paginator.cursor_query_param, page.next_cursor
+            )
+        return Response({'next': next_link, 'results': page.object_list})
+
+
+class ContactNetworkAPIView(APIView):
+    """
+    Contacts connected to a contact through relationships, with the
+    relationships between them. Accepts ``depth``, repeated ``type``
+    parameters and ``giving=1`` for giving totals.
+    """
+
+    def get(self, request, pk):
+        contact = get_object_or_404(Contact.objects.only('pk'), pk=pk)
+        try:
+            network = ContactNetworkService.network(
+                contact,
+                depth=request.query_params.get('depth', ContactNetworkService.DEFAULT_DEPTH),
+                relationship_types=request.query_params.getlist('type'),
+                include_giving=request.query_params.get('giving') in ('1', 'true'),
+            )
+        except ValueError as e:
+            raise ValidationError({'detail': str(e)})
+        return Response(network)
@@ -4,4 +4,15 @@ from django.apps import AppConfig
 class ContactsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.contacts'
-    verbose_name = 'Contact Management'
\ No newline at end of file
+    verbose_name = 'Contact Management'
+    
+    def ready(self):
+        """Import signal handlers and install the PostgreSQL search indexes after migrations"""
+        import apps.contacts.signals
+        from django.db.models.signals import post_migrate
+        post_migrate.connect(install_search_indexes, sender=self)
+
+
+def install_search_indexes(sender, using=None, **kwargs):
+    from .services import ContactSearchService
+    ContactSearchService.install_indexes(using)
@@ -128,9 +128,14 @@ class ContactRelationshipForm(forms.ModelForm):
 
 
 class BulkTagForm(forms.Form):
-    contacts = forms.ModelMultipleChoiceField(
-        queryset=Contact.objects.all(),
-        widget=forms.CheckboxSelectMultiple
+    """
+    Add or remove a tag on a set of contacts: the contacts whose ids are
+    given, or when none are given, every contact matching the contact list
+    filters the form was opened with
+    """
+    contact_ids = forms.CharField(
+        required=False,
+        widget=forms.HiddenInput
     )
     tag = forms.ModelChoiceField(
         queryset=ContactTag.objects.all(),
@@ -140,6 +145,32 @@ class BulkTagForm(forms.Form):
         choices=[('add', 'Add Tag'), ('remove', 'Remove Tag')],
         widget=forms.Select(attrs={'class': 'form-control'})
     )
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.helper = FormHelper()
+        self.helper.layout = Layout(
+            'contact_ids',
+            Row(
+                Column('tag', css_class='form-group col-md-6 mb-0'),
+                Column('action', css_class='form-group col-md-6 mb-0'),
+                css_class='form-row'
+            ),
+            Submit('submit', 'Apply', css_class='btn btn-primary')
+        )
+    
+    def clean_contact_ids(self):
+        """Comma separated contact ids, or None to use the filters"""
+        raw = self.cleaned_data.get('contact_ids', '')
+        values = [value.strip() for value in raw.split(',') if value.strip()]
+        if not values:
+            return None
+        
+        field = Contact._meta.pk
+        try:
+            return [field.to_python(value) for value in values]
+        except ValidationError:
+            raise ValidationError('Contact ids must be valid contact identifiers.')
 
 
 class ContactImportForm(forms.Form):
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from apps.contacts.services import RFMScoringService
+
+
+class Command(BaseCommand):
+    help = 'Calibrate RFM thresholds from the current donor distribution and rescore donors'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--no-activate',
+            action='store_true',
+            help='Store the calibrated thresholds without activating them or rescoring'
+        )
+
+    def handle(self, *args, **options):
+        activate = not options['no_activate']
+        thresholds = RFMScoringService.calibrate_thresholds(activate=activate)
+
+        if thresholds is None:
+            self.stdout.write(self.style.WARNING('Not enough donors to calibrate, thresholds unchanged'))
+            return
+
+        self.stdout.write(
+            f'{thresholds}: recency {thresholds.recency_days} days, '
+            f'frequency {thresholds.frequency_counts} gifts, '
+            f'monetary {thresholds.monetary_amounts}'
+        )
+
+        if activate:
+            updated = RFMScoringService.bulk_update_scores()
+            self.stdout.write(self.style.SUCCESS(f'Activated {thresholds}, updated RFM scores for {updated} contacts'))
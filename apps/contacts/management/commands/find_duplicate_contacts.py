@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.contacts.services import DuplicateDetectionService
+
+
+class Command(BaseCommand):
+    help = 'Find likely duplicate contacts and queue them for review'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-score',
+            type=float,
+            default=DuplicateDetectionService.MIN_SCORE,
+            help='Lowest similarity (0-1) worth reviewing'
+        )
+
+    def handle(self, *args, **options):
+        queued = DuplicateDetectionService.refresh_candidates(min_score=options['min_score'])
+        self.stdout.write(self.style.SUCCESS(f'Queued {queued} possible duplicate pairs for review'))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from apps.contacts.services import ContactImportService
+
+
+class Command(BaseCommand):
+    help = 'Import contacts from a CSV file (first_name, last_name, email, phone, contact_type, source)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='Path to the CSV file')
+        parser.add_argument(
+            '--no-header',
+            action='store_true',
+            help='The file has no header row; columns are in the default order'
+        )
+        parser.add_argument(
+            '--update-existing',
+            action='store_true',
+            help='Update contacts whose email is already on file instead of skipping them'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=ContactImportService.CHUNK_SIZE,
+            help='Rows validated and written per batch'
+        )
+
+    def handle(self, *args, **options):
+        with open(options['csv_file'], 'rb') as csv_file:
+            result = ContactImportService.import_csv(
+                csv_file,
+                has_header=not options['no_header'],
+                update_existing=options['update_existing'],
+                chunk_size=options['chunk_size']
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created']} created, {result['updated']} updated, "
+            f"{result['skipped']} skipped, {result['errors']} rejected"
+        ))
+        if result['error_report']:
+            self.stdout.write(self.style.WARNING(f"Error report saved as {result['error_report']}"))
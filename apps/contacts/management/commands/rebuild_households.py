@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.contacts.services import HouseholdService
+
+
+class Command(BaseCommand):
+    help = 'Regroup every contact into households and recalculate household giving'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=HouseholdService.CHUNK_SIZE,
+            help='Number of contacts written per bulk update'
+        )
+
+    def handle(self, *args, **options):
+        updated = HouseholdService.rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Updated households for {updated} contacts'))
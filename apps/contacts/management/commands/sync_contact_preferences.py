@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db.models import BooleanField, ExpressionWrapper, Q, Value
+from django.db.models.functions import Coalesce
+
+from apps.contacts.models import Contact
+
+
+class Command(BaseCommand):
+    help = 'Copy the email preference flags of every contact from its preferences JSON into their columns'
+
+    def handle(self, *args, **options):
+        # A missing key compares as NULL, which means not opted in
+        flags = {
+            name: Coalesce(
+                ExpressionWrapper(Q(**{f'preferences__{name}': True}), output_field=BooleanField()),
+                Value(False)
+            )
+            for name in Contact.EMAIL_PREFERENCES
+        }
+        updated = Contact.objects.update(**flags)
+        self.stdout.write(self.style.SUCCESS(f'Synced email preferences for {updated} contacts'))
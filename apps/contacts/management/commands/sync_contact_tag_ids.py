@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from apps.contacts.models import Contact
+from apps.contacts.services import ContactTagService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized tag_ids of every contact from its tag assignments'
+
+    def handle(self, *args, **options):
+        updated = ContactTagService.sync_tag_ids(Contact.objects.all())
+        self.stdout.write(self.style.SUCCESS(f'Synced tag ids for {updated} contacts'))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from apps.contacts.services import RFMScoringService
+
+
+class Command(BaseCommand):
+    help = 'Recalculate RFM scores and donor segments for all donors in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=RFMScoringService.CHUNK_SIZE,
+            help='Number of contacts scored and written per batch'
+        )
+        parser.add_argument(
+            '--in-database',
+            action='store_true',
+            help='Score with a single SQL UPDATE instead of loading contacts into Python'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only rescore donors whose recency bucket changed since the last run'
+        )
+
+    def handle(self, *args, **options):
+        if options['incremental']:
+            updated = RFMScoringService.refresh_recency(chunk_size=options['chunk_size'])
+        elif options['in_database']:
+            updated = RFMScoringService.update_scores_in_database()
+        else:
+            updated = RFMScoringService.bulk_update_scores(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Updated RFM scores for {updated} contacts'))
@@ -1,5 +1,10 @@
+import copy
 import uuid
-from django.db import models
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 from django.urls import reverse
 from decimal import Decimal
@@ -29,6 +34,16 @@ class Contact(models.Model):
         ('needs_attention', 'Needs Attention'),
     ]
     
+    # Communication preference flags. ``preferences`` holds them as JSON and
+    # save() copies them to indexed columns of the same name for audience queries
+    EMAIL_PREFERENCES = ['email_marketing', 'email_newsletters', 'email_events', 'email_transactional']
+    
+    # Default RFM bucket thresholds, listed from the score 5 boundary down to
+    # score 2. Used until a calibrated RFMThresholdSet is activated.
+    RFM_RECENCY_DAYS = [90, 180, 365, 730]
+    RFM_FREQUENCY_COUNTS = [10, 5, 3, 1]
+    RFM_MONETARY_AMOUNTS = [Decimal('1000'), Decimal('500'), Decimal('100'), Decimal('25')]
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
@@ -45,6 +60,10 @@ class Contact(models.Model):
     # Preferences and notes
     preferences = models.JSONField(default=dict, blank=True, help_text="Communication preferences, interests, etc.")
     notes = models.TextField(blank=True)
+    email_marketing = models.BooleanField(default=False, editable=False)
+    email_newsletters = models.BooleanField(default=False, editable=False)
+    email_events = models.BooleanField(default=False, editable=False)
+    email_transactional = models.BooleanField(default=False, editable=False)
     
     # Calculated donor analytics fields
     total_lifetime_giving = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
@@ -57,6 +76,18 @@ class Contact(models.Model):
     primary_contact = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True,
                                       help_text="Primary contact for organizations or spouses")
     
+    # Household rollup: contacts joined by spouse/partner relationships or a
+    # primary contact share the id of one member and the household's giving
+    household_id = models.UUIDField(null=True, blank=True, editable=False)
+    household_total_giving = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'),
+                                                 editable=False)
+    household_donation_count = models.IntegerField(default=0, editable=False)
+    household_last_donation_date = models.DateField(null=True, blank=True, editable=False)
+    
+    # Ids of the contact's tags, kept in step with ContactTagAssignment so
+    # tag filters are array operators (@>, &&) on this table alone
+    tag_ids = ArrayField(models.BigIntegerField(), default=list, blank=True, editable=False)
+    
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -71,6 +102,18 @@ class Contact(models.Model):
             models.Index(fields=['donor_segment']),
             models.Index(fields=['last_donation_date']),
             models.Index(fields=['total_lifetime_giving']),
+            models.Index(fields=['household_id']),
+            # Keyset pagination of the name-ordered contact list
+            models.Index(fields=['last_name', 'first_name', 'id']),
+            # Case-insensitive email matching for imports
+            models.Index(Lower('email'), name='contacts_contact_email_lower'),
+            # Tag filters and campaign audiences
+            GinIndex(fields=['tag_ids'], name='contacts_contact_tag_ids_gin'),
+            # Email campaign audiences, in list order
+            models.Index(fields=['last_name', 'first_name'], name='contacts_contact_marketing',
+                         condition=models.Q(email_marketing=True)),
+            models.Index(fields=['last_name', 'first_name'], name='contacts_contact_newsletters',
+                         condition=models.Q(email_newsletters=True)),
         ]
     
     def __str__(self):
@@ -79,6 +122,91 @@ class Contact(models.Model):
     def get_absolute_url(self):
         return reverse('contacts:detail', kwargs={'pk': self.pk})
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Keep the loaded values so saves can tell which fields changed"""
+        instance = super().from_db(db, field_names, values)
+        # Copied so in-place edits of the JSON fields still count as changes
+        instance._loaded_values = {
+            name: copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+            for name, value in zip(field_names, values)
+        }
+        return instance
+    
+    def changed_fields(self):
+        """
+        Names of the fields whose values differ from those last loaded from or
+        saved to the database. Every field counts as changed on a new contact
+        or one that was not loaded through the ORM. Deferred fields that were
+        never read are unchanged.
+        """
+        fields = self._meta.concrete_fields
+        loaded = getattr(self, '_loaded_values', None)
+        if self._state.adding or loaded is None:
+            return {field.name for field in fields}
+        return {
+            field.name for field in fields
+            if field.attname in self.__dict__
+            and (field.attname not in loaded or loaded[field.attname] != self.__dict__[field.attname])
+        }
+    
+    def _reset_loaded_values(self, update_fields=None):
+        loaded = getattr(self, '_loaded_values', {})
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__:
+                continue
+            if update_fields is not None and field.name not in update_fields:
+                continue
+            value = self.__dict__[field.attname]
+            loaded[field.attname] = copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+        self._loaded_values = loaded
+    
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._reset_loaded_values(fields)
+    
+    def save(self, *args, **kwargs):
+        """
+        Override save to copy the preference flags from the JSON into their
+        columns and start new contacts in their own household. post_save
+        receivers can still call changed_fields().
+        """
+        update_fields = kwargs.get('update_fields')
+        if self._state.adding and self.household_id is None:
+            # A new contact is a household of one until a relationship joins it to others
+            self.household_id = self.pk
+        if 'preferences' in self.__dict__ and (update_fields is None or 'preferences' in update_fields):
+            self.sync_preference_columns()
+            if update_fields is not None:
+                update_fields = kwargs['update_fields'] = set(update_fields) | set(self.EMAIL_PREFERENCES)
+        super().save(*args, **kwargs)
+        self._reset_loaded_values(update_fields)
+    
+    def sync_preference_columns(self):
+        preferences = self.preferences if isinstance(self.preferences, dict) else {}
+        for name in self.EMAIL_PREFERENCES:
+            setattr(self, name, preferences.get(name) is True)
+    
+    def set_email_preferences(self, **flags):
+        """
+        Set preference flags, e.g. ``set_email_preferences(email_marketing=False)``.
+        Updates the JSON and the columns; the caller saves.
+        """
+        unknown = set(flags) - set(self.EMAIL_PREFERENCES)
+        if unknown:
+            raise ValueError(f"Unknown email preferences: {', '.join(sorted(unknown))}")
+        
+        preferences = dict(self.preferences) if isinstance(self.preferences, dict) else {}
+        for name, value in flags.items():
+            preferences[name] = bool(value)
+        self.preferences = preferences
+        self.sync_preference_columns()
+    
+    @property
+    def email_opt_in(self):
+        """Whether the contact accepts marketing email"""
+        return self.email_marketing
+    
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
@@ -101,89 +229,78 @@ class Contact(models.Model):
         
         return ", ".join(parts)
     
-    def calculate_rfm_score(self):
+    def calculate_rfm_score(self, thresholds=None):
         """
         Calculate RFM (Recency, Frequency, Monetary) score for donor segmentation.
         Based on PRD requirements for automated donor segmentation.
+        This is the reference implementation for the bulk scorers in services.py.
+        Pass ``thresholds`` when scoring many contacts to look them up once.
         """
         from django.utils import timezone
-        from datetime import timedelta
+        
+        thresholds = thresholds or RFMThresholdSet.get_active()
         
         # Recency score (1-5, 5 being most recent)
+        recency = 1
         if self.last_donation_date:
             days_since_last = (timezone.now().date() - self.last_donation_date).days
-            if days_since_last <= 90:
-                recency = 5
-            elif days_since_last <= 180:
-                recency = 4
-            elif days_since_last <= 365:
-                recency = 3
-            elif days_since_last <= 730:
-                recency = 2
-            else:
-                recency = 1
-        else:
-            recency = 1
+            for score, max_days in zip([5, 4, 3, 2], thresholds.recency_days):
+                if days_since_last <= max_days:
+                    recency = score
+                    break
         
         # Frequency score (1-5, 5 being most frequent)
-        if self.donation_count >= 10:
-            frequency = 5
-        elif self.donation_count >= 5:
-            frequency = 4
-        elif self.donation_count >= 3:
-            frequency = 3
-        elif self.donation_count >= 1:
-            frequency = 2
-        else:
-            frequency = 1
+        frequency = 1
+        for score, min_count in zip([5, 4, 3, 2], thresholds.frequency_counts):
+            if self.donation_count >= min_count:
+                frequency = score
+                break
         
         # Monetary score (1-5, 5 being highest value)
-        if self.total_lifetime_giving >= 1000:
-            monetary = 5
-        elif self.total_lifetime_giving >= 500:
-            monetary = 4
-        elif self.total_lifetime_giving >= 100:
-            monetary = 3
-        elif self.total_lifetime_giving >= 25:
-            monetary = 2
-        else:
-            monetary = 1
+        monetary = 1
+        for score, min_amount in zip([5, 4, 3, 2], thresholds.monetary_thresholds):
+            if self.total_lifetime_giving >= min_amount:
+                monetary = score
+                break
         
         self.rfm_score = f"{recency}{frequency}{monetary}"
+        self.donor_segment = self.segment_for_rfm(recency, frequency, monetary)
         
-        # Determine donor segment based on RFM
+        return self.rfm_score
+    
+    @staticmethod
+    def segment_for_rfm(recency, frequency, monetary):
+        """Determine donor segment based on RFM"""
         if recency >= 4 and frequency >= 4 and monetary >= 4:
-            self.donor_segment = 'champions'
+            return 'champions'
         elif recency >= 4 and frequency >= 3 and monetary >= 3:
-            self.donor_segment = 'loyal_customers'
+            return 'loyal_customers'
         elif recency >= 4 and frequency <= 2:
-            self.donor_segment = 'new_customers'
+            return 'new_customers'
         elif recency <= 2 and frequency >= 3 and monetary >= 3:
-            self.donor_segment = 'at_risk'
+            return 'at_risk'
         else:
-            self.donor_segment = 'needs_attention'
-        
-        return self.rfm_score
+            return 'needs_attention'
     
     def update_giving_totals(self):
         """Update calculated giving fields based on transactions"""
         from apps.transactions.models import Transaction
         
-        donations = Transaction.objects.filter(
+        totals = Transaction.objects.filter(
             contact=self,
             type='donation',
             status='completed'
+        ).aggregate(
+            total=models.Sum('amount'),
+            count=models.Count('id'),
+            latest=models.Max('transaction_date')
         )
         
-        self.total_lifetime_giving = donations.aggregate(
-            total=models.Sum('amount')
-        )['total'] or Decimal('0.00')
+        self.total_lifetime_giving = totals['total'] or Decimal('0.00')
+        self.donation_count = totals['count']
         
-        self.donation_count = donations.count()
-        
-        latest_donation = donations.order_by('-transaction_date').first()
-        if latest_donation:
-            self.last_donation_date = latest_donation.transaction_date.date()
+        if totals['latest']:
+            self.last_donation_date = totals['latest'].date()
         
         # Recalculate RFM score
         self.calculate_rfm_score()
@@ -249,4 +366,117 @@ class ContactTagAssignment(models.Model):
         unique_together = ['contact', 'tag']
     
     def __str__(self):
-        return f"{self.contact} - {self.tag}"
\ No newline at end of file
+        return f"{self.contact} - {self.tag}"
+
+
+class RFMThresholdSet(models.Model):
+    """
+    Versioned RFM bucket thresholds calibrated from the live donor distribution.
+    Each list runs from the score 5 boundary down to score 2, like the defaults
+    on Contact. At most one set is active; without one the defaults apply.
+    """
+    CACHE_KEY = 'contacts:rfm_thresholds:active'
+    CACHE_TIMEOUT = 60 * 60
+
+    recency_days = models.JSONField(default=list)
+    frequency_counts = models.JSONField(default=list)
+    monetary_amounts = models.JSONField(default=list, help_text="Decimal amounts stored as strings")
+    donor_count = models.IntegerField(default=0, help_text="Donors in the calibration sample")
+    is_active = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        if self.pk is None:
+            return "Default RFM thresholds"
+        return f"RFM thresholds v{self.pk}"
+
+    @property
+    def monetary_thresholds(self):
+        return [Decimal(amount) for amount in self.monetary_amounts]
+
+    @classmethod
+    def default(cls):
+        """Unsaved threshold set holding the Contact defaults"""
+        return cls(
+            recency_days=list(Contact.RFM_RECENCY_DAYS),
+            frequency_counts=list(Contact.RFM_FREQUENCY_COUNTS),
+            monetary_amounts=[str(amount) for amount in Contact.RFM_MONETARY_AMOUNTS]
+        )
+
+    @classmethod
+    def get_active(cls):
+        """Thresholds currently used by every RFM scorer"""
+        thresholds = cache.get(cls.CACHE_KEY)
+        if thresholds is None:
+            thresholds = cls.objects.filter(is_active=True).first() or cls.default()
+            cache.set(cls.CACHE_KEY, thresholds, cls.CACHE_TIMEOUT)
+        return thresholds
+
+    def activate(self):
+        """Make this the only active threshold set"""
+        with transaction.atomic():
+            RFMThresholdSet.objects.filter(is_active=True).exclude(pk=self.pk).update(is_active=False)
+            self.is_active = True
+            self.save(update_fields=['is_active'])
+        cache.delete(self.CACHE_KEY)
+
+
+class RFMScoringRun(models.Model):
+    """
+    High-water mark for the RFM refresh jobs.
+    Every run records the date it scored as of, so the incremental recency
+    refresh only has to look at donors whose recency bucket changed since then.
+    """
+    MODES = [
+        ('full', 'Full Rescore'),
+        ('recency', 'Recency Boundary Refresh'),
+    ]
+
+    mode = models.CharField(max_length=20, choices=MODES)
+    scored_as_of = models.DateField()
+    contacts_updated = models.IntegerField(default=0)
+    thresholds = models.ForeignKey(RFMThresholdSet, on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='scoring_runs')
+    completed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-scored_as_of', '-completed_at']
+        get_latest_by = 'scored_as_of'
+
+    def __str__(self):
+        return f"{self.get_mode_display()} as of {self.scored_as_of}"
+
+
+class DuplicateCandidate(models.Model):
+    """
+    Pair of contacts that may be the same person, found by the duplicate
+    detection job and kept for review. ``contact_a`` always holds the lower id
+    so each pair is stored once.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending Review'),
+        ('merged', 'Merged'),
+        ('dismissed', 'Not a Duplicate'),
+    ]
+
+    contact_a = models.ForeignKey(Contact, on_delete=models.CASCADE, related_name='duplicate_candidates_as_a')
+    contact_b = models.ForeignKey(Contact, on_delete=models.CASCADE, related_name='duplicate_candidates_as_b')
+    score = models.DecimalField(max_digits=4, decimal_places=3, help_text="Similarity from 0 to 1")
+    reasons = models.JSONField(default=dict, blank=True, help_text="Matching blocking keys and component scores")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    created_at = models.DateTimeField(auto_now_add=True)
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    reviewed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+
+    class Meta:
+        ordering = ['-score', 'created_at']
+        unique_together = ['contact_a', 'contact_b']
+        indexes = [
+            models.Index(fields=['status', '-score']),
+        ]
+
+    def __str__(self):
+        return f"{self.contact_a} ~ {self.contact_b} ({self.score})"
@@ -0,0 +1,219 @@
+"""
+Keyset pagination for contact lists
+
+Pages are located by the sort key of the last row shown rather than by an
+OFFSET, so every page costs the same index range scan on
+``(last_name, first_name, id)``. Cursors are opaque url-safe tokens holding
+that sort key and the direction of travel. Totals for unfiltered lists come
+from the planner statistics instead of a full ``COUNT(*)``.
+"""
+
+import base64
+import json
+from typing import List, Optional, Sequence
+
+from django.db import connections
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def estimated_count(queryset: QuerySet) -> tuple:
+    """
+    Row count for the queryset and whether it is an estimate.
+    Unfiltered PostgreSQL tables use ``pg_class.reltuples``; anything else,
+    or a table that has never been analyzed, is counted exactly.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0], True
+    return queryset.count(), False
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset"""
+
+    def __init__(self, object_list: List, next_cursor: Optional[str], previous_cursor: Optional[str]):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Seek-method paginator over a unique ordering.
+
+    ``ordering`` must end in a unique field and every field must be
+    non-nullable; the model should carry a composite index matching it.
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int, ordering: Sequence[str]):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = list(ordering)
+
+    # Cursor tokens
+
+    @staticmethod
+    def encode_cursor(position: list, reverse: bool) -> str:
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, token: str) -> tuple:
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            position, reverse = payload['p'], bool(payload['r'])
+        except (TypeError, ValueError, KeyError):
+            raise InvalidCursor('Invalid cursor')
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise InvalidCursor('Invalid cursor')
+        return position, reverse
+
+    def _position(self, obj) -> list:
+        return [str(getattr(obj, field)) for field in self.ordering]
+
+    # Seeking
+
+    def _seek(self, position: list, reverse: bool) -> Q:
+        """
+        Rows after ``position`` in the direction of travel, written as
+        (a > x) OR (a = x AND b > y) OR ... with a leading a >= x bound so the
+        planner starts an index range scan at the cursor
+        """
+        lookup = 'lt' if reverse else 'gt'
+        bound = 'lte' if reverse else 'gte'
+
+        condition = Q()
+        for depth, field in enumerate(self.ordering):
+            branch = Q(**{f'{field}__{lookup}': position[depth]})
+            for earlier, value in zip(self.ordering[:depth], position[:depth]):
+                branch &= Q(**{earlier: value})
+            condition |= branch
+        return Q(**{f'{self.ordering[0]}__{bound}': position[0]}) & condition
+
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        """The page following (or, travelling backwards, preceding) the cursor"""
+        reverse = False
+        queryset = self.queryset
+        if cursor:
+            position, reverse = self.decode_cursor(cursor)
+            queryset = queryset.filter(self._seek(position, reverse))
+
+        order_by = [f'-{field}' if reverse else field for field in self.ordering]
+        rows = list(queryset.order_by(*order_by)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or reverse:
+                next_cursor = self.encode_cursor(self._position(rows[-1]), reverse=False)
+            if (has_more and reverse) or (cursor and not reverse):
+                previous_cursor = self.encode_cursor(self._position(rows[0]), reverse=True)
+        elif cursor:
+            # Ran off the end, e.g. rows deleted since the cursor was issued:
+            # the other direction can still lead back
+            position, _ = self.decode_cursor(cursor)
+            if reverse:
+                next_cursor = self.encode_cursor(position, reverse=False)
+            else:
+                previous_cursor = self.encode_cursor(position, reverse=True)
+
+        return KeysetPage(rows, next_cursor, previous_cursor)
+
+    def total(self) -> tuple:
+        """``(count, is_estimate)`` for the whole queryset"""
+        return estimated_count(self.queryset)
+
+
+class ContactKeysetPagination(BasePagination):
+    """
+    DRF pagination for contacts using ``KeysetPaginator``.
+    Responses carry ``next``/``previous`` cursor links and a ``count`` that is
+    estimated (``count_is_estimate``) for unfiltered lists.
+    """
+    page_size = 25
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering = ('last_name', 'first_name', 'id')
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        paginator = KeysetPaginator(queryset, self.get_page_size(request), self.ordering)
+        try:
+            self.page = paginator.page(request.query_params.get(self.cursor_query_param))
+        except InvalidCursor as e:
+            raise NotFound(str(e))
+        self.count, self.count_is_estimate = paginator.total()
+        return self.page.object_list
+
+    def _link(self, cursor: Optional[str]) -> Optional[str]:
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self._link(self.page.next_cursor)
+
+    def get_previous_link(self):
+        return self._link(self.page.previous_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'count_is_estimate': self.count_is_estimate,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'count': {'type': 'integer'},
+                'count_is_estimate': {'type': 'boolean'},
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,65 @@
+from rest_framework import serializers
+
+from .models import Contact, ContactRelationship, ContactTag
+
+
+class ContactSerializer(serializers.ModelSerializer):
+    full_name = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Contact
+        fields = [
+            'id', 'first_name', 'last_name', 'full_name', 'email', 'phone', 'address',
+            'contact_type', 'source', 'preferences', 'email_marketing', 'email_newsletters',
+            'email_events', 'email_transactional', 'notes', 'total_lifetime_giving', 'last_donation_date', 'donation_count',
+            'rfm_score', 'donor_segment', 'primary_contact', 'household_id', 'household_total_giving',
+            'household_donation_count', 'household_last_donation_date', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'total_lifetime_giving', 'last_donation_date', 'donation_count',
+            'rfm_score', 'donor_segment', 'created_at', 'updated_at'
+        ]
+
+
+class ContactRelationshipSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ContactRelationship
+        fields = ['id', 'from_contact', 'to_contact', 'relationship_type', 'notes', 'created_at']
+        read_only_fields = ['id', 'created_at']
+
+
+class ContactTagSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ContactTag
+        fields = ['id', 'name', 'description', 'color', 'created_at']
+        read_only_fields = ['id', 'created_at']
+
+
+class ContactBulkUpdateSerializer(serializers.Serializer):
+    contact_ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False)
+    contact_type = serializers.ChoiceField(choices=Contact.CONTACT_TYPES, required=False)
+    source = serializers.CharField(max_length=100, required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        if not set(attrs) - {'contact_ids'}:
+            raise serializers.ValidationError("Provide at least one field to update.")
+        return attrs
+
+
+class ContactBulkTagSerializer(serializers.Serializer):
+    """
+    A tag to add or remove on either ``contact_ids`` or every contact matching
+    ``filters`` (the contact list params ``search``, ``type``, ``segment``
+    and ``tag``; at least one must be set)
+    """
+    tag = serializers.PrimaryKeyRelatedField(queryset=ContactTag.objects.all())
+    action = serializers.ChoiceField(choices=['add', 'remove'], default='add')
+    contact_ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, required=False)
+    filters = serializers.DictField(child=serializers.CharField(allow_blank=True), required=False)
+
+    def validate(self, attrs):
+        if ('contact_ids' in attrs) == ('filters' in attrs):
+            raise serializers.ValidationError("Provide either contact_ids or filters.")
+        if 'filters' in attrs and not any(attrs['filters'].values()):
+            raise serializers.ValidationError("Set at least one filter.")
+        return attrs
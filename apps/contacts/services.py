@@ -0,0 +1,1725 @@
+"""
+Contact services for MAKE CRM
+Handles bulk donor analytics such as RFM scoring across the whole contact base,
+contact search and exports
+"""
+
+import csv
+import io
+import logging
+import tempfile
+import unicodedata
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from difflib import SequenceMatcher
+from typing import List, Optional
+
+import numpy as np
+from django.contrib.postgres.expressions import ArraySubquery
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.validators import validate_email
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import (
+    Case, CharField, Exists, OuterRef, Prefetch, Q, QuerySet, Value, When, prefetch_related_objects
+)
+from django.db.models.functions import Concat, Greatest, Lower
+from django.utils import timezone
+from openpyxl import Workbook
+
+from apps.analytics.models import DailyGivingFact
+from apps.analytics.services import GivingFactService
+from apps.communications.models import Communication
+from apps.events.models import EventAttendance
+from apps.transactions.models import CampaignDonor, Transaction
+from .models import (
+    Contact, ContactRelationship, ContactTag, ContactTagAssignment, DuplicateCandidate, RFMScoringRun,
+    RFMThresholdSet
+)
+from .signals import contacts_imported
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents so 'José' is compared as 'jose'"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold().strip()
+
+
+class RFMScoringService:
+    """
+    Batch RFM scoring engine.
+
+    Reads the scoring inputs with ``values_list().iterator()``, scores whole
+    chunks at once with ``numpy.searchsorted`` against the active
+    ``RFMThresholdSet`` used by ``Contact.calculate_rfm_score`` and writes changed rows back with
+    ``bulk_update``. ``update_scores_in_database`` expresses the same
+    thresholds as CASE expressions and rescores in a single UPDATE. The
+    per-contact method remains the reference implementation and all of them
+    must always produce identical scores.
+
+    Full runs record an ``RFMScoringRun`` high-water mark. Between full runs
+    ``refresh_recency`` only rescores donors whose days since last gift
+    crossed one of the recency boundaries; frequency and monetary scores only
+    move with new gifts, which are rescored when the transaction commits.
+
+    ``calibrate_thresholds`` derives quintile cut points from the current
+    donor distribution and stores them as a new threshold set.
+    """
+
+    CHUNK_SIZE = 2000
+
+    # Percentiles for the score 5 down to score 2 boundaries of each dimension;
+    # recency is ranked by days since last gift, so fewer days scores higher
+    RECENCY_PERCENTILES = [20, 40, 60, 80]
+    FREQUENCY_PERCENTILES = [80, 60, 40, 20]
+    MONETARY_PERCENTILES = [80, 60, 40, 20]
+    MIN_CALIBRATION_DONORS = 100
+
+    SEGMENT_RULES = [
+        ('champions', lambda r, f, m: (r >= 4) & (f >= 4) & (m >= 4)),
+        ('loyal_customers', lambda r, f, m: (r >= 4) & (f >= 3) & (m >= 3)),
+        ('new_customers', lambda r, f, m: (r >= 4) & (f <= 2)),
+        ('at_risk', lambda r, f, m: (r <= 2) & (f >= 3) & (m >= 3)),
+    ]
+
+    @staticmethod
+    def default_queryset() -> QuerySet:
+        """Contacts whose scores are maintained by the bulk jobs"""
+        return Contact.objects.filter(donation_count__gt=0)
+
+    @staticmethod
+    def score_arrays(last_donation_dates, donation_counts, lifetime_cents,
+                     today: Optional[date] = None, thresholds: Optional[RFMThresholdSet] = None):
+        """
+        Score a chunk of donors.
+
+        Takes parallel arrays of last donation dates (``datetime64[D]``, NaT for
+        never), donation counts and lifetime giving in cents, and returns the
+        recency, frequency and monetary score arrays.
+        """
+        today = np.datetime64(today or timezone.now().date(), 'D')
+        thresholds = thresholds or RFMThresholdSet.get_active()
+
+        recency_bins = np.array(sorted(thresholds.recency_days))
+        frequency_bins = np.array(sorted(thresholds.frequency_counts))
+        monetary_bins = np.array(sorted(int(amount * 100) for amount in thresholds.monetary_thresholds))
+
+        never_donated = np.isnat(last_donation_dates)
+        days_since_last = (today - last_donation_dates).astype('timedelta64[D]').astype(np.int64)
+        recency = len(recency_bins) + 1 - np.searchsorted(recency_bins, days_since_last, side='left')
+        recency[never_donated] = 1
+
+        frequency = np.searchsorted(frequency_bins, donation_counts, side='right') + 1
+        monetary = np.searchsorted(monetary_bins, lifetime_cents, side='right') + 1
+
+        return recency, frequency, monetary
+
+    @staticmethod
+    def segment_arrays(recency, frequency, monetary):
+        """Vectorized equivalent of Contact.segment_for_rfm"""
+        rules = RFMScoringService.SEGMENT_RULES
+        return np.select(
+            [condition(recency, frequency, monetary) for _, condition in rules],
+            [segment for segment, _ in rules],
+            default='needs_attention'
+        )
+
+    @staticmethod
+    def score_chunk(rows, today: Optional[date] = None, thresholds: Optional[RFMThresholdSet] = None):
+        """
+        Score rows of ``(id, last_donation_date, donation_count,
+        total_lifetime_giving, ...)`` and return ``(ids, rfm_scores, segments)``
+        """
+        ids, last_dates, counts, totals = zip(*(row[:4] for row in rows))
+
+        recency, frequency, monetary = RFMScoringService.score_arrays(
+            np.array(last_dates, dtype='datetime64[D]'),
+            np.array(counts, dtype=np.int64),
+            np.array([int(total * 100) for total in totals], dtype=np.int64),
+            today=today,
+            thresholds=thresholds
+        )
+        scores = (recency * 100 + frequency * 10 + monetary).astype(str)
+        segments = RFMScoringService.segment_arrays(recency, frequency, monetary)
+
+        return ids, scores.tolist(), segments.tolist()
+
+    @staticmethod
+    def bulk_update_scores(queryset: Optional[QuerySet] = None, chunk_size: int = CHUNK_SIZE,
+                           today: Optional[date] = None) -> int:
+        """Rescore every contact in the queryset, writing only rows whose score changed"""
+        full_run = queryset is None
+        if full_run:
+            queryset = RFMScoringService.default_queryset()
+        thresholds = RFMThresholdSet.get_active()
+
+        rows = queryset.order_by('pk').values_list(
+            'id', 'last_donation_date', 'donation_count', 'total_lifetime_giving',
+            'rfm_score', 'donor_segment'
+        ).iterator(chunk_size=chunk_size)
+
+        scored = 0
+        updated = 0
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                updated += RFMScoringService._write_chunk(chunk, chunk_size, today, thresholds)
+                scored += len(chunk)
+                chunk = []
+
+        if chunk:
+            updated += RFMScoringService._write_chunk(chunk, chunk_size, today, thresholds)
+            scored += len(chunk)
+
+        logger.info(f"Scored {scored} contacts, updated RFM scores for {updated}")
+        if full_run:
+            RFMScoringService.record_run('full', today, updated, thresholds)
+        return updated
+
+    @staticmethod
+    def _write_chunk(chunk, chunk_size: int, today: Optional[date], thresholds: RFMThresholdSet) -> int:
+        ids, scores, segments = RFMScoringService.score_chunk(chunk, today=today, thresholds=thresholds)
+
+        changed = [
+            Contact(id=pk, rfm_score=score, donor_segment=segment)
+            for pk, score, segment, row in zip(ids, scores, segments, chunk)
+            if (row[4], row[5]) != (score, segment)
+        ]
+        if changed:
+            Contact.objects.bulk_update(changed, ['rfm_score', 'donor_segment'], batch_size=chunk_size)
+        return len(changed)
+
+    @staticmethod
+    def recency_at_least(score: int, today: date, thresholds: RFMThresholdSet) -> Q:
+        """Condition matching contacts whose recency score is at least ``score``"""
+        if score <= 1:
+            return Q()
+        max_days = thresholds.recency_days[5 - score]
+        return Q(last_donation_date__gte=today - timedelta(days=max_days))
+
+    @staticmethod
+    def frequency_at_least(score: int, thresholds: RFMThresholdSet) -> Q:
+        """Condition matching contacts whose frequency score is at least ``score``"""
+        if score <= 1:
+            return Q()
+        return Q(donation_count__gte=thresholds.frequency_counts[5 - score])
+
+    @staticmethod
+    def monetary_at_least(score: int, thresholds: RFMThresholdSet) -> Q:
+        """Condition matching contacts whose monetary score is at least ``score``"""
+        if score <= 1:
+            return Q()
+        return Q(total_lifetime_giving__gte=thresholds.monetary_thresholds[5 - score])
+
+    @staticmethod
+    def _score_case(at_least) -> Case:
+        return Case(
+            *[When(at_least(score), then=Value(str(score))) for score in (5, 4, 3, 2)],
+            default=Value('1'),
+            output_field=CharField()
+        )
+
+    @staticmethod
+    def score_expressions(today: Optional[date] = None, thresholds: Optional[RFMThresholdSet] = None):
+        """
+        Database-side equivalent of Contact.calculate_rfm_score, returned as
+        ``(rfm_score, donor_segment)`` expressions for ``QuerySet.update``
+        """
+        today = today or timezone.now().date()
+        thresholds = thresholds or RFMThresholdSet.get_active()
+
+        def recency(score):
+            return RFMScoringService.recency_at_least(score, today, thresholds)
+
+        def frequency(score):
+            return RFMScoringService.frequency_at_least(score, thresholds)
+
+        def monetary(score):
+            return RFMScoringService.monetary_at_least(score, thresholds)
+
+        rfm_score = Concat(
+            RFMScoringService._score_case(recency),
+            RFMScoringService._score_case(frequency),
+            RFMScoringService._score_case(monetary),
+            output_field=CharField()
+        )
+
+        # Same rule order as Contact.segment_for_rfm
+        donor_segment = Case(
+            When(recency(4) & frequency(4) & monetary(4), then=Value('champions')),
+            When(recency(4) & frequency(3) & monetary(3), then=Value('loyal_customers')),
+            When(recency(4) & ~frequency(3), then=Value('new_customers')),
+            When(~recency(3) & frequency(3) & monetary(3), then=Value('at_risk')),
+            default=Value('needs_attention'),
+            output_field=CharField()
+        )
+
+        return rfm_score, donor_segment
+
+    @staticmethod
+    def update_scores_in_database(queryset: Optional[QuerySet] = None,
+                                  today: Optional[date] = None) -> int:
+        """Rescore every contact in the queryset with a single UPDATE statement"""
+        full_run = queryset is None
+        if full_run:
+            queryset = RFMScoringService.default_queryset()
+
+        thresholds = RFMThresholdSet.get_active()
+        rfm_score, donor_segment = RFMScoringService.score_expressions(today, thresholds)
+        updated = queryset.update(rfm_score=rfm_score, donor_segment=donor_segment)
+
+        logger.info(f"Updated RFM scores for {updated} contacts in the database")
+        if full_run:
+            RFMScoringService.record_run('full', today, updated, thresholds)
+        return updated
+
+    @staticmethod
+    def record_run(mode: str, today: Optional[date], updated: int,
+                   thresholds: RFMThresholdSet) -> RFMScoringRun:
+        """Record the high-water mark for a completed scoring run"""
+        return RFMScoringRun.objects.create(
+            mode=mode,
+            scored_as_of=today or timezone.now().date(),
+            contacts_updated=updated,
+            thresholds=thresholds if thresholds.pk else None
+        )
+
+    @staticmethod
+    def recency_crossings(since: date, today: date, thresholds: RFMThresholdSet) -> Q:
+        """
+        Condition matching donors whose recency score changed between the
+        ``since`` and ``today`` run dates.
+
+        A donor drops out of the bucket ending at ``boundary`` days once the days
+        since their last gift exceed it, i.e. for last gift dates in
+        ``[since - boundary, today - boundary)``. On consecutive daily runs each
+        range is a single date, served by the ``last_donation_date`` index.
+        """
+        crossings = Q()
+        for boundary in thresholds.recency_days:
+            crossings |= Q(
+                last_donation_date__gte=since - timedelta(days=boundary),
+                last_donation_date__lt=today - timedelta(days=boundary)
+            )
+        return crossings
+
+    @staticmethod
+    def refresh_recency(today: Optional[date] = None, chunk_size: int = CHUNK_SIZE) -> int:
+        """
+        Rescore only donors whose recency bucket changed since the last run.
+        Falls back to a full rescore when no run has been recorded yet or the
+        active thresholds changed since.
+        """
+        today = today or timezone.now().date()
+        thresholds = RFMThresholdSet.get_active()
+        last_run = RFMScoringRun.objects.order_by('-scored_as_of', '-completed_at').first()
+
+        if last_run is None:
+            logger.info("No previous RFM run recorded, running a full rescore")
+            return RFMScoringService.bulk_update_scores(chunk_size=chunk_size, today=today)
+
+        if last_run.thresholds_id != thresholds.pk:
+            logger.info(f"RFM thresholds changed to {thresholds}, running a full rescore")
+            return RFMScoringService.bulk_update_scores(chunk_size=chunk_size, today=today)
+
+        if last_run.scored_as_of >= today:
+            logger.info(f"RFM scores already current as of {last_run.scored_as_of}")
+            return 0
+
+        queryset = RFMScoringService.default_queryset().filter(
+            RFMScoringService.recency_crossings(last_run.scored_as_of, today, thresholds)
+        )
+        updated = RFMScoringService.bulk_update_scores(queryset, chunk_size=chunk_size, today=today)
+        RFMScoringService.record_run('recency', today, updated, thresholds)
+        return updated
+
+    @staticmethod
+    def calibrate_thresholds(today: Optional[date] = None, activate: bool = True) -> Optional[RFMThresholdSet]:
+        """
+        Compute quintile cut points from the current donor distribution and
+        store them as a new threshold set. Uses ``percentile_disc`` on
+        PostgreSQL and the matching ``numpy.percentile`` method elsewhere.
+        """
+        today = today or timezone.now().date()
+
+        if connection.vendor == 'postgresql':
+            donor_count, recency, frequency, monetary = RFMScoringService._quintiles_in_database(today)
+        else:
+            donor_count, recency, frequency, monetary = RFMScoringService._quintiles_in_python(today)
+
+        if donor_count < RFMScoringService.MIN_CALIBRATION_DONORS:
+            logger.warning(f"Only {donor_count} donors available, keeping current RFM thresholds")
+            return None
+
+        thresholds = RFMThresholdSet.objects.create(
+            recency_days=[int(days) for days in recency],
+            frequency_counts=[int(count) for count in frequency],
+            monetary_amounts=[str(Decimal(amount).quantize(Decimal('0.01'))) for amount in monetary],
+            donor_count=donor_count
+        )
+        if activate:
+            thresholds.activate()
+
+        logger.info(
+            f"Calibrated {thresholds} from {donor_count} donors: recency {thresholds.recency_days}, "
+            f"frequency {thresholds.frequency_counts}, monetary {thresholds.monetary_amounts}"
+        )
+        return thresholds
+
+    @staticmethod
+    def _quintiles_in_database(today: date):
+        def fractions(percentiles):
+            return [percentile / 100 for percentile in percentiles]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT COUNT(*),
+                       percentile_disc(%s::float8[]) WITHIN GROUP (ORDER BY %s::date - last_donation_date),
+                       percentile_disc(%s::float8[]) WITHIN GROUP (ORDER BY donation_count),
+                       percentile_disc(%s::float8[]) WITHIN GROUP (ORDER BY total_lifetime_giving)
+                FROM {Contact._meta.db_table}
+                WHERE donation_count > 0
+                """,
+                [
+                    fractions(RFMScoringService.RECENCY_PERCENTILES), today,
+                    fractions(RFMScoringService.FREQUENCY_PERCENTILES),
+                    fractions(RFMScoringService.MONETARY_PERCENTILES),
+                ]
+            )
+            return cursor.fetchone()
+
+    @staticmethod
+    def _quintiles_in_python(today: date):
+        rows = list(RFMScoringService.default_queryset().values_list(
+            'last_donation_date', 'donation_count', 'total_lifetime_giving'
+        ))
+        if not rows:
+            return 0, [], [], []
+
+        days = np.array([(today - last_date).days for last_date, _, _ in rows if last_date])
+        counts = np.array([count for _, count, _ in rows])
+        cents = np.array([int(total * 100) for _, _, total in rows])
+
+        # inverted_cdf returns observed values, matching percentile_disc
+        def quintiles(values, percentiles):
+            return np.percentile(values, percentiles, method='inverted_cdf').tolist()
+
+        return (
+            len(rows),
+            quintiles(days, RFMScoringService.RECENCY_PERCENTILES),
+            quintiles(counts, RFMScoringService.FREQUENCY_PERCENTILES),
+            [Decimal(int(cents_value)) / 100
+             for cents_value in quintiles(cents, RFMScoringService.MONETARY_PERCENTILES)],
+        )
+
+
+class ContactSearchService:
+    """
+    Name and email search for contact lists and autocomplete.
+
+    On PostgreSQL every query term must match first name, last name or email
+    either as a substring or, for names, as a close trigram word match, and
+    results are ranked by trigram word similarity. Both kinds of condition are
+    served by the ``pg_trgm`` GIN indexes created by ``install_indexes``.
+    Other databases keep the plain ``icontains`` search.
+    """
+
+    SEARCH_FIELDS = ['first_name', 'last_name', 'email']
+    NAME_FIELDS = ['first_name', 'last_name']
+
+    # Expression indexes match the UPPER("col"::text) LIKE form Django emits
+    # for icontains; plain column indexes serve the %> similarity operator
+    INDEX_STATEMENTS = [
+        'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+        f"""
+        CREATE INDEX IF NOT EXISTS contacts_contact_search_trgm
+        ON {Contact._meta.db_table} USING gin (
+            (UPPER(first_name::text)) gin_trgm_ops,
+            (UPPER(last_name::text)) gin_trgm_ops,
+            (UPPER(email::text)) gin_trgm_ops
+        )
+        """,
+        f"""
+        CREATE INDEX IF NOT EXISTS contacts_contact_name_trgm
+        ON {Contact._meta.db_table} USING gin (
+            first_name gin_trgm_ops,
+            last_name gin_trgm_ops
+        )
+        """,
+    ]
+
+    @staticmethod
+    def uses_trigrams() -> bool:
+        return connection.vendor == 'postgresql'
+
+    @staticmethod
+    def install_indexes(using=None):
+        """Create the pg_trgm extension and search indexes (PostgreSQL only)"""
+        db = connections[using or 'default']
+        if db.vendor != 'postgresql':
+            return
+
+        with db.cursor() as cursor:
+            for statement in ContactSearchService.INDEX_STATEMENTS:
+                cursor.execute(statement)
+        logger.info("Contact search indexes are in place")
+
+    @staticmethod
+    def search(query: str, queryset: Optional[QuerySet] = None, ranked: bool = True) -> QuerySet:
+        """
+        Contacts matching the query, best matches first.
+        With ``ranked=False`` the matches are left unordered for callers
+        that sort by name.
+        """
+        if queryset is None:
+            queryset = Contact.objects.all()
+
+        query = query.strip()
+        if not query:
+            return queryset
+
+        if not ContactSearchService.uses_trigrams():
+            return queryset.filter(
+                Q(first_name__icontains=query) |
+                Q(last_name__icontains=query) |
+                Q(email__icontains=query)
+            )
+
+        terms = query.split()
+        for term in terms:
+            matches = Q()
+            for field in ContactSearchService.SEARCH_FIELDS:
+                matches |= Q(**{f'{field}__icontains': term})
+            for field in ContactSearchService.NAME_FIELDS:
+                matches |= Q(**{f'{field}__trigram_word_similar': term})
+            queryset = queryset.filter(matches)
+
+        if not ranked:
+            return queryset
+
+        similarities = [
+            TrigramWordSimilarity(query, field) for field in ContactSearchService.SEARCH_FIELDS
+        ]
+        return queryset.annotate(
+            search_rank=Greatest(*similarities)
+        ).order_by('-search_rank', 'last_name', 'first_name')
+
+    @staticmethod
+    def autocomplete(query: str, limit: int = 10) -> List[dict]:
+        """
+        Contacts where every query word starts the email or a word of the
+        first or last name, in name order. The prefixes use the same
+        UPPER() LIKE form as icontains, so the trigram index serves them, and
+        only the returned columns are read.
+        """
+        terms = query.split()
+        if not terms:
+            return []
+
+        queryset = Contact.objects.all()
+        for term in terms:
+            matches = Q(email__istartswith=term)
+            for field in ContactSearchService.NAME_FIELDS:
+                matches |= Q(**{f'{field}__istartswith': term}) | Q(**{f'{field}__icontains': f' {term}'})
+            queryset = queryset.filter(matches)
+
+        rows = queryset.order_by('last_name', 'first_name', 'id').values_list(
+            'id', 'first_name', 'last_name', 'email', 'contact_type'
+        )[:limit]
+        return [
+            {
+                'id': str(pk),
+                'text': f"{first_name} {last_name} ({email})",
+                'email': email,
+                'type': contact_type,
+            }
+            for pk, first_name, last_name, email, contact_type in rows
+        ]
+
+    @staticmethod
+    def filter_contacts(params, queryset: Optional[QuerySet] = None, ranked: bool = True) -> QuerySet:
+        """
+        Apply the contact list filters (``search``, ``type``, ``segment`` and
+        ``tag``) from a request's query parameters
+        """
+        if queryset is None:
+            queryset = Contact.objects.all()
+
+        search_query = params.get('search')
+        if search_query:
+            queryset = ContactSearchService.search(search_query, queryset, ranked=ranked)
+
+        contact_type = params.get('type')
+        if contact_type:
+            queryset = queryset.filter(contact_type=contact_type)
+
+        segment = params.get('segment')
+        if segment:
+            queryset = queryset.filter(donor_segment=segment)
+
+        tag = params.get('tag')
+        if tag:
+            queryset = queryset.filter(tag_ids__contains=[tag])
+
+        return queryset
+
+
+class ContactExportService:
+    """
+    Streaming contact exports.
+
+    Rows are read with ``values_list().iterator()``, which uses a server-side
+    cursor on PostgreSQL, so memory stays flat however many contacts match.
+    CSV is produced as the rows arrive. XLSX goes through an openpyxl
+    write-only workbook spooled to a temporary file, because the zip
+    container can only be finished once every row is written.
+    """
+
+    CHUNK_SIZE = 2000
+    CSV_BUFFER_SIZE = 64 * 1024
+
+    COLUMNS = [
+        ('ID', 'id'),
+        ('First Name', 'first_name'),
+        ('Last Name', 'last_name'),
+        ('Email', 'email'),
+        ('Phone', 'phone'),
+        ('Street', 'address__street'),
+        ('City', 'address__city'),
+        ('State', 'address__state'),
+        ('Zip Code', 'address__zip_code'),
+        ('Contact Type', 'contact_type'),
+        ('Source', 'source'),
+        ('Donor Segment', 'donor_segment'),
+        ('RFM Score', 'rfm_score'),
+        ('Lifetime Giving', 'total_lifetime_giving'),
+        ('Donation Count', 'donation_count'),
+        ('Last Donation', 'last_donation_date'),
+        ('Created', 'created_at'),
+    ]
+
+    @staticmethod
+    def rows(queryset: QuerySet):
+        """Export rows in name order, fetched CHUNK_SIZE at a time"""
+        fields = [field for _, field in ContactExportService.COLUMNS]
+        return queryset.order_by('last_name', 'first_name', 'id').values_list(*fields).iterator(
+            chunk_size=ContactExportService.CHUNK_SIZE
+        )
+
+    @staticmethod
+    def csv_chunks(queryset: QuerySet):
+        """CSV text in blocks of roughly CSV_BUFFER_SIZE, header first"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([header for header, _ in ContactExportService.COLUMNS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+        for row in ContactExportService.rows(queryset):
+            writer.writerow(['' if value is None else value for value in row])
+            if buffer.tell() >= ContactExportService.CSV_BUFFER_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    @staticmethod
+    def _xlsx_value(value):
+        if isinstance(value, datetime):
+            # Excel has no time zones
+            return timezone.localtime(value).replace(tzinfo=None) if timezone.is_aware(value) else value
+        if value is None or isinstance(value, (str, int, float, Decimal, date)):
+            return value
+        return str(value)
+
+    @staticmethod
+    def xlsx_file(queryset: QuerySet):
+        """
+        Temporary file holding the export as an XLSX workbook, rewound to
+        the start. The caller streams it out and closes it.
+        """
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Contacts')
+        sheet.append([header for header, _ in ContactExportService.COLUMNS])
+        for row in ContactExportService.rows(queryset):
+            sheet.append([ContactExportService._xlsx_value(value) for value in row])
+
+        output = tempfile.TemporaryFile()
+        workbook.save(output)
+        output.seek(0)
+        return output
+
+
+class ContactImportService:
+    """
+    Chunked CSV contact import.
+
+    The upload is read as a stream and handled CHUNK_SIZE rows at a time:
+    rows are validated, matched to existing contacts by lowercased email
+    with one ``IN`` query on the ``Lower(email)`` index, and written with
+    ``bulk_create``/``bulk_update`` in one transaction per chunk. Bulk
+    writes skip the per-contact ``post_save`` handlers, so each committed
+    chunk sends a single ``contacts_imported`` signal for the follow-up work
+    instead. Rejected rows are collected in a CSV error report saved to
+    ``default_storage``.
+    """
+
+    CHUNK_SIZE = 1000
+    COLUMNS = ['first_name', 'last_name', 'email', 'phone', 'contact_type', 'source']
+    UPDATE_FIELDS = ['first_name', 'last_name', 'phone', 'contact_type', 'source', 'updated_by', 'updated_at']
+    ERROR_REPORT_DIR = 'contact_imports'
+
+    @staticmethod
+    def normalize_email(email: str) -> str:
+        return (email or '').strip().lower()
+
+    @staticmethod
+    def read_rows(uploaded_file, has_header: bool = True):
+        """``(line number, row dict)`` pairs streamed from the uploaded CSV"""
+        text = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+        reader = csv.reader(text)
+
+        columns = ContactImportService.COLUMNS
+        if has_header:
+            header = next(reader, None) or []
+            columns = [column.strip().lower().replace(' ', '_') for column in header]
+
+        for line_number, values in enumerate(reader, start=2 if has_header else 1):
+            if not any(value.strip() for value in values):
+                continue
+            yield line_number, dict(zip(columns, values))
+
+    @staticmethod
+    def clean_row(row: dict) -> dict:
+        """Validated contact values for one row; raises ValidationError"""
+        values = {
+            column: (row.get(column) or '').strip()
+            for column in ContactImportService.COLUMNS
+        }
+        values['email'] = ContactImportService.normalize_email(values['email'])
+
+        errors = []
+        for field in ('first_name', 'last_name'):
+            if not values[field]:
+                errors.append(f"{field} is required")
+        for field in ContactImportService.COLUMNS:
+            max_length = Contact._meta.get_field(field).max_length
+            if max_length and len(values[field]) > max_length:
+                errors.append(f"{field} is longer than {max_length} characters")
+
+        if values['email']:
+            try:
+                validate_email(values['email'])
+            except ValidationError:
+                errors.append(f"invalid email '{values['email']}'")
+        else:
+            values['email'] = None
+
+        values['contact_type'] = values['contact_type'].lower() or 'prospect'
+        if values['contact_type'] not in dict(Contact.CONTACT_TYPES):
+            errors.append(f"unknown contact type '{values['contact_type']}'")
+
+        if errors:
+            raise ValidationError('; '.join(errors))
+        return values
+
+    @staticmethod
+    def import_csv(uploaded_file, has_header: bool = True, update_existing: bool = False,
+                   user=None, chunk_size: int = CHUNK_SIZE) -> dict:
+        """
+        Import contacts from a CSV upload.
+        Returns counts of created, updated, skipped and rejected rows and the
+        storage name of the error report, if any rows were rejected.
+        """
+        result = {'created': 0, 'updated': 0, 'skipped': 0, 'errors': 0, 'error_report': None}
+
+        with tempfile.TemporaryFile(mode='w+', newline='') as report:
+            errors = csv.writer(report)
+            errors.writerow(['line'] + ContactImportService.COLUMNS + ['error'])
+
+            def reject(line_number, row, message):
+                errors.writerow(
+                    [line_number] + [row.get(column, '') for column in ContactImportService.COLUMNS] + [message]
+                )
+                result['errors'] += 1
+
+            seen_emails = set()
+            chunk = []
+            for line_number, row in ContactImportService.read_rows(uploaded_file, has_header):
+                chunk.append((line_number, row))
+                if len(chunk) >= chunk_size:
+                    ContactImportService._import_chunk(chunk, update_existing, user, seen_emails, result, reject)
+                    chunk = []
+            if chunk:
+                ContactImportService._import_chunk(chunk, update_existing, user, seen_emails, result, reject)
+
+            if result['errors']:
+                result['error_report'] = ContactImportService._save_error_report(report)
+
+        logger.info(
+            f"Contact import: {result['created']} created, {result['updated']} updated, "
+            f"{result['skipped']} skipped, {result['errors']} rejected"
+        )
+        return result
+
+    @staticmethod
+    def _import_chunk(chunk, update_existing: bool, user, seen_emails: set, result: dict, reject):
+        cleaned = []
+        for line_number, row in chunk:
+            try:
+                values = ContactImportService.clean_row(row)
+            except ValidationError as e:
+                reject(line_number, row, ' '.join(e.messages))
+                continue
+
+            email = values['email']
+            if email:
+                if email in seen_emails:
+                    reject(line_number, row, f"duplicate of an earlier row for {email}")
+                    continue
+                seen_emails.add(email)
+            cleaned.append((line_number, row, values))
+
+        emails = [values['email'] for _, _, values in cleaned if values['email']]
+        existing = {}
+        if emails:
+            matches = Contact.objects.annotate(email_lower=Lower('email')).filter(email_lower__in=emails)
+            existing = {contact.email_lower: contact for contact in matches}
+
+        now = timezone.now()
+        skipped = 0
+        to_create, to_update = [], []
+        for line_number, row, values in cleaned:
+            contact = existing.get(values['email'])
+            if contact is None:
+                contact = Contact(created_by=user, updated_by=user, **values)
+                # bulk_create skips save(), which starts new contacts in their own household
+                contact.household_id = contact.pk
+                to_create.append(contact)
+            elif update_existing:
+                for field in ('first_name', 'last_name', 'phone', 'contact_type', 'source'):
+                    if values[field]:
+                        setattr(contact, field, values[field])
+                contact.updated_by = user
+                contact.updated_at = now
+                to_update.append(contact)
+            else:
+                skipped += 1
+
+        try:
+            with transaction.atomic():
+                Contact.objects.bulk_create(to_create)
+                Contact.objects.bulk_update(to_update, ContactImportService.UPDATE_FIELDS)
+        except IntegrityError as e:
+            # Another writer added one of these emails since the lookup
+            for line_number, row, _ in cleaned:
+                reject(line_number, row, f"chunk not imported: {str(e)}")
+            return
+
+        result['created'] += len(to_create)
+        result['updated'] += len(to_update)
+        result['skipped'] += skipped
+        contacts_imported.send(
+            sender=Contact,
+            created_ids=[contact.pk for contact in to_create],
+            updated_ids=[contact.pk for contact in to_update],
+        )
+
+    @staticmethod
+    def _save_error_report(report) -> str:
+        report.seek(0)
+        name = f"{ContactImportService.ERROR_REPORT_DIR}/errors-{timezone.now():%Y%m%d-%H%M%S}.csv"
+        return default_storage.save(name, ContentFile(report.read().encode('utf-8')))
+
+
+class DuplicateDetectionService:
+    """
+    Batch duplicate-contact detection.
+
+    Every contact gets a few cheap blocking keys: a Soundex code of the last
+    name with the first initial, the normalized phone number, the email
+    local part, and the ZIP code with the last-name Soundex. Pairs are only
+    scored inside a block, which avoids comparing every contact with every
+    other. Blocks bigger than MAX_BLOCK_SIZE are too common to tell anyone
+    apart and are skipped. Pairs scoring at least MIN_SCORE replace the
+    pending ``DuplicateCandidate`` rows. Pairs already merged or dismissed
+    by a reviewer are not proposed again.
+    """
+
+    MIN_SCORE = 0.7
+    MAX_BLOCK_SIZE = 100
+    CHUNK_SIZE = 5000
+
+    # Evidence weights; fields missing on either contact are left out
+    NAME_WEIGHT = 0.5
+    FIELD_WEIGHTS = {'email': 0.2, 'phone': 0.2, 'street': 0.15, 'zip': 0.05}
+    # Matching names alone are never certain
+    NAME_ONLY_FACTOR = 0.9
+
+    GENERIC_EMAIL_LOCALS = {'info', 'admin', 'contact', 'office', 'hello', 'mail', 'noreply', 'donations'}
+
+    SOUNDEX_CODES = {
+        **dict.fromkeys('bfpv', '1'), **dict.fromkeys('cgjkqsxz', '2'),
+        **dict.fromkeys('dt', '3'), 'l': '4', **dict.fromkeys('mn', '5'), 'r': '6',
+    }
+
+    @staticmethod
+    def soundex(name: str) -> str:
+        """American Soundex code, e.g. 'Robert' and 'Rupert' are both R163"""
+        letters = [c for c in normalize(name) if c.isalpha() and c.isascii()]
+        if not letters:
+            return ''
+
+        codes = DuplicateDetectionService.SOUNDEX_CODES
+        result = letters[0].upper()
+        previous = codes.get(letters[0], '')
+        for letter in letters[1:]:
+            code = codes.get(letter, '')
+            if code and code != previous:
+                result += code
+                if len(result) == 4:
+                    break
+            if letter not in 'hw':
+                previous = code
+        return result.ljust(4, '0')
+
+    @staticmethod
+    def normalize_phone(phone: str) -> str:
+        digits = ''.join(c for c in phone or '' if c.isdigit())
+        return digits[-10:] if len(digits) >= 7 else ''
+
+    @staticmethod
+    def email_local_part(email: Optional[str]) -> str:
+        if not email or '@' not in email:
+            return ''
+        local = email.lower().split('@', 1)[0].split('+', 1)[0].replace('.', '')
+        if len(local) < 3 or local in DuplicateDetectionService.GENERIC_EMAIL_LOCALS:
+            return ''
+        return local
+
+    @staticmethod
+    def _prepare(row) -> tuple:
+        """Normalized comparison values for one contact"""
+        pk, first_name, last_name, email, phone, street, zip_code = row
+        first, last = normalize(first_name), normalize(last_name)
+        zip_code = ''.join(c for c in str(zip_code or '') if c.isdigit())[:5]
+        return (
+            pk,
+            f"{first} {last}".strip(),
+            f"{last} {first}".strip(),
+            DuplicateDetectionService.email_local_part(email),
+            DuplicateDetectionService.normalize_phone(phone),
+            ' '.join(normalize(str(street or '')).replace('.', ' ').replace(',', ' ').split()),
+            zip_code,
+            DuplicateDetectionService.soundex(last_name),
+            first[:1],
+        )
+
+    @staticmethod
+    def blocking_keys(record: tuple) -> list:
+        _, _, _, email_local, phone, _, zip_code, last_code, first_initial = record
+        keys = []
+        if last_code:
+            keys.append(('name', last_code + first_initial))
+            if zip_code:
+                keys.append(('zip', zip_code + last_code))
+        if phone:
+            keys.append(('phone', phone))
+        if email_local:
+            keys.append(('email', email_local))
+        return keys
+
+    @staticmethod
+    def score_pair(a: tuple, b: tuple, min_score: float = MIN_SCORE) -> Optional[tuple]:
+        """``(score, reasons)`` for two prepared contacts, or None below min_score"""
+        service = DuplicateDetectionService
+        evidence = {}
+        for index, field in ((3, 'email'), (4, 'phone'), (6, 'zip')):
+            if a[index] and b[index]:
+                evidence[field] = 1.0 if a[index] == b[index] else 0.0
+        has_streets = bool(a[5] and b[5])
+
+        def combine(name_similarity, fields):
+            weights = service.NAME_WEIGHT + sum(service.FIELD_WEIGHTS[field] for field in fields)
+            total = service.NAME_WEIGHT * name_similarity + sum(
+                service.FIELD_WEIGHTS[field] * value for field, value in fields.items()
+            )
+            score = total / weights
+            if not any(value >= 0.9 for value in fields.values()):
+                score *= service.NAME_ONLY_FACTOR
+            return score
+
+        # Best case with identical names and streets; skip the string
+        # comparisons when even that falls short
+        best_case = dict(evidence, street=1.0) if has_streets else evidence
+        if combine(1.0, best_case) < min_score:
+            return None
+
+        name_similarity = max(
+            SequenceMatcher(None, a[1], b[1]).ratio(),
+            SequenceMatcher(None, a[1], b[2]).ratio(),
+        )
+        if has_streets:
+            evidence['street'] = SequenceMatcher(None, a[5], b[5]).ratio()
+
+        score = combine(name_similarity, evidence)
+        if score < min_score:
+            return None
+
+        reasons = {'name': round(name_similarity, 3)}
+        reasons.update({field: round(value, 3) for field, value in evidence.items()})
+        return score, reasons
+
+    @staticmethod
+    def find_candidates(queryset: Optional[QuerySet] = None, min_score: float = MIN_SCORE) -> list:
+        """Scored candidate pairs ``(id_a, id_b, score, reasons)``, best first"""
+        service = DuplicateDetectionService
+        if queryset is None:
+            queryset = Contact.objects.all()
+
+        rows = queryset.values_list(
+            'id', 'first_name', 'last_name', 'email', 'phone', 'address__street', 'address__zip_code'
+        ).iterator(chunk_size=service.CHUNK_SIZE)
+
+        records = []
+        blocks = defaultdict(list)
+        for row in rows:
+            record = service._prepare(row)
+            for key in service.blocking_keys(record):
+                blocks[key].append(len(records))
+            records.append(record)
+
+        candidates = {}
+        oversized = 0
+        for key, members in blocks.items():
+            if len(members) < 2:
+                continue
+            if len(members) > service.MAX_BLOCK_SIZE:
+                oversized += 1
+                continue
+
+            for position, i in enumerate(members):
+                for j in members[position + 1:]:
+                    a, b = records[i], records[j]
+                    pair = (a[0], b[0]) if str(a[0]) < str(b[0]) else (b[0], a[0])
+                    if pair in candidates:
+                        candidates[pair][1]['blocks'].append(key[0])
+                        continue
+                    scored = service.score_pair(a, b, min_score)
+                    if scored is not None:
+                        score, reasons = scored
+                        reasons['blocks'] = [key[0]]
+                        candidates[pair] = (score, reasons)
+
+        if oversized:
+            logger.info(f"Duplicate detection skipped {oversized} blocks over {service.MAX_BLOCK_SIZE} contacts")
+
+        return sorted(
+            ((a, b, score, reasons) for (a, b), (score, reasons) in candidates.items()),
+            key=lambda candidate: -candidate[2]
+        )
+
+    @staticmethod
+    def refresh_candidates(queryset: Optional[QuerySet] = None, min_score: float = MIN_SCORE) -> int:
+        """Replace the pending review queue with a fresh detection pass"""
+        candidates = DuplicateDetectionService.find_candidates(queryset, min_score)
+
+        with transaction.atomic():
+            reviewed = set(
+                DuplicateCandidate.objects.exclude(status='pending').values_list('contact_a_id', 'contact_b_id')
+            )
+            DuplicateCandidate.objects.filter(status='pending').delete()
+            created = DuplicateCandidate.objects.bulk_create(
+                [
+                    DuplicateCandidate(
+                        contact_a_id=a, contact_b_id=b,
+                        score=Decimal(str(round(score, 3))), reasons=reasons
+                    )
+                    for a, b, score, reasons in candidates
+                    if (a, b) not in reviewed
+                ],
+                batch_size=1000
+            )
+
+        logger.info(f"Duplicate detection queued {len(created)} candidate pairs for review")
+        return len(created)
+
+
+class ContactMergeService:
+    """
+    Set-based merge of duplicate contacts into one survivor.
+
+    Every foreign key that points at Contact is found through model
+    introspection and re-pointed with one UPDATE per relation, so new
+    relations are merged without changes here. Rows that would break a
+    ``unique_together`` rule (the same tag, event or campaign twice) are
+    deleted in SQL first, keeping the survivor's row. Relationships between
+    the merged contacts themselves are dropped. Derived per-contact data
+    (campaign donor sets and daily giving facts) is rebuilt rather than
+    moved, and the survivor's giving totals and household are refreshed once
+    on commit.
+    """
+
+    # Fields copied from a victim when blank on the survivor
+    FILL_FIELDS = ['email', 'phone', 'source', 'address']
+
+    # Models whose rows only link two contacts, dropped when both ends are
+    # merged. Rows of other models (gifts credited to the same contact as
+    # donor and honoree, say) are re-pointed like any other.
+    LINK_MODELS = [ContactRelationship]
+
+    @staticmethod
+    def choose_survivor(contacts) -> Contact:
+        """The contact with the most giving history, then the oldest record"""
+        return min(
+            contacts,
+            key=lambda contact: (-contact.donation_count, -contact.total_lifetime_giving, contact.created_at)
+        )
+
+    @staticmethod
+    def _contact_relations():
+        """``(model, fk field names)`` for every model with a foreign key to Contact"""
+        relations = {}
+        for related in Contact._meta.related_objects:
+            if related.many_to_many:
+                continue  # through tables carry their own foreign keys
+            relations.setdefault(related.related_model, []).append(related.field.name)
+        return relations.items()
+
+    @staticmethod
+    def _repoint(model, field: str, survivor_id, victim_ids: list) -> int:
+        manager = model._base_manager
+        rows = manager.filter(**{f'{field}__in': victim_ids})
+
+        for unique in model._meta.unique_together:
+            if field not in unique:
+                continue
+            match = {other: OuterRef(other) for other in unique if other != field}
+            # The survivor already has this row
+            rows.filter(Exists(manager.filter(**{field: survivor_id}, **match))).delete()
+            # Two victims share it: keep the first
+            rows.filter(Exists(
+                manager.filter(**{f'{field}__in': victim_ids, 'pk__lt': OuterRef('pk')}, **match)
+            )).delete()
+
+        return rows.update(**{field: survivor_id})
+
+    @staticmethod
+    def merge_contacts(survivor: Contact, victims, user=None) -> dict:
+        """
+        Move everything attached to the victims onto the survivor and delete
+        the victims. Returns the number of re-pointed rows per relation.
+        """
+        # Imported here because apps.transactions.services imports this module
+        from apps.transactions.services import GivingTotalsRefresher
+
+        victims = [victim for victim in victims if victim.pk != survivor.pk]
+        if not victims:
+            return {}
+        victim_ids = [victim.pk for victim in victims]
+        group_ids = victim_ids + [survivor.pk]
+
+        # Rebuilt from transactions instead of moved
+        derived = {CampaignDonor, DailyGivingFact, DuplicateCandidate}
+
+        moved = {}
+        with transaction.atomic():
+            campaign_ids = set(
+                CampaignDonor.objects.filter(contact_id__in=victim_ids).values_list('campaign_id', flat=True)
+            )
+            fact_dates = set(
+                DailyGivingFact.objects.filter(contact_id__in=victim_ids).values_list('date', flat=True)
+            )
+
+            for model, fields in ContactMergeService._contact_relations():
+                if model in derived:
+                    continue
+                if model in ContactMergeService.LINK_MODELS:
+                    # Links between the merged contacts would point at the survivor itself
+                    model._base_manager.filter(**{f'{name}__in': group_ids for name in fields}).delete()
+                for field in fields:
+                    if model is Contact:
+                        updated = Contact.objects.filter(
+                            **{f'{field}__in': victim_ids}
+                        ).exclude(pk__in=victim_ids).update(**{field: survivor.pk})
+                    else:
+                        updated = ContactMergeService._repoint(model, field, survivor.pk, victim_ids)
+                    if updated:
+                        moved[f'{model._meta.label}.{field}'] = updated
+
+            for field in ContactMergeService.FILL_FIELDS:
+                if not getattr(survivor, field):
+                    for victim in victims:
+                        if getattr(victim, field):
+                            setattr(survivor, field, getattr(victim, field))
+                            break
+            notes = [victim.notes for victim in victims if victim.notes]
+            if notes:
+                survivor.notes = '\n\n'.join([survivor.notes] + notes if survivor.notes else notes)
+            if survivor.primary_contact_id in victim_ids:
+                survivor.primary_contact = None
+            survivor.updated_by = user
+
+            # Victims go first so the survivor can take over a unique email
+            Contact.objects.filter(pk__in=victim_ids).delete()
+            survivor.save()
+            ContactTagService.sync_tag_ids(Contact.objects.filter(pk=survivor.pk))
+            survivor.refresh_from_db(fields=['tag_ids'])
+
+            GivingTotalsRefresher.mark_dirty(contact_ids=[survivor.pk], campaign_ids=campaign_ids)
+            if fact_dates:
+                GivingFactService.schedule_rebuild(fact_dates)
+            # Records were moved with update(), which sends no signals
+            transaction.on_commit(lambda: ContactSummaryService.invalidate([survivor.pk]))
+            transaction.on_commit(lambda: HouseholdService.refresh_households([survivor.pk]))
+
+        logger.info(f"Merged {len(victim_ids)} contacts into {survivor.pk}: {moved}")
+        return moved
+
+
+class ContactTagService:
+    """
+    Set-based tagging.
+
+    Adding a tag is a single ``INSERT ... SELECT ... ON CONFLICT DO NOTHING``
+    over the selected contacts, so contacts that already carry the tag are
+    skipped by the database. Removing it is a queryset DELETE. Contacts are
+    chosen by an id list or by at least one contact list filter; an
+    unfiltered queryset is refused.
+
+    ``Contact.tag_ids`` mirrors the assignments. Receivers on assignment
+    saves and deletes, queryset and cascading deletes included, re-sync the
+    contacts they touched with one UPDATE per transaction; the raw INSERT
+    that adds a tag re-syncs its contacts itself.
+    """
+
+    @staticmethod
+    def sync_tag_ids(contacts: QuerySet) -> int:
+        """Rewrite ``tag_ids`` from the tag assignments of every contact in the queryset"""
+        tag_ids = ContactTagAssignment.objects.filter(
+            contact=OuterRef('pk')
+        ).order_by('tag_id').values('tag_id')
+        return Contact.objects.filter(
+            pk__in=contacts.order_by().values('pk')
+        ).update(tag_ids=ArraySubquery(tag_ids))
+
+    @staticmethod
+    def select_contacts(contact_ids=None, filters=None) -> QuerySet:
+        """Contacts by explicit ids, or by the ContactListView filter params"""
+        if contact_ids is not None:
+            return Contact.objects.filter(pk__in=contact_ids)
+        return ContactSearchService.filter_contacts(filters or {}, ranked=False)
+
+    @staticmethod
+    def _require_selection(contacts: QuerySet):
+        """Refuse to tag or untag the whole contact base by accident"""
+        if not contacts.query.has_filters():
+            raise ValidationError("Select contacts by id or by at least one filter.")
+
+    @staticmethod
+    def add_tag(tag, contacts: QuerySet, user=None) -> int:
+        """Tag every contact in the queryset; returns the number newly tagged"""
+        ContactTagService._require_selection(contacts)
+        try:
+            contact_sql, contact_params = contacts.order_by().values('pk').query.sql_with_params()
+        except EmptyResultSet:
+            return 0  # e.g. an empty id list
+        meta = ContactTagAssignment._meta
+        columns = [meta.get_field(name).column for name in ('contact', 'tag', 'assigned_by', 'assigned_at')]
+
+        connection = connections[contacts.db]
+        qn = connection.ops.quote_name
+        # WHERE true keeps SQLite from reading ON CONFLICT as part of the SELECT
+        sql = (
+            f"INSERT INTO {qn(meta.db_table)} ({', '.join(qn(column) for column in columns)}) "
+            f"SELECT selected.{qn(Contact._meta.pk.column)}, %s, %s, %s FROM ({contact_sql}) selected WHERE true "
+            f"ON CONFLICT ({qn(columns[0])}, {qn(columns[1])}) DO NOTHING"
+        )
+        params = [tag.pk, user.pk if user else None, timezone.now()] + list(contact_params)
+        params = [connection.ops.adapt_datetimefield_value(value) if isinstance(value, datetime) else value
+                  for value in params]
+
+        # Assignments and tag_ids are written together or not at all
+        with transaction.atomic(using=contacts.db):
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                added = cursor.rowcount
+            ContactTagService.sync_tag_ids(contacts.exclude(tag_ids__contains=[tag.pk]))
+
+        logger.info(f"Tagged {added} contacts with '{tag}'")
+        return added
+
+    @staticmethod
+    def remove_tag(tag, contacts: QuerySet) -> int:
+        """Untag every contact in the queryset; returns the number untagged"""
+        ContactTagService._require_selection(contacts)
+        # The post_delete receivers re-sync the untagged contacts with one UPDATE on commit
+        removed, _ = ContactTagAssignment.objects.filter(
+            tag=tag, contact__in=contacts.order_by().values('pk')
+        ).delete()
+
+        logger.info(f"Removed tag '{tag}' from {removed} contacts")
+        return removed
+
+    @staticmethod
+    def apply(tag, action: str, contacts: QuerySet, user=None) -> int:
+        if action == 'remove':
+            return ContactTagService.remove_tag(tag, contacts)
+        return ContactTagService.add_tag(tag, contacts, user)
+
+
+class ContactSummaryService:
+    """
+    Everything the contact 360 view shows, in a fixed number of queries.
+
+    The recent transactions, communications, event attendance and
+    relationships are fetched with sliced ``Prefetch`` objects and cached
+    under the contact's current summary version. Writes to those records
+    replace the version once committed, so a stale summary is never read
+    again and simply expires. Tags come from ``Contact.tag_ids`` on every
+    request, since bulk tagging does not touch individual contacts.
+    """
+
+    RECENT_LIMIT = 10
+    CACHE_TIMEOUT = 60 * 60
+    VERSION_KEY = 'contacts:summary:version:{}'
+    CACHE_KEY = 'contacts:summary:{}:{}'
+
+    # Versions
+
+    @staticmethod
+    def _version(contact_id) -> str:
+        key = ContactSummaryService.VERSION_KEY.format(contact_id)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            version = cache.get(key)
+        return version
+
+    @staticmethod
+    def invalidate(contact_ids):
+        """Give the contacts new summary versions; call once the change is committed"""
+        cache.set_many(
+            {ContactSummaryService.VERSION_KEY.format(pk): uuid.uuid4().hex for pk in contact_ids if pk},
+            timeout=None
+        )
+
+    # Building
+
+    @staticmethod
+    def _prefetches() -> list:
+        limit = ContactSummaryService.RECENT_LIMIT
+        return [
+            Prefetch(
+                'transactions',
+                queryset=Transaction.objects.filter(status='completed').select_related(
+                    'campaign'
+                ).order_by('-transaction_date')[:limit],
+                to_attr='summary_transactions'
+            ),
+            Prefetch(
+                'communications',
+                queryset=Communication.objects.select_related('author').order_by('-created_at')[:limit],
+                to_attr='summary_communications'
+            ),
+            Prefetch(
+                'event_attendance',
+                queryset=EventAttendance.objects.select_related('event').order_by('-event__event_date')[:limit],
+                to_attr='summary_attendance'
+            ),
+            Prefetch(
+                'relationships_from',
+                queryset=ContactRelationship.objects.select_related('to_contact').order_by('-created_at'),
+                to_attr='summary_relationships'
+            ),
+        ]
+
+    @staticmethod
+    def build(contact: Contact) -> dict:
+        """The cacheable sections of the summary, read with one query per section"""
+        # Prefetched onto a bare instance: prefetching skips attributes that
+        # are already set, so a rebuild on the caller's contact would reuse old lists
+        contact = Contact(pk=contact.pk)
+        prefetch_related_objects([contact], *ContactSummaryService._prefetches())
+
+        return {
+            'recent_transactions': [
+                {
+                    'id': str(gift.id),
+                    'transaction_date': gift.transaction_date,
+                    'type': gift.type,
+                    'amount': gift.amount,
+                    'campaign': gift.campaign.name if gift.campaign else None,
+                }
+                for gift in contact.summary_transactions
+            ],
+            'recent_communications': [
+                {
+                    'id': str(communication.id),
+                    'created_at': communication.created_at,
+                    'type': communication.type,
+                    'direction': communication.direction,
+                    'subject': communication.subject,
+                    'author': communication.author.get_full_name() if communication.author else None,
+                }
+                for communication in contact.summary_communications
+            ],
+            'event_attendance': [
+                {
+                    'id': str(attendance.id),
+                    'event_id': str(attendance.event_id),
+                    'event': attendance.event.name,
+                    'event_date': attendance.event.event_date,
+                    'attendance_status': attendance.attendance_status,
+                }
+                for attendance in contact.summary_attendance
+            ],
+            'relationships': [
+                {
+                    'id': str(relationship.id),
+                    'relationship_type': relationship.relationship_type,
+                    'contact_id': str(relationship.to_contact_id),
+                    'contact': relationship.to_contact.full_name,
+                }
+                for relationship in contact.summary_relationships
+            ],
+        }
+
+    @staticmethod
+    def get_summary(contact: Contact) -> dict:
+        """Summary sections for a loaded contact, from the cache when current"""
+        key = ContactSummaryService.CACHE_KEY.format(contact.pk, ContactSummaryService._version(contact.pk))
+        summary = cache.get(key)
+        if summary is None:
+            summary = ContactSummaryService.build(contact)
+            cache.set(key, summary, timeout=ContactSummaryService.CACHE_TIMEOUT)
+
+        tags = ContactTag.objects.filter(pk__in=contact.tag_ids).values('id', 'name', 'color')
+        return {**summary, 'tags': list(tags)}
+
+
+class ContactNetworkService:
+    """
+    Relationship networks around a contact.
+
+    One recursive CTE walks ``ContactRelationship`` in both directions up to
+    a depth limit, optionally over some relationship types only, and the
+    same statement returns the reached contacts and the relationships
+    between them. The walk keeps one row per contact and depth (``UNION``,
+    not ``UNION ALL``), so cycles cannot loop and the work is bounded by
+    contacts times depth rather than by the number of paths.
+    """
+
+    DEFAULT_DEPTH = 2
+    MAX_DEPTH = 4
+    MAX_NODES = 500
+
+    @staticmethod
+    def _network_sql(type_count: int) -> str:
+        contact_table = Contact._meta.db_table
+        relationship_table = ContactRelationship._meta.db_table
+        type_filter = edge_filter = '1 = 1'
+        if type_count:
+            placeholders = ', '.join(['%s'] * type_count)
+            type_filter = f"relationship_type IN ({placeholders})"
+            edge_filter = f"r.relationship_type IN ({placeholders})"
+
+        return f"""
+            WITH RECURSIVE edges(source_id, target_id) AS (
+                SELECT from_contact_id, to_contact_id FROM {relationship_table} WHERE {type_filter}
+                UNION ALL
+                SELECT to_contact_id, from_contact_id FROM {relationship_table} WHERE {type_filter}
+            ),
+            walk(contact_id, depth) AS (
+                SELECT %s, 0
+                UNION
+                SELECT edges.target_id, walk.depth + 1
+                FROM walk JOIN edges ON edges.source_id = walk.contact_id
+                WHERE walk.depth < %s
+            ),
+            nodes(contact_id, depth) AS (
+                SELECT contact_id, MIN(depth) FROM walk
+                GROUP BY contact_id
+                ORDER BY MIN(depth), contact_id
+                LIMIT %s
+            )
+            SELECT 'node', c.id, NULL, NULL, NULL, nodes.depth, c.first_name, c.last_name,
+                   c.contact_type, c.total_lifetime_giving, c.donation_count, c.last_donation_date
+            FROM nodes JOIN {contact_table} c ON c.id = nodes.contact_id
+            UNION ALL
+            SELECT 'edge', r.id, r.from_contact_id, r.to_contact_id, r.relationship_type, NULL, NULL, NULL,
+                   NULL, NULL, NULL, NULL
+            FROM {relationship_table} r
+            WHERE {edge_filter}
+              AND r.from_contact_id IN (SELECT contact_id FROM nodes)
+              AND r.to_contact_id IN (SELECT contact_id FROM nodes)
+        """
+
+    @staticmethod
+    def _uuid(value) -> Optional[str]:
+        return str(uuid.UUID(str(value))) if value is not None else None
+
+    @staticmethod
+    def network(contact: Contact, depth: int = DEFAULT_DEPTH, relationship_types=None,
+                include_giving: bool = False) -> dict:
+        """
+        The contacts within ``depth`` relationships of ``contact`` and the
+        relationships between them, as ``{'nodes': [...], 'edges': [...]}``.
+        With ``include_giving`` each node carries its giving totals and the
+        result a ``giving`` summary over the connected donors.
+        """
+        depth = max(0, min(int(depth), ContactNetworkService.MAX_DEPTH))
+        relationship_types = list(relationship_types or [])
+        valid_types = {choice for choice, _ in ContactRelationship.RELATIONSHIP_TYPES}
+        unknown = set(relationship_types) - valid_types
+        if unknown:
+            raise ValueError(f"Unknown relationship types: {', '.join(sorted(unknown))}")
+
+        contact_id = Contact._meta.pk.get_db_prep_value(contact.pk, connection)
+        params = (
+            relationship_types * 2
+            # One node past the cap tells a truncated network from one of exactly MAX_NODES
+            + [contact_id, depth, ContactNetworkService.MAX_NODES + 1]
+            + relationship_types
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(ContactNetworkService._network_sql(len(relationship_types)), params)
+            rows = cursor.fetchall()
+
+        nodes = []
+        edges = []
+        for (kind, row_id, from_id, to_id, relationship_type, node_depth, first_name, last_name,
+             contact_type, total_giving, donation_count, last_donation_date) in rows:
+            if kind == 'edge':
+                edges.append({
+                    'id': ContactNetworkService._uuid(row_id),
+                    'from_contact': ContactNetworkService._uuid(from_id),
+                    'to_contact': ContactNetworkService._uuid(to_id),
+                    'relationship_type': relationship_type,
+                })
+                continue
+            node = {
+                'id': ContactNetworkService._uuid(row_id),
+                'name': f"{first_name} {last_name}",
+                'contact_type': contact_type,
+                'depth': node_depth,
+            }
+            if include_giving:
+                # Raw rows skip the field converters, e.g. SQLite returns dates as text
+                node['total_lifetime_giving'] = Contact._meta.get_field('total_lifetime_giving').to_python(
+                    total_giving or 0
+                ).quantize(Decimal('0.01'))
+                node['donation_count'] = donation_count or 0
+                node['last_donation_date'] = Contact._meta.get_field('last_donation_date').to_python(
+                    last_donation_date
+                )
+            nodes.append(node)
+
+        truncated = len(nodes) > ContactNetworkService.MAX_NODES
+        if truncated:
+            # The extra node comes last in (depth, id) order; drop it and its edges
+            extra = max(nodes, key=lambda node: (node['depth'], node['id']))
+            nodes.remove(extra)
+            edges = [edge for edge in edges if extra['id'] not in (edge['from_contact'], edge['to_contact'])]
+
+        nodes.sort(key=lambda node: (node['depth'], node['name']))
+        result = {
+            'root': ContactNetworkService._uuid(contact.pk),
+            'depth': depth,
+            'nodes': nodes,
+            'edges': edges,
+            'truncated': truncated,
+        }
+        if include_giving:
+            donors = [node for node in nodes if node['donation_count']]
+            result['giving'] = {
+                'donors': len(donors),
+                'total_lifetime_giving': sum(
+                    (node['total_lifetime_giving'] for node in donors), Decimal('0.00')
+                ),
+            }
+        return result
+
+
+class _UnionFind:
+    """Disjoint sets of contact ids with path halving and union by size"""
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def add(self, item):
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+
+    def find(self, item):
+        self.add(item)
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+
+class HouseholdService:
+    """
+    Household rollup over spouse/partner relationships and primary contacts.
+
+    The household edges are loaded once and grouped with a union-find pass in
+    Python; every member then stores the household id (its smallest contact
+    id) and the household's lifetime giving, donation count and last gift,
+    written with ``bulk_update`` for the rows that changed. Household reports
+    are a plain GROUP BY on ``household_id``.
+
+    Relationship and primary contact changes regroup only the households
+    they touch, and giving changes re-add the totals of the donors'
+    households; ``rebuild`` regroups every contact.
+    """
+
+    HOUSEHOLD_RELATIONSHIPS = ('spouse', 'partner')
+    CHUNK_SIZE = 2000
+
+    FIELDS = [
+        'household_id',
+        'household_total_giving',
+        'household_donation_count',
+        'household_last_donation_date',
+    ]
+
+    # Loaded per contact: id, giving, then the stored household fields
+    ROW_FIELDS = ['id', 'total_lifetime_giving', 'donation_count', 'last_donation_date'] + FIELDS
+
+    @staticmethod
+    def relationship_edges(relationships: Optional[QuerySet] = None):
+        """``(from_contact_id, to_contact_id)`` of the household relationships"""
+        if relationships is None:
+            relationships = ContactRelationship.objects.all()
+        return relationships.filter(
+            relationship_type__in=HouseholdService.HOUSEHOLD_RELATIONSHIPS
+        ).order_by().values_list('from_contact_id', 'to_contact_id')
+
+    @staticmethod
+    def primary_contact_edges(contacts: Optional[QuerySet] = None):
+        """``(contact_id, primary_contact_id)`` of contacts with a primary contact"""
+        if contacts is None:
+            contacts = Contact.objects.all()
+        return contacts.filter(primary_contact__isnull=False).order_by().values_list('id', 'primary_contact_id')
+
+    @staticmethod
+    def _write(rows, household_of, chunk_size: int = CHUNK_SIZE) -> int:
+        """
+        Total the giving of each household in ``rows`` and write the household
+        fields of every row whose stored values differ. ``household_of`` maps
+        a contact id to any key shared by its household.
+        """
+        members = {}
+        for row in rows:
+            members.setdefault(household_of(row[0]), []).append(row)
+
+        changed = []
+        for household in members.values():
+            household_id = min(row[0] for row in household)
+            values = (
+                household_id,
+                sum((row[1] for row in household), Decimal('0.00')),
+                sum(row[2] for row in household),
+                max((row[3] for row in household if row[3] is not None), default=None),
+            )
+            for row in household:
+                if tuple(row[4:]) != values:
+                    changed.append(Contact(id=row[0], **dict(zip(HouseholdService.FIELDS, values))))
+
+        if changed:
+            Contact.objects.bulk_update(changed, HouseholdService.FIELDS, batch_size=chunk_size)
+        return len(changed)
+
+    @staticmethod
+    def rebuild(chunk_size: int = CHUNK_SIZE) -> int:
+        """Regroup every contact into households; returns the number of contacts updated"""
+        forest = _UnionFind()
+        for edges in (HouseholdService.relationship_edges(), HouseholdService.primary_contact_edges()):
+            for a, b in edges.iterator(chunk_size=chunk_size):
+                forest.union(a, b)
+
+        rows = list(Contact.objects.order_by().values_list(
+            *HouseholdService.ROW_FIELDS
+        ).iterator(chunk_size=chunk_size))
+        updated = HouseholdService._write(rows, forest.find, chunk_size)
+
+        logger.info(f"Grouped {len(rows)} contacts into households, updated {updated}")
+        return updated
+
+    @staticmethod
+    def refresh_households(contact_ids=(), household_ids=()) -> int:
+        """
+        Regroup the households of the given contacts and households after
+        their relationships or primary contacts changed. The current members
+        of those households are regrouped too, so a removed link splits them.
+        """
+        contact_ids = {pk for pk in contact_ids if pk is not None}
+        household_ids = {pk for pk in household_ids if pk is not None}
+        if not contact_ids and not household_ids:
+            return 0
+
+        household_ids |= set(
+            Contact.objects.filter(pk__in=contact_ids, household_id__isnull=False).values_list('household_id', flat=True)
+        )
+        seen = contact_ids | set(
+            Contact.objects.filter(household_id__in=household_ids).values_list('pk', flat=True)
+        )
+
+        # Follow the household edges out from the seeds until no new contacts turn up
+        forest = _UnionFind()
+        frontier = seen
+        while frontier:
+            edges = list(HouseholdService.relationship_edges(
+                ContactRelationship.objects.filter(Q(from_contact__in=frontier) | Q(to_contact__in=frontier))
+            ))
+            edges += HouseholdService.primary_contact_edges(
+                Contact.objects.filter(Q(pk__in=frontier) | Q(primary_contact__in=frontier))
+            )
+            frontier = set()
+            for a, b in edges:
+                forest.union(a, b)
+                frontier.update(pk for pk in (a, b) if pk not in seen)
+            seen |= frontier
+
+        rows = list(Contact.objects.filter(pk__in=seen).values_list(*HouseholdService.ROW_FIELDS))
+        return HouseholdService._write(rows, forest.find)
+
+    @staticmethod
+    def refresh_totals(contact_ids) -> int:
+        """Re-add the household giving of the given contacts' households after their giving changed"""
+        contact_ids = {pk for pk in contact_ids if pk is not None}
+        if not contact_ids:
+            return 0
+
+        households = Contact.objects.filter(pk__in=contact_ids, household_id__isnull=False).values('household_id')
+        rows = list(Contact.objects.filter(
+            Q(household_id__in=households) | Q(pk__in=contact_ids)
+        ).values_list(*HouseholdService.ROW_FIELDS))
+        # Contacts written before households existed count alone until the next rebuild
+        household_of = {row[0]: row[4] or row[0] for row in rows}
+        return HouseholdService._write(rows, household_of.get)
@@ -0,0 +1,195 @@
+"""
+Django signals keeping tag_ids in step with tag assignments, households in
+step with relationships and cached contact summaries current, and the signal
+sent for contacts written in bulk
+"""
+
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from .models import Contact, ContactRelationship, ContactTagAssignment
+
+# Sent once per committed import chunk with ``created_ids`` and
+# ``updated_ids``, in place of the per-contact post_save handlers that
+# bulk_create and bulk_update skip
+contacts_imported = Signal()
+
+
+class _PendingContacts:
+    """Contact ids collected in the current transaction for one action on commit"""
+
+    def __init__(self, key, action):
+        self.key = key
+        self.action = action
+        self.contact_ids = set()
+
+    def flush(self):
+        if _pending_contacts().get(self.key) is self:
+            del _pending_contacts()[self.key]
+        self.action(self.contact_ids)
+
+
+_local = threading.local()
+
+
+def _pending_contacts():
+    """Per-thread map of (action name, database alias) to its pending ids"""
+    if not hasattr(_local, 'pending'):
+        _local.pending = {}
+    return _local.pending
+
+
+def _on_commit_for_contacts(name, action, contact_ids, using=None):
+    """
+    Run ``action`` once with every contact id collected for ``name`` when the
+    transaction commits, so a batch of many rows costs one call instead of one
+    callback per row
+    """
+    connection = transaction.get_connection(using)
+    key = (name, connection.alias)
+    pending = _pending_contacts().get(key)
+    # A rollback since the flush was registered discards it
+    scheduled = pending is not None and connection.in_atomic_block and any(
+        getattr(callback[1], '__self__', None) is pending for callback in connection.run_on_commit
+    )
+    if not scheduled:
+        pending = _pending_contacts()[key] = _PendingContacts(key, action)
+        pending.contact_ids.update(pk for pk in contact_ids if pk is not None)
+        # Runs immediately when not inside an atomic block
+        transaction.on_commit(pending.flush, using=connection.alias)
+    else:
+        pending.contact_ids.update(pk for pk in contact_ids if pk is not None)
+
+
+def _sync_contact_tag_ids(contact_ids):
+    from .services import ContactTagService
+
+    ContactTagService.sync_tag_ids(Contact.objects.filter(pk__in=contact_ids))
+
+
+def _sync_tag_ids(*contact_ids, using=None):
+    """
+    Re-sync the contacts' tag_ids once when the transaction commits, so a
+    queryset delete of many assignments costs one UPDATE
+    """
+    _on_commit_for_contacts('tag_ids', _sync_contact_tag_ids, contact_ids, using=using)
+
+
+def _update_cached_tag_ids(assignment, add: bool):
+    """Keep a contact loaded with the assignment from writing back its old tag_ids"""
+    if not ContactTagAssignment.contact.is_cached(assignment):
+        return
+    contact = assignment.contact
+    tag_ids = set(contact.tag_ids) | {assignment.tag_id} if add else set(contact.tag_ids) - {assignment.tag_id}
+    contact.tag_ids = sorted(tag_ids)
+    contact._reset_loaded_values(['tag_ids'])
+
+
+@receiver(pre_save, sender=ContactTagAssignment)
+def remember_assignment_contact(sender, instance, raw=False, **kwargs):
+    """An assignment moved to another contact leaves the old one's tag_ids stale"""
+    if raw or instance._state.adding:
+        return
+    instance._previous_contact_id = ContactTagAssignment.objects.filter(
+        pk=instance.pk
+    ).values_list('contact_id', flat=True).first()
+
+
+@receiver(post_save, sender=ContactTagAssignment)
+def sync_saved_assignment_tag_ids(sender, instance, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    _sync_tag_ids(instance.contact_id, getattr(instance, '_previous_contact_id', None), using=using)
+    _update_cached_tag_ids(instance, add=True)
+
+
+@receiver(post_delete, sender=ContactTagAssignment)
+def sync_deleted_assignment_tag_ids(sender, instance, using=None, **kwargs):
+    """Also sent for queryset and cascading deletes, e.g. the admin's delete selected"""
+    _sync_tag_ids(instance.contact_id, using=using)
+    _update_cached_tag_ids(instance, add=False)
+
+
+def _invalidate_contact_summaries(contact_ids):
+    from .services import ContactSummaryService
+
+    ContactSummaryService.invalidate(contact_ids)
+
+
+def _invalidate_summary(*contact_ids, using=None):
+    """Invalidate the contacts' summaries once when the transaction commits"""
+    _on_commit_for_contacts('summary', _invalidate_contact_summaries, contact_ids, using=using)
+
+
+@receiver(post_save, sender='transactions.Transaction')
+@receiver(post_delete, sender='transactions.Transaction')
+@receiver(post_save, sender='communications.Communication')
+@receiver(post_delete, sender='communications.Communication')
+@receiver(post_save, sender='events.EventAttendance')
+@receiver(post_delete, sender='events.EventAttendance')
+def invalidate_contact_summary(sender, instance, raw=False, using=None, **kwargs):
+    """Replace the summary version of the contact a record belongs to"""
+    if raw:
+        return
+    # A transaction moved to another contact also leaves its old donor stale
+    previous = getattr(instance, '_loaded_values', None) or {}
+    # A deleted row can no longer load a deferred contact, so fall back to the snapshot
+    contact_id = instance.__dict__.get('contact_id', previous.get('contact_id'))
+    _invalidate_summary(contact_id, previous.get('contact_id'), using=using)
+
+
+@receiver(post_save, sender=ContactRelationship)
+@receiver(post_delete, sender=ContactRelationship)
+def invalidate_relationship_summary(sender, instance, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    _invalidate_summary(instance.from_contact_id, using=using)
+
+
+def _refresh_households(contact_ids=(), household_ids=()):
+    from .services import HouseholdService
+
+    transaction.on_commit(lambda: HouseholdService.refresh_households(contact_ids, household_ids))
+
+
+@receiver(post_save, sender=ContactRelationship)
+def regroup_saved_relationship_household(sender, instance, created, raw=False, **kwargs):
+    """Regroup both contacts' households when a spouse or partner link is saved"""
+    from .services import HouseholdService
+
+    if raw:
+        return
+    # An edited relationship may have been a household link before the edit
+    if created and instance.relationship_type not in HouseholdService.HOUSEHOLD_RELATIONSHIPS:
+        return
+    _refresh_households([instance.from_contact_id, instance.to_contact_id])
+
+
+@receiver(post_delete, sender=ContactRelationship)
+def regroup_deleted_relationship_household(sender, instance, **kwargs):
+    """Split the household a deleted spouse or partner link held together"""
+    from .services import HouseholdService
+
+    if instance.relationship_type in HouseholdService.HOUSEHOLD_RELATIONSHIPS:
+        _refresh_households([instance.from_contact_id, instance.to_contact_id])
+
+
+@receiver(post_save, sender=Contact)
+def regroup_primary_contact_household(sender, instance, created, raw=False, **kwargs):
+    """Regroup the households on both sides of a changed primary contact"""
+    if raw or 'primary_contact' not in instance.changed_fields():
+        return
+    if created and instance.primary_contact_id is None:
+        return
+    previous = getattr(instance, '_loaded_values', None) or {}
+    _refresh_households([instance.pk, instance.primary_contact_id, previous.get('primary_contact_id')])
+
+
+@receiver(post_delete, sender=Contact)
+def regroup_deleted_contact_household(sender, instance, **kwargs):
+    """Split or re-total the household a deleted contact belonged to"""
+    if instance.household_id is not None:
+        _refresh_households(household_ids=[instance.household_id])
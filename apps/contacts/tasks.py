@@ -0,0 +1,42 @@
+"""
+Celery tasks for contact analytics and data quality
+"""
+
+from celery import shared_task
+
+from .services import DuplicateDetectionService, HouseholdService, RFMScoringService
+
+
+@shared_task
+def update_rfm_scores(chunk_size=RFMScoringService.CHUNK_SIZE, in_database=False):
+    """Recalculate RFM scores for all donors in bulk"""
+    if in_database:
+        return RFMScoringService.update_scores_in_database()
+    return RFMScoringService.bulk_update_scores(chunk_size=chunk_size)
+
+
+@shared_task
+def refresh_rfm_recency(chunk_size=RFMScoringService.CHUNK_SIZE):
+    """Rescore donors whose recency bucket changed since the last run"""
+    return RFMScoringService.refresh_recency(chunk_size=chunk_size)
+
+
+@shared_task
+def calibrate_rfm_thresholds():
+    """Recalibrate RFM thresholds from the donor distribution and rescore donors"""
+    thresholds = RFMScoringService.calibrate_thresholds()
+    if thresholds is None:
+        return 0
+    return RFMScoringService.bulk_update_scores()
+
+
+@shared_task
+def find_duplicate_contacts():
+    """Refresh the duplicate-contact review queue"""
+    return DuplicateDetectionService.refresh_candidates()
+
+
+@shared_task
+def rebuild_households():
+    """Regroup every contact into households and re-add household giving"""
+    return HouseholdService.rebuild()
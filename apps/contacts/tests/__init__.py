@@ -0,0 +1,13 @@
+"""
+Tests for the contacts app
+
+Tests that touch the database need PostgreSQL: Contact has ArrayField
+columns and several services use recursive CTEs and trigram indexes.
+They are skipped on other backends.
+"""
+
+from unittest import skipUnless
+
+from django.db import connection
+
+requires_postgres = skipUnless(connection.vendor == 'postgresql', 'Needs PostgreSQL for ArrayField columns and CTEs')
@@ -0,0 +1,144 @@
+"""
+Tests for the email preference columns and change tracking on Contact
+"""
+
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.communications.models import EmailCampaign
+from ..models import Contact
+from . import requires_postgres
+
+
+@requires_postgres
+class EmailPreferenceTest(TestCase):
+
+    def setUp(self):
+        self.contact = Contact.objects.create(
+            first_name='Mary', last_name='Shelley', email='mary@example.com',
+            preferences={'email_marketing': True, 'email_events': 'yes', 'interests': ['poetry']}
+        )
+
+    def stored(self, *fields):
+        return Contact.objects.values_list(*fields).get(pk=self.contact.pk)
+
+    def test_save_copies_flags_into_columns(self):
+        self.assertEqual(
+            self.stored(*Contact.EMAIL_PREFERENCES),
+            (True, False, False, False)
+        )
+        self.assertTrue(self.contact.email_opt_in)
+
+    def test_update_fields_naming_preferences_writes_columns(self):
+        self.contact.preferences['email_newsletters'] = True
+        self.contact.save(update_fields=['preferences'])
+
+        self.assertEqual(self.stored('email_newsletters'), (True,))
+
+    def test_set_email_preferences(self):
+        self.contact.set_email_preferences(email_marketing=False, email_events=1)
+        self.contact.save(update_fields=['preferences'])
+
+        self.contact.refresh_from_db()
+        self.assertEqual(
+            self.contact.preferences,
+            {'email_marketing': False, 'email_events': True, 'interests': ['poetry']}
+        )
+        self.assertEqual((self.contact.email_marketing, self.contact.email_events), (False, True))
+
+        with self.assertRaises(ValueError):
+            self.contact.set_email_preferences(email_carrier_pigeon=True)
+
+    def test_deferred_save_leaves_preferences_alone(self):
+        contact = Contact.objects.only('id', 'first_name').get(pk=self.contact.pk)
+
+        contact.first_name = 'Mary W.'
+        contact.save(update_fields=['first_name'])
+
+        self.assertIn('preferences', contact.get_deferred_fields())
+        self.assertEqual(self.stored('email_marketing'), (True,))
+
+    def test_sync_command_backfills_columns(self):
+        Contact.objects.filter(pk=self.contact.pk).update(
+            email_marketing=False, preferences={'email_newsletters': True}
+        )
+
+        call_command('sync_contact_preferences', stdout=StringIO())
+
+        self.assertEqual(self.stored(*Contact.EMAIL_PREFERENCES), (False, True, False, False))
+
+    def test_campaign_audience_uses_marketing_column(self):
+        Contact.objects.create(first_name='Percy', last_name='Shelley', email='percy@example.com',
+                               preferences={'email_marketing': False})
+        campaign = EmailCampaign(send_to_all_subscribers=True)
+
+        self.assertEqual(list(campaign.get_recipient_list()), [self.contact])
+
+
+@requires_postgres
+class ChangedFieldsTest(TestCase):
+
+    def setUp(self):
+        Contact.objects.create(first_name='Mary', last_name='Shelley', email='mary@example.com',
+                               preferences={'interests': ['poetry']})
+        self.contact = Contact.objects.get()
+
+    def test_new_contact_has_every_field_changed(self):
+        contact = Contact(first_name='Percy', last_name='Shelley')
+
+        self.assertIn('email', contact.changed_fields())
+
+    def test_loaded_contact_is_unchanged(self):
+        self.contact.first_name = 'Mary'
+
+        self.assertEqual(self.contact.changed_fields(), set())
+
+    def test_assignment_and_in_place_edits(self):
+        self.contact.email = 'mary@example.org'
+        self.contact.preferences['interests'].append('novels')
+
+        self.assertEqual(self.contact.changed_fields(), {'email', 'preferences'})
+
+    def test_save_resets_saved_fields_only(self):
+        self.contact.email = 'mary@example.org'
+        self.contact.phone = '312-555-0101'
+        self.contact.save(update_fields=['email'])
+
+        self.assertEqual(self.contact.changed_fields(), {'phone'})
+
+        self.contact.save()
+        self.assertEqual(self.contact.changed_fields(), set())
+
+    def test_deferred_fields_are_unchanged_until_read(self):
+        contact = Contact.objects.only('id', 'first_name').get()
+
+        self.assertEqual(contact.changed_fields(), set())
+        contact.email
+        self.assertEqual(contact.changed_fields(), set())
+
+    def test_refresh_from_db_resets(self):
+        self.contact.email = 'mary@example.org'
+
+        self.contact.refresh_from_db(fields=['email'])
+
+        self.assertEqual(self.contact.changed_fields(), set())
+
+    def test_save_reads_nothing_back(self):
+        self.contact.notes = 'Met at the gala'
+
+        with mock.patch('apps.communications.signals.sync_contact_to_mailchimp') as sync:
+            with self.assertNumQueries(1):
+                self.contact.save(update_fields=['notes'])
+
+        sync.assert_not_called()
+
+    def test_mailchimp_resync_follows_email_changes(self):
+        self.contact.email = 'mary@example.org'
+
+        with mock.patch('apps.communications.signals.sync_contact_to_mailchimp') as sync:
+            self.contact.save()
+
+        sync.assert_called_once_with(self.contact)
@@ -0,0 +1,106 @@
+"""
+Tests for duplicate-contact detection
+"""
+
+import uuid
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from ..models import Contact, DuplicateCandidate
+from ..services import DuplicateDetectionService
+from . import requires_postgres
+
+
+def prepared(first_name, last_name, email=None, phone='', street=None, zip_code=None):
+    return DuplicateDetectionService._prepare(
+        (uuid.uuid4(), first_name, last_name, email, phone, street, zip_code)
+    )
+
+
+class DuplicateScoringTest(SimpleTestCase):
+
+    def test_soundex(self):
+        for name, code in (
+            ('Robert', 'R163'), ('Rupert', 'R163'), ('Ashcraft', 'A261'), ('Tymczak', 'T522'),
+            ('Pfister', 'P236'), ('Lee', 'L000'), ('Brontë', 'B653'), ('', ''),
+        ):
+            with self.subTest(name=name):
+                self.assertEqual(DuplicateDetectionService.soundex(name), code)
+
+    def test_normalize_phone(self):
+        self.assertEqual(DuplicateDetectionService.normalize_phone('+1 (312) 555-0101'), '3125550101')
+        self.assertEqual(DuplicateDetectionService.normalize_phone('555-01'), '')
+
+    def test_email_local_part(self):
+        self.assertEqual(DuplicateDetectionService.email_local_part('Mary.Shelley+news@example.com'), 'maryshelley')
+        self.assertEqual(DuplicateDetectionService.email_local_part('info@example.com'), '')
+        self.assertEqual(DuplicateDetectionService.email_local_part(None), '')
+
+    def test_blocking_keys(self):
+        record = prepared('Mary', 'Shelley', 'mary@example.com', '312-555-0101', zip_code='60601-1234')
+
+        self.assertEqual(DuplicateDetectionService.blocking_keys(record), [
+            ('name', 'S400m'), ('zip', '60601S400'), ('phone', '3125550101'), ('email', 'mary'),
+        ])
+
+    def test_same_person_scores_high(self):
+        a = prepared('Mary', 'Shelley', 'mary.shelley@example.com', '312-555-0101', '12 Elm St.', '60601')
+        b = prepared('Mary', 'Shelly', 'maryshelley@example.org', '(312) 555 0101', '12 Elm St', '60601')
+
+        score, reasons = DuplicateDetectionService.score_pair(a, b)
+
+        self.assertGreater(score, 0.9)
+        self.assertEqual(reasons['phone'], 1.0)
+
+    def test_swapped_names_match(self):
+        a = prepared('Shelley', 'Mary', phone='312-555-0101')
+        b = prepared('Mary', 'Shelley', phone='312-555-0101')
+
+        _, reasons = DuplicateDetectionService.score_pair(a, b)
+
+        self.assertEqual(reasons['name'], 1.0)
+
+    def test_names_alone_are_not_certain(self):
+        score, _ = DuplicateDetectionService.score_pair(prepared('Mary', 'Shelley'), prepared('Mary', 'Shelley'))
+
+        self.assertEqual(score, DuplicateDetectionService.NAME_ONLY_FACTOR)
+
+    def test_conflicting_details_rule_a_pair_out(self):
+        a = prepared('Mary', 'Shelley', 'mary@example.com', '312-555-0101')
+        b = prepared('Mary', 'Shelley', 'percy@example.com', '773-555-0199')
+
+        self.assertIsNone(DuplicateDetectionService.score_pair(a, b))
+
+
+@requires_postgres
+class DuplicateDetectionTest(TestCase):
+
+    def setUp(self):
+        self.mary = Contact.objects.create(first_name='Mary', last_name='Shelley', email='mary@example.com',
+                                           phone='312-555-0101')
+        self.copy = Contact.objects.create(first_name='Mary', last_name='Shelly', phone='(312) 555-0101')
+        self.percy = Contact.objects.create(first_name='Percy', last_name='Shelley', email='percy@example.com',
+                                            phone='773-555-0199')
+
+    def test_find_candidates(self):
+        [candidate] = DuplicateDetectionService.find_candidates()
+
+        a, b, score, reasons = candidate
+        self.assertEqual({a, b}, {self.mary.pk, self.copy.pk})
+        self.assertLess(str(a), str(b))
+        self.assertCountEqual(reasons['blocks'], ['name', 'phone'])
+
+    def test_oversized_blocks_are_skipped(self):
+        with mock.patch.object(DuplicateDetectionService, 'MAX_BLOCK_SIZE', 1):
+            self.assertEqual(DuplicateDetectionService.find_candidates(), [])
+
+    def test_refresh_replaces_pending_and_keeps_reviewed_pairs(self):
+        self.assertEqual(DuplicateDetectionService.refresh_candidates(), 1)
+        self.assertEqual(DuplicateDetectionService.refresh_candidates(), 1)
+        self.assertEqual(DuplicateCandidate.objects.count(), 1)
+
+        DuplicateCandidate.objects.update(status='dismissed')
+
+        self.assertEqual(DuplicateDetectionService.refresh_candidates(), 0)
+        self.assertEqual(DuplicateCandidate.objects.get().status, 'dismissed')
@@ -0,0 +1,72 @@
+"""
+Tests for streaming contact exports
+"""
+
+import csv
+import io
+from datetime import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from ..models import Contact
+from ..services import ContactExportService
+from . import requires_postgres
+
+
+@requires_postgres
+class ContactExportTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.keats = Contact.objects.create(
+            first_name='John', last_name='Keats', email='keats@example.com', phone='555-0101',
+            address={'street': '1 Wentworth Place', 'city': 'Chicago', 'state': 'IL', 'zip_code': '60601'},
+            contact_type='donor', total_lifetime_giving=Decimal('125.50')
+        )
+        cls.byron = Contact.objects.create(first_name='George', last_name='Byron', email='byron@example.com')
+        Contact.objects.filter(pk=cls.keats.pk).update(
+            created_at=timezone.make_aware(datetime(2024, 3, 1, 9, 30))
+        )
+
+    def read_csv(self, queryset=None):
+        text = ''.join(ContactExportService.csv_chunks(Contact.objects.all() if queryset is None else queryset))
+        return list(csv.reader(io.StringIO(text)))
+
+    def test_csv_rows_in_name_order(self):
+        header, byron, keats = self.read_csv()
+
+        self.assertEqual(header, [column for column, _ in ContactExportService.COLUMNS])
+        self.assertEqual((byron[0], keats[0]), (str(self.byron.pk), str(self.keats.pk)))
+        row = dict(zip(header, keats))
+        self.assertEqual(row['Street'], '1 Wentworth Place')
+        self.assertEqual(row['Zip Code'], '60601')
+        self.assertEqual(row['Lifetime Giving'], '125.50')
+        self.assertEqual(dict(zip(header, byron))['Street'], '')
+
+    def test_csv_export_of_filtered_queryset(self):
+        rows = self.read_csv(Contact.objects.filter(contact_type='donor'))
+
+        self.assertEqual([row[0] for row in rows[1:]], [str(self.keats.pk)])
+
+    def test_csv_is_streamed_in_blocks(self):
+        with mock.patch.object(ContactExportService, 'CSV_BUFFER_SIZE', 1):
+            chunks = list(ContactExportService.csv_chunks(Contact.objects.all()))
+
+        self.assertEqual(len(chunks), 3)
+
+    def test_xlsx_workbook(self):
+        with ContactExportService.xlsx_file(Contact.objects.all()) as output:
+            sheet = load_workbook(output, read_only=True)['Contacts']
+            header, byron, keats = list(sheet.values)
+
+        self.assertEqual(list(header), [column for column, _ in ContactExportService.COLUMNS])
+        row = dict(zip(header, keats))
+        self.assertEqual(row['Email'], 'keats@example.com')
+        self.assertEqual(row['Lifetime Giving'], 125.5)
+        # Excel has no time zones, so datetimes are written in local time
+        self.assertEqual(row['Created'], datetime(2024, 3, 1, 9, 30))
+        self.assertIsNone(dict(zip(header, byron))['Phone'])
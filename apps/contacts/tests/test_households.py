@@ -0,0 +1,122 @@
+"""
+Tests for the household rollup
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from apps.transactions.models import Transaction
+from ..models import Contact, ContactRelationship
+from ..services import HouseholdService, _UnionFind
+from . import requires_postgres
+
+
+class UnionFindTest(SimpleTestCase):
+
+    def test_union_and_find(self):
+        forest = _UnionFind()
+        for a, b in ((1, 2), (3, 4), (2, 4), (5, 5)):
+            forest.union(a, b)
+
+        self.assertEqual(len({forest.find(item) for item in (1, 2, 3, 4)}), 1)
+        self.assertNotEqual(forest.find(5), forest.find(1))
+        self.assertEqual(forest.find(6), 6)
+
+
+@requires_postgres
+class HouseholdTest(TestCase):
+
+    def setUp(self):
+        self.mary, self.percy, self.claire, self.byron = [
+            Contact.objects.create(first_name=name, last_name='Reader')
+            for name in ('Mary', 'Percy', 'Claire', 'Byron')
+        ]
+        self.give(self.mary, '100.00', 1)
+        self.give(self.percy, '25.00', 3)
+
+    def give(self, contact, amount, day):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Transaction.objects.create(
+                contact=contact, type='donation', amount=Decimal(amount), status='completed',
+                payment_method='check', transaction_date=timezone.make_aware(datetime(2024, 2, day, 12))
+            )
+
+    def link(self, a, b, relationship_type='spouse'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ContactRelationship.objects.create(from_contact=a, to_contact=b, relationship_type=relationship_type)
+
+    def households(self):
+        households = {}
+        for contact in Contact.objects.all():
+            households.setdefault(contact.household_id, set()).add(contact.first_name)
+        return sorted(households.values(), key=sorted)
+
+    def assertMatchesRebuild(self):
+        fields = ['id'] + HouseholdService.FIELDS
+        maintained = list(Contact.objects.values_list(*fields))
+        Contact.objects.update(household_id=None, household_total_giving=0, household_donation_count=0,
+                               household_last_donation_date=None)
+        HouseholdService.rebuild()
+        self.assertCountEqual(maintained, Contact.objects.values_list(*fields))
+
+    def test_new_contacts_live_alone(self):
+        for contact in Contact.objects.all():
+            self.assertEqual(contact.household_id, contact.pk)
+        self.assertMatchesRebuild()
+
+    def test_spouses_share_a_household_and_its_totals(self):
+        self.link(self.mary, self.percy)
+
+        mary, percy = Contact.objects.get(pk=self.mary.pk), Contact.objects.get(pk=self.percy.pk)
+        self.assertEqual(mary.household_id, min(self.mary.pk, self.percy.pk))
+        self.assertEqual(percy.household_id, mary.household_id)
+        self.assertEqual(
+            (percy.household_total_giving, percy.household_donation_count, percy.household_last_donation_date),
+            (Decimal('125.00'), 2, datetime(2024, 2, 3).date())
+        )
+        self.assertMatchesRebuild()
+
+    def test_other_relationships_do_not_join_households(self):
+        self.link(self.mary, self.byron, 'colleague')
+
+        self.assertEqual(self.households(), [{'Byron'}, {'Claire'}, {'Mary'}, {'Percy'}])
+
+    def test_primary_contact_and_partner_links_chain(self):
+        self.link(self.percy, self.claire, 'partner')
+        self.claire.primary_contact = self.mary
+        with self.captureOnCommitCallbacks(execute=True):
+            self.claire.save()
+
+        self.assertEqual(self.households(), [{'Byron'}, {'Claire', 'Mary', 'Percy'}])
+        self.assertMatchesRebuild()
+
+    def test_removed_link_splits_the_household(self):
+        spouse = self.link(self.mary, self.percy)
+        self.link(self.percy, self.claire, 'partner')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            spouse.delete()
+
+        self.assertEqual(self.households(), [{'Byron'}, {'Claire', 'Percy'}, {'Mary'}])
+        self.assertMatchesRebuild()
+
+    def test_new_gift_updates_household_totals(self):
+        self.link(self.mary, self.percy)
+
+        self.give(self.percy, '5.00', 4)
+
+        self.assertEqual(Contact.objects.get(pk=self.mary.pk).household_total_giving, Decimal('130.00'))
+        self.assertMatchesRebuild()
+
+    def test_deleted_member_leaves_the_household(self):
+        self.link(self.mary, self.percy)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mary.delete()
+
+        percy = Contact.objects.get(pk=self.percy.pk)
+        self.assertEqual((percy.household_id, percy.household_total_giving), (percy.pk, Decimal('25.00')))
+        self.assertMatchesRebuild()
@@ -0,0 +1,105 @@
+"""
+Tests for the chunked CSV contact import
+"""
+
+import csv
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from ..models import Contact
+from ..services import ContactImportService
+from ..signals import contacts_imported
+from . import requires_postgres
+
+
+def upload(*lines):
+    return io.BytesIO('\n'.join(lines).encode('utf-8'))
+
+
+@requires_postgres
+class ContactImportTest(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.imported = []
+        handler = lambda sender, created_ids, updated_ids, **kwargs: self.imported.append((created_ids, updated_ids))
+        contacts_imported.connect(handler)
+        self.addCleanup(contacts_imported.disconnect, handler)
+
+    def import_csv(self, *lines, **kwargs):
+        return ContactImportService.import_csv(upload(*lines), **kwargs)
+
+    def test_new_contacts(self):
+        result = self.import_csv(
+            'First Name,Last Name,Email,Contact Type',
+            'Mary,Shelley,Mary.Shelley@Example.com,Donor',
+            'Percy,Shelley,,',
+        )
+
+        self.assertEqual((result['created'], result['errors']), (2, 0))
+        mary = Contact.objects.get(last_name='Shelley', first_name='Mary')
+        self.assertEqual((mary.email, mary.contact_type), ('mary.shelley@example.com', 'donor'))
+        self.assertEqual(Contact.objects.get(first_name='Percy').contact_type, 'prospect')
+        self.assertEqual(mary.household_id, mary.pk)
+
+    def test_rows_without_header(self):
+        result = self.import_csv('Ann,Radcliffe,ann@example.com,555-0101,,newsletter', has_header=False)
+
+        self.assertEqual(result['created'], 1)
+        self.assertEqual(Contact.objects.get().source, 'newsletter')
+
+    def test_existing_contacts_are_skipped_or_updated(self):
+        Contact.objects.create(first_name='Mary', last_name='Godwin', email='mary@example.com', phone='555-0100')
+        lines = ('first_name,last_name,email,phone', 'Mary,Shelley,MARY@example.com,')
+
+        result = self.import_csv(*lines)
+        self.assertEqual((result['created'], result['skipped']), (0, 1))
+        self.assertEqual(Contact.objects.get().last_name, 'Godwin')
+
+        result = self.import_csv(*lines, update_existing=True)
+        self.assertEqual(result['updated'], 1)
+        contact = Contact.objects.get()
+        # Blank cells leave the stored value alone
+        self.assertEqual((contact.last_name, contact.phone), ('Shelley', '555-0100'))
+
+    def test_rejected_rows_go_to_the_error_report(self):
+        result = self.import_csv(
+            'first_name,last_name,email,contact_type',
+            'Mary,Shelley,mary@example.com,',
+            'Mary,Shelley,Mary@Example.com,',
+            ',Nobody,nobody@example.com,',
+            'Bad,Email,not-an-email,',
+            'Odd,Type,odd@example.com,wizard',
+        )
+
+        self.assertEqual((result['created'], result['errors']), (1, 4))
+        with default_storage.open(result['error_report']) as report:
+            rows = list(csv.DictReader(io.StringIO(report.read().decode('utf-8'))))
+        self.assertEqual([row['line'] for row in rows], ['3', '4', '5', '6'])
+        self.assertIn('duplicate', rows[0]['error'])
+        self.assertIn('first_name is required', rows[1]['error'])
+        self.assertIn('invalid email', rows[2]['error'])
+        self.assertIn('unknown contact type', rows[3]['error'])
+
+    def test_one_signal_and_one_write_per_chunk(self):
+        lines = ['first_name,last_name,email'] + [f'Reader,{number},reader{number}@example.com' for number in range(5)]
+
+        with mock.patch('apps.communications.signals.process_imported_contacts') as follow_up:
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertNumQueries(8):
+                    result = self.import_csv(*lines, chunk_size=3)
+
+        self.assertEqual(result['created'], 5)
+        self.assertIsNone(result['error_report'])
+        self.assertEqual([len(created_ids) for created_ids, _ in self.imported], [3, 2])
+        self.assertEqual(follow_up.delay.call_count, 2)
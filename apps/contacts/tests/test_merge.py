@@ -0,0 +1,114 @@
+"""
+Tests for set-based contact merges
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.analytics.models import DailyGivingFact
+from apps.transactions.models import Campaign, CampaignDonor, Transaction
+from ..models import Contact, ContactRelationship, ContactTag, ContactTagAssignment, DuplicateCandidate
+from ..services import ContactMergeService
+from . import requires_postgres
+
+
+@requires_postgres
+class ContactMergeTest(TestCase):
+
+    def setUp(self):
+        self.campaign = Campaign.objects.create(name='Spring Appeal', start_date=datetime(2024, 1, 1).date())
+        self.survivor = Contact.objects.create(first_name='Mary', last_name='Shelley', notes='Met at the gala')
+        self.victim = Contact.objects.create(
+            first_name='Mary', last_name='Shelly', email='mary@example.com', phone='312-555-0101',
+            notes='Prefers email'
+        )
+        self.friend = Contact.objects.create(first_name='Percy', last_name='Shelley')
+
+        self.gothic = ContactTag.objects.create(name='Gothic')
+        self.poets = ContactTag.objects.create(name='Poets')
+        with self.captureOnCommitCallbacks(execute=True):
+            ContactTagAssignment.objects.create(contact=self.survivor, tag=self.gothic)
+            ContactTagAssignment.objects.create(contact=self.victim, tag=self.gothic)
+            ContactTagAssignment.objects.create(contact=self.victim, tag=self.poets)
+
+            ContactRelationship.objects.create(
+                from_contact=self.victim, to_contact=self.survivor, relationship_type='referral'
+            )
+            ContactRelationship.objects.create(
+                from_contact=self.victim, to_contact=self.friend, relationship_type='spouse'
+            )
+            DuplicateCandidate.objects.create(contact_a=self.survivor, contact_b=self.victim, score=Decimal('0.9'))
+
+            self.give(self.survivor, '50.00', 1)
+            self.give(self.victim, '25.00', 2)
+            self.give(self.victim, '10.00', 3)
+
+    def give(self, contact, amount, day):
+        return Transaction.objects.create(
+            contact=contact, type='donation', amount=Decimal(amount), status='completed',
+            payment_method='check', campaign=self.campaign,
+            transaction_date=timezone.make_aware(datetime(2024, 2, day, 12))
+        )
+
+    def merge(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ContactMergeService.merge_contacts(self.survivor, [self.victim])
+
+    def test_records_move_to_the_survivor(self):
+        moved = self.merge()
+
+        self.assertFalse(Contact.objects.filter(pk=self.victim.pk).exists())
+        self.assertEqual(Transaction.objects.filter(contact=self.survivor).count(), 3)
+        self.assertEqual(moved['transactions.Transaction.contact'], 2)
+
+        self.survivor.refresh_from_db()
+        self.assertEqual(self.survivor.total_lifetime_giving, Decimal('85.00'))
+        self.assertEqual(self.survivor.donation_count, 3)
+
+    def test_duplicate_unique_rows_keep_the_survivors(self):
+        self.merge()
+
+        self.assertCountEqual(
+            ContactTagAssignment.objects.values_list('contact_id', 'tag_id'),
+            [(self.survivor.pk, self.gothic.pk), (self.survivor.pk, self.poets.pk)]
+        )
+        self.survivor.refresh_from_db()
+        self.assertCountEqual(self.survivor.tag_ids, [self.gothic.pk, self.poets.pk])
+
+    def test_links_between_merged_contacts_are_dropped(self):
+        self.merge()
+
+        self.assertEqual(
+            list(ContactRelationship.objects.values_list('from_contact_id', 'to_contact_id', 'relationship_type')),
+            [(self.survivor.pk, self.friend.pk, 'spouse')]
+        )
+        self.assertFalse(DuplicateCandidate.objects.exists())
+
+    def test_blank_fields_are_filled_and_notes_kept(self):
+        self.merge()
+
+        self.survivor.refresh_from_db()
+        self.assertEqual((self.survivor.email, self.survivor.phone), ('mary@example.com', '312-555-0101'))
+        self.assertEqual(self.survivor.notes, 'Met at the gala\n\nPrefers email')
+
+    def test_derived_rows_are_rebuilt(self):
+        self.merge()
+
+        donor = CampaignDonor.objects.get(campaign=self.campaign)
+        self.assertEqual((donor.contact_id, donor.gift_count, donor.total_amount),
+                         (self.survivor.pk, 3, Decimal('85.00')))
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.donor_count, 1)
+        self.assertEqual(set(DailyGivingFact.objects.values_list('contact_id', flat=True)), {self.survivor.pk})
+
+    def test_choose_survivor_prefers_giving_history(self):
+        self.survivor.refresh_from_db()
+        self.victim.refresh_from_db()
+
+        self.assertEqual(ContactMergeService.choose_survivor([self.survivor, self.victim]), self.victim)
+
+    def test_merging_a_contact_into_itself_does_nothing(self):
+        self.assertEqual(ContactMergeService.merge_contacts(self.survivor, [self.survivor]), {})
@@ -0,0 +1,143 @@
+"""
+Tests for keyset pagination of contact lists
+"""
+
+from django.test import TestCase
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from ..models import Contact
+from ..pagination import ContactKeysetPagination, InvalidCursor, KeysetPaginator
+from . import requires_postgres
+
+ORDERING = ('last_name', 'first_name', 'id')
+
+
+@requires_postgres
+class KeysetPaginatorTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        names = [
+            ('Ann', 'Austen'), ('Bea', 'Austen'), ('Cy', 'Austen'), ('Cy', 'Austen'),
+            ('Dot', 'Bronte'), ('Em', 'Bronte'), ('Flo', 'Carroll'),
+        ]
+        for number, (first_name, last_name) in enumerate(names):
+            Contact.objects.create(first_name=first_name, last_name=last_name, email=f'reader{number}@example.com')
+
+    def paginator(self, per_page=3, queryset=None):
+        return KeysetPaginator(Contact.objects.all() if queryset is None else queryset, per_page, ORDERING)
+
+    def expected(self, queryset=None):
+        return list((Contact.objects.all() if queryset is None else queryset).order_by(*ORDERING))
+
+    def walk_forward(self, paginator):
+        pages, cursor = [], None
+        while True:
+            page = paginator.page(cursor)
+            pages.append(page)
+            if not page.has_next():
+                return pages
+            cursor = page.next_cursor
+
+    def test_forward_walk_visits_every_row_once(self):
+        pages = self.walk_forward(self.paginator())
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual([contact for page in pages for contact in page], self.expected())
+        self.assertFalse(pages[0].has_previous())
+        self.assertTrue(pages[-1].has_previous())
+
+    def test_backward_walk_returns_the_same_pages(self):
+        paginator = self.paginator()
+        forward = self.walk_forward(paginator)
+
+        backward, page = [], forward[-1]
+        while page.has_previous():
+            page = paginator.page(page.previous_cursor)
+            backward.append(list(page))
+
+        self.assertEqual(backward, [list(page) for page in reversed(forward[:-1])])
+        self.assertTrue(page.has_next())
+
+    def test_rows_inserted_behind_the_cursor_are_not_repeated(self):
+        paginator = self.paginator()
+        first = paginator.page()
+
+        Contact.objects.create(first_name='Aa', last_name='Aardvark', email='early@example.com')
+        second = paginator.page(first.next_cursor)
+
+        self.assertEqual(list(second), self.expected()[4:7])
+
+    def test_filtered_queryset(self):
+        queryset = Contact.objects.filter(last_name='Austen')
+        pages = self.walk_forward(self.paginator(per_page=2, queryset=queryset))
+
+        self.assertEqual([contact for page in pages for contact in page], self.expected(queryset))
+
+    def test_running_off_the_end_leads_back(self):
+        paginator = self.paginator()
+        first = paginator.page()
+        Contact.objects.exclude(pk__in=[contact.pk for contact in first]).delete()
+
+        page = paginator.page(first.next_cursor)
+
+        self.assertEqual(list(page), [])
+        self.assertFalse(page.has_next())
+        # The rows before the cursor, which was the last row shown
+        self.assertEqual(list(paginator.page(page.previous_cursor)), list(first)[:-1])
+
+    def test_invalid_cursors(self):
+        paginator = self.paginator()
+        for cursor in ('not-a-cursor', KeysetPaginator.encode_cursor(['Austen'], reverse=False)):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidCursor):
+                    paginator.page(cursor)
+
+    def test_page_is_one_query(self):
+        paginator = self.paginator()
+        cursor = paginator.page().next_cursor
+
+        with self.assertNumQueries(1):
+            paginator.page(cursor)
+
+    def test_filtered_total_is_exact(self):
+        paginator = self.paginator(queryset=Contact.objects.filter(last_name='Bronte'))
+
+        self.assertEqual(paginator.total(), (2, False))
+
+
+@requires_postgres
+class ContactKeysetPaginationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(5):
+            Contact.objects.create(first_name=f'Reader {number}', last_name='Austen',
+                                   email=f'reader{number}@example.com')
+
+    def paginate(self, **params):
+        pagination = ContactKeysetPagination()
+        request = Request(APIRequestFactory().get('/api/contacts/', params))
+        results = pagination.paginate_queryset(Contact.objects.order_by(*ORDERING), request)
+        return pagination, results
+
+    def test_response_links(self):
+        pagination, results = self.paginate(page_size=2)
+        data = pagination.get_paginated_response([contact.pk for contact in results]).data
+
+        self.assertEqual(len(data['results']), 2)
+        self.assertIsNone(data['previous'])
+        self.assertIn('cursor=', data['next'])
+        self.assertIn('page_size=2', data['next'])
+
+    def test_page_size_is_clamped(self):
+        for size, expected in (('0', 1), ('1000', ContactKeysetPagination.max_page_size), ('many', 25)):
+            with self.subTest(size=size):
+                pagination, _ = self.paginate(page_size=size)
+                self.assertEqual(pagination.get_page_size(pagination.request), expected)
+
+    def test_invalid_cursor_is_not_found(self):
+        with self.assertRaises(NotFound):
+            self.paginate(cursor='bogus')
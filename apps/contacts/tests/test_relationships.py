@@ -0,0 +1,94 @@
+"""
+Tests for relationship networks
+"""
+
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+
+from ..models import Contact, ContactRelationship
+from ..services import ContactNetworkService
+from . import requires_postgres
+
+
+@requires_postgres
+class ContactNetworkTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        names = ['Ada', 'Bo', 'Cy', 'Di', 'Ed']
+        cls.ada, cls.bo, cls.cy, cls.di, cls.ed = [
+            Contact.objects.create(first_name=name, last_name='Reader') for name in names
+        ]
+        # Ada - Bo - Cy - Di, a cycle back from Cy to Ada, and Ed on his own
+        for from_contact, to_contact, relationship_type in (
+            (cls.ada, cls.bo, 'spouse'),
+            (cls.cy, cls.bo, 'colleague'),
+            (cls.cy, cls.di, 'colleague'),
+            (cls.cy, cls.ada, 'referral'),
+        ):
+            ContactRelationship.objects.create(
+                from_contact=from_contact, to_contact=to_contact, relationship_type=relationship_type
+            )
+        Contact.objects.filter(pk=cls.bo.pk).update(total_lifetime_giving=Decimal('40.00'), donation_count=2)
+        Contact.objects.filter(pk=cls.cy.pk).update(total_lifetime_giving=Decimal('2.50'), donation_count=1)
+
+    def depths(self, network):
+        return {node['name'].split()[0]: node['depth'] for node in network['nodes']}
+
+    def test_walks_both_directions_to_the_depth_limit(self):
+        network = ContactNetworkService.network(self.bo, depth=1)
+
+        self.assertEqual(self.depths(network), {'Bo': 0, 'Ada': 1, 'Cy': 1})
+        self.assertEqual(len(network['edges']), 3)
+        self.assertFalse(network['truncated'])
+
+    def test_cycles_keep_the_shortest_depth(self):
+        network = ContactNetworkService.network(self.ada, depth=4)
+
+        self.assertEqual(self.depths(network), {'Ada': 0, 'Bo': 1, 'Cy': 1, 'Di': 2})
+        self.assertEqual(len(network['edges']), 4)
+
+    def test_relationship_type_filter(self):
+        network = ContactNetworkService.network(self.ada, depth=3, relationship_types=['spouse', 'colleague'])
+
+        self.assertEqual(self.depths(network), {'Ada': 0, 'Bo': 1, 'Cy': 2, 'Di': 3})
+        self.assertNotIn('referral', {edge['relationship_type'] for edge in network['edges']})
+
+        with self.assertRaises(ValueError):
+            ContactNetworkService.network(self.ada, relationship_types=['nemesis'])
+
+    def test_depth_is_clamped(self):
+        self.assertEqual(ContactNetworkService.network(self.ada, depth=99)['depth'], ContactNetworkService.MAX_DEPTH)
+        self.assertEqual(self.depths(ContactNetworkService.network(self.ada, depth=-1)), {'Ada': 0})
+
+    def test_isolated_contact(self):
+        network = ContactNetworkService.network(self.ed)
+
+        self.assertEqual(network['root'], str(self.ed.pk))
+        self.assertEqual((len(network['nodes']), network['edges']), (1, []))
+
+    def test_truncated_network_drops_edges_of_cut_nodes(self):
+        with mock.patch.object(ContactNetworkService, 'MAX_NODES', 3):
+            network = ContactNetworkService.network(self.ada, depth=4)
+
+        self.assertTrue(network['truncated'])
+        self.assertEqual(self.depths(network), {'Ada': 0, 'Bo': 1, 'Cy': 1})
+        kept = {node['id'] for node in network['nodes']}
+        for edge in network['edges']:
+            self.assertTrue({edge['from_contact'], edge['to_contact']} <= kept)
+
+        with mock.patch.object(ContactNetworkService, 'MAX_NODES', 4):
+            self.assertFalse(ContactNetworkService.network(self.ada, depth=4)['truncated'])
+
+    def test_giving_summary(self):
+        network = ContactNetworkService.network(self.ada, include_giving=True)
+
+        self.assertEqual(network['giving'], {'donors': 2, 'total_lifetime_giving': Decimal('42.50')})
+        bo = next(node for node in network['nodes'] if node['id'] == str(self.bo.pk))
+        self.assertEqual((bo['total_lifetime_giving'], bo['donation_count']), (Decimal('40.00'), 2))
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            ContactNetworkService.network(self.ada, depth=4, include_giving=True)
@@ -0,0 +1,264 @@
+"""
+Tests for the RFM scorers
+
+Contact.calculate_rfm_score is the reference implementation. The numpy
+scorer, the single-UPDATE scorer and the incremental recency refresh must
+give every contact the same score and segment under the default and
+calibrated thresholds, including on and either side of every cut point.
+"""
+
+import itertools
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from unittest import mock
+
+import numpy as np
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from ..models import Contact, RFMThresholdSet
+from ..services import RFMScoringService
+from . import requires_postgres
+
+TODAY = date(2024, 6, 15)
+
+
+def reference_score(contact, thresholds, today=TODAY):
+    """``(rfm_score, donor_segment)`` from Contact.calculate_rfm_score as of ``today``"""
+    now = timezone.make_aware(datetime.combine(today, time(12)))
+    with mock.patch('django.utils.timezone.now', return_value=now):
+        contact.calculate_rfm_score(thresholds)
+    return contact.rfm_score, contact.donor_segment
+
+
+def boundary_values(thresholds):
+    """Days since last gift, counts and amounts on and either side of every cut point"""
+    days = {None, -30, 0}
+    for boundary in thresholds.recency_days:
+        days.update({boundary - 1, boundary, boundary + 1})
+
+    counts = {0}
+    for boundary in thresholds.frequency_counts:
+        counts.update({max(boundary - 1, 0), boundary, boundary + 1})
+
+    cent = Decimal('0.01')
+    amounts = {Decimal('0.00')}
+    for boundary in thresholds.monetary_thresholds:
+        amounts.update({max(boundary - cent, Decimal('0.00')), boundary, boundary + cent})
+
+    return (
+        sorted(days, key=lambda value: (value is not None, value)),
+        sorted(counts),
+        sorted(amounts),
+    )
+
+
+def boundary_contacts(thresholds, today=TODAY):
+    """Unsaved contacts covering every combination of the boundary values"""
+    days, counts, amounts = boundary_values(thresholds)
+    return [
+        Contact(
+            first_name='Donor',
+            last_name=str(index),
+            last_donation_date=None if days_since is None else today - timedelta(days=days_since),
+            donation_count=count,
+            total_lifetime_giving=amount
+        )
+        for index, (days_since, count, amount) in enumerate(itertools.product(days, counts, amounts))
+    ]
+
+
+def duplicate_thresholds():
+    """Calibrated-style thresholds where neighbouring cut points coincide"""
+    return RFMThresholdSet(
+        recency_days=[90, 90, 365, 365],
+        frequency_counts=[3, 3, 1, 1],
+        monetary_amounts=['250.00', '100.00', '100.00', '100.00']
+    )
+
+
+class ScoreChunkTest(SimpleTestCase):
+    """The numpy scorer against the reference, without a database"""
+
+    def assertMatchesReference(self, thresholds):
+        contacts = boundary_contacts(thresholds)
+        rows = [
+            (index, contact.last_donation_date, contact.donation_count, contact.total_lifetime_giving)
+            for index, contact in enumerate(contacts)
+        ]
+        ids, scores, segments = RFMScoringService.score_chunk(rows, today=TODAY, thresholds=thresholds)
+
+        for index, score, segment in zip(ids, scores, segments):
+            contact = contacts[index]
+            with self.subTest(
+                last_donation_date=contact.last_donation_date,
+                donation_count=contact.donation_count,
+                total_lifetime_giving=contact.total_lifetime_giving
+            ):
+                self.assertEqual((score, segment), reference_score(contact, thresholds))
+
+    def test_default_thresholds(self):
+        self.assertMatchesReference(RFMThresholdSet.default())
+
+    def test_duplicate_cut_points(self):
+        self.assertMatchesReference(duplicate_thresholds())
+
+    def test_recency_boundaries(self):
+        thresholds = RFMThresholdSet.default()
+        dates = [None, TODAY + timedelta(days=30)] + [
+            TODAY - timedelta(days=days) for days in (90, 91, 180, 181, 365, 366, 730, 731)
+        ]
+        recency, _, _ = RFMScoringService.score_arrays(
+            np.array(dates, dtype='datetime64[D]'), [1] * len(dates), [2500] * len(dates), today=TODAY, thresholds=thresholds
+        )
+        self.assertEqual(recency.tolist(), [1, 5, 5, 4, 4, 3, 3, 2, 2, 1])
+
+
+@requires_postgres
+class BulkScoringTest(TestCase):
+    """The database-backed scorers against the reference"""
+
+    def setUp(self):
+        cache.delete(RFMThresholdSet.CACHE_KEY)
+        self.addCleanup(cache.delete, RFMThresholdSet.CACHE_KEY)
+
+    def create_boundary_contacts(self, thresholds):
+        Contact.objects.bulk_create(boundary_contacts(thresholds))
+
+    def assertStoredScoresMatch(self, thresholds, today=TODAY):
+        for contact in Contact.objects.all():
+            with self.subTest(
+                last_donation_date=contact.last_donation_date,
+                donation_count=contact.donation_count,
+                total_lifetime_giving=contact.total_lifetime_giving
+            ):
+                stored = (contact.rfm_score, contact.donor_segment)
+                self.assertEqual(stored, reference_score(contact, thresholds, today))
+
+    def test_bulk_update_scores(self):
+        thresholds = RFMThresholdSet.default()
+        self.create_boundary_contacts(thresholds)
+
+        RFMScoringService.bulk_update_scores(Contact.objects.all(), chunk_size=500, today=TODAY)
+
+        self.assertStoredScoresMatch(thresholds)
+
+    def test_update_scores_in_database(self):
+        thresholds = RFMThresholdSet.default()
+        self.create_boundary_contacts(thresholds)
+
+        RFMScoringService.update_scores_in_database(Contact.objects.all(), today=TODAY)
+
+        self.assertStoredScoresMatch(thresholds)
+
+    def test_update_scores_in_database_with_duplicate_cut_points(self):
+        thresholds = duplicate_thresholds()
+        thresholds.save()
+        thresholds.activate()
+        self.create_boundary_contacts(thresholds)
+
+        RFMScoringService.update_scores_in_database(Contact.objects.all(), today=TODAY)
+
+        self.assertStoredScoresMatch(thresholds)
+
+    def test_refresh_recency_matches_full_rescore(self):
+        thresholds = RFMThresholdSet.default()
+        self.create_boundary_contacts(thresholds)
+        RFMScoringService.bulk_update_scores(today=TODAY)
+
+        later = TODAY + timedelta(days=1)
+        RFMScoringService.refresh_recency(today=later)
+
+        donors = Contact.objects.filter(donation_count__gt=0)
+        for contact in donors:
+            with self.subTest(last_donation_date=contact.last_donation_date):
+                stored = (contact.rfm_score, contact.donor_segment)
+                self.assertEqual(stored, reference_score(contact, thresholds, later))
+
+
+@requires_postgres
+class CalibratedThresholdsTest(TestCase):
+    """Scoring with thresholds calibrated from the donor distribution"""
+
+    def setUp(self):
+        cache.delete(RFMThresholdSet.CACHE_KEY)
+        self.addCleanup(cache.delete, RFMThresholdSet.CACHE_KEY)
+
+    def create_donors(self, count, donation_count=None, amount=None):
+        Contact.objects.bulk_create([
+            Contact(
+                first_name='Donor',
+                last_name=str(index),
+                last_donation_date=TODAY - timedelta(days=(index * 7) % 800),
+                donation_count=donation_count or index % 12 + 1,
+                total_lifetime_giving=amount or Decimal(index * 13 % 1500) + Decimal('0.50')
+            )
+            for index in range(count)
+        ])
+
+    def assertScorersMatchReference(self, thresholds):
+        contacts = boundary_contacts(thresholds)
+        Contact.objects.bulk_create(contacts)
+
+        RFMScoringService.bulk_update_scores(Contact.objects.all(), today=TODAY)
+        in_python = dict(Contact.objects.values_list('id', 'rfm_score'))
+        RFMScoringService.update_scores_in_database(Contact.objects.all(), today=TODAY)
+
+        for contact in Contact.objects.all():
+            expected = reference_score(contact, thresholds)
+            with self.subTest(
+                last_donation_date=contact.last_donation_date,
+                donation_count=contact.donation_count,
+                total_lifetime_giving=contact.total_lifetime_giving
+            ):
+                self.assertEqual(in_python[contact.pk], expected[0])
+                self.assertEqual((contact.rfm_score, contact.donor_segment), expected)
+
+    def test_too_few_donors_keeps_thresholds(self):
+        self.create_donors(RFMScoringService.MIN_CALIBRATION_DONORS - 1)
+
+        self.assertIsNone(RFMScoringService.calibrate_thresholds(today=TODAY))
+        self.assertIsNone(RFMThresholdSet.get_active().pk)
+
+    def test_calibrated_cut_points_are_observed_quintiles(self):
+        self.create_donors(200)
+
+        thresholds = RFMScoringService.calibrate_thresholds(today=TODAY)
+
+        self.assertEqual(RFMThresholdSet.get_active(), thresholds)
+        self.assertEqual(thresholds.donor_count, 200)
+        days = {(TODAY - last_date).days for last_date in Contact.objects.values_list('last_donation_date', flat=True)}
+        counts = set(Contact.objects.values_list('donation_count', flat=True))
+        amounts = set(Contact.objects.values_list('total_lifetime_giving', flat=True))
+        self.assertTrue(set(thresholds.recency_days) <= days)
+        self.assertTrue(set(thresholds.frequency_counts) <= counts)
+        self.assertTrue(set(thresholds.monetary_thresholds) <= amounts)
+        self.assertEqual(thresholds.recency_days, sorted(thresholds.recency_days))
+        self.assertEqual(thresholds.frequency_counts, sorted(thresholds.frequency_counts, reverse=True))
+
+    def test_scorers_match_reference_with_calibrated_thresholds(self):
+        self.create_donors(200)
+        thresholds = RFMScoringService.calibrate_thresholds(today=TODAY)
+        Contact.objects.all().delete()
+
+        self.assertScorersMatchReference(thresholds)
+
+    def test_scorers_match_reference_with_duplicate_calibrated_cut_points(self):
+        # Every donor gave once and the same amount, so the quintiles coincide
+        self.create_donors(150, donation_count=1, amount=Decimal('50.00'))
+        thresholds = RFMScoringService.calibrate_thresholds(today=TODAY)
+        self.assertEqual(len(set(thresholds.frequency_counts)), 1)
+        self.assertEqual(len(set(thresholds.monetary_amounts)), 1)
+        Contact.objects.all().delete()
+
+        self.assertScorersMatchReference(thresholds)
+
+    def test_activating_thresholds_replaces_cached_set(self):
+        self.assertIsNone(RFMThresholdSet.get_active().pk)
+
+        thresholds = duplicate_thresholds()
+        thresholds.save()
+        thresholds.activate()
+
+        self.assertEqual(RFMThresholdSet.get_active(), thresholds)
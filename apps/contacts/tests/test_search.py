@@ -0,0 +1,123 @@
+"""
+Tests for contact search and autocomplete
+"""
+
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from ..models import Contact, ContactTag, ContactTagAssignment
+from ..services import ContactSearchService
+from . import requires_postgres
+
+requires_trigrams = skipUnless(ContactSearchService.uses_trigrams(), 'Needs the pg_trgm extension')
+
+
+@requires_postgres
+class SearchTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.mary = Contact.objects.create(first_name='Mary', last_name='Shelley', email='mshelley@example.com')
+        cls.percy = Contact.objects.create(first_name='Percy', last_name='Shelley', email='percy@example.org',
+                                           contact_type='donor')
+        cls.ann = Contact.objects.create(first_name='Ann', last_name='Radcliffe', email='ann@example.com',
+                                         contact_type='donor', donor_segment='champions')
+
+    def search(self, query, **kwargs):
+        return list(ContactSearchService.search(query, **kwargs))
+
+    def test_blank_query_matches_everyone(self):
+        self.assertEqual(len(self.search('  ')), 3)
+
+    @requires_trigrams
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search('mary shelley'), [self.mary])
+        self.assertEqual(self.search('shelley example.org'), [self.percy])
+
+    @requires_trigrams
+    def test_misspelled_name_matches(self):
+        self.assertCountEqual(self.search('Shelly', ranked=False), [self.mary, self.percy])
+
+    @requires_trigrams
+    def test_closest_match_ranks_first(self):
+        Contact.objects.create(first_name='Anne', last_name='Radcliff', email='anne@example.net')
+
+        results = self.search('Radcliffe')
+
+        self.assertEqual(results[0], self.ann)
+        self.assertGreater(results[0].search_rank, results[1].search_rank)
+
+    @requires_trigrams
+    def test_indexes_are_installed(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT indexname FROM pg_indexes WHERE tablename = %s', [Contact._meta.db_table]
+            )
+            indexes = {row[0] for row in cursor.fetchall()}
+
+        self.assertTrue({'contacts_contact_search_trgm', 'contacts_contact_name_trgm'} <= indexes)
+
+    def test_substring_search_without_trigrams(self):
+        with mock.patch.object(ContactSearchService, 'uses_trigrams', return_value=False):
+            self.assertCountEqual(self.search('HELLE'), [self.mary, self.percy])
+            self.assertEqual(self.search('example.org'), [self.percy])
+
+    def test_filter_contacts(self):
+        tag = ContactTag.objects.create(name='Gothic')
+        with self.captureOnCommitCallbacks(execute=True):
+            ContactTagAssignment.objects.create(contact=self.ann, tag=tag)
+
+        for params, expected in (
+            ({'type': 'donor'}, [self.percy, self.ann]),
+            ({'type': 'donor', 'segment': 'champions'}, [self.ann]),
+            ({'tag': str(tag.pk)}, [self.ann]),
+            ({'search': 'percy', 'type': 'donor'}, [self.percy]),
+            ({'search': '', 'type': ''}, [self.mary, self.percy, self.ann]),
+        ):
+            with self.subTest(params=params):
+                self.assertCountEqual(ContactSearchService.filter_contacts(params, ranked=False), expected)
+
+
+@requires_postgres
+class AutocompleteTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.mary = Contact.objects.create(first_name='Mary Ann', last_name='Shelley', email='mshelley@example.com')
+        cls.percy = Contact.objects.create(first_name='Percy', last_name='Shelley', email='percy@example.org')
+        cls.ann = Contact.objects.create(first_name='Ann', last_name='Radcliffe', email='ann@example.com',
+                                         contact_type='donor')
+
+    def ids(self, query, limit=10):
+        return [result['id'] for result in ContactSearchService.autocomplete(query, limit=limit)]
+
+    def test_prefix_of_any_name_word(self):
+        self.assertEqual(self.ids('ann'), [str(self.ann.pk), str(self.mary.pk)])
+
+    def test_prefix_of_email(self):
+        self.assertEqual(self.ids('PERCY@'), [str(self.percy.pk)])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.ids('shel perc'), [str(self.percy.pk)])
+        self.assertEqual(self.ids('shel radc'), [])
+
+    def test_infix_is_not_a_prefix(self):
+        self.assertEqual(self.ids('elley'), [])
+
+    def test_results_are_limited_and_in_name_order(self):
+        self.assertEqual(self.ids('shelley', limit=1), [str(self.mary.pk)])
+
+    def test_result_format(self):
+        [result] = ContactSearchService.autocomplete('radcliffe')
+
+        self.assertEqual(result, {
+            'id': str(self.ann.pk),
+            'text': 'Ann Radcliffe (ann@example.com)',
+            'email': 'ann@example.com',
+            'type': 'donor',
+        })
+
+    def test_blank_query(self):
+        self.assertEqual(ContactSearchService.autocomplete('   '), [])
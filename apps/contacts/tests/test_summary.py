@@ -0,0 +1,82 @@
+"""
+Tests for the cached contact 360 summary
+"""
+
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+
+from apps.transactions.models import Transaction
+from ..models import Contact
+from ..services import ContactSummaryService
+from . import requires_postgres
+
+
+@requires_postgres
+class ContactSummaryTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.contact = Contact.objects.create(first_name='Ada', last_name='Lovelace', email='ada@example.com')
+
+    def give(self, amount='10.00', status='completed'):
+        return Transaction.objects.create(
+            contact=self.contact,
+            type='donation',
+            amount=Decimal(amount),
+            status=status,
+            payment_method='check'
+        )
+
+    def test_cached_summary_is_reused(self):
+        ContactSummaryService.get_summary(self.contact)
+
+        with self.assertNumQueries(0):
+            ContactSummaryService.get_summary(self.contact)
+
+    def test_committed_gift_replaces_summary(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.give('10.00')
+        summary = ContactSummaryService.get_summary(self.contact)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.give('20.00')
+
+        refreshed = ContactSummaryService.get_summary(self.contact)
+        self.assertEqual(len(refreshed['recent_transactions']), len(summary['recent_transactions']) + 1)
+
+    def test_batch_invalidates_once_per_commit(self):
+        version = ContactSummaryService._version(self.contact.pk)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                for _ in range(25):
+                    self.give(status='pending')
+
+        summary_flushes = [
+            callback for callback in callbacks
+            if getattr(getattr(callback, '__self__', None), 'key', (None,))[0] == 'summary'
+        ]
+        self.assertEqual(len(summary_flushes), 1)
+        self.assertEqual(summary_flushes[0].__self__.contact_ids, {self.contact.pk})
+
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(ContactSummaryService._version(self.contact.pk), version)
+
+    def test_rolled_back_savepoint_still_invalidates_committed_rows(self):
+        version = ContactSummaryService._version(self.contact.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                try:
+                    with transaction.atomic():
+                        self.give(status='pending')
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                self.give(status='pending')
+
+        self.assertNotEqual(ContactSummaryService._version(self.contact.pk), version)
@@ -0,0 +1,168 @@
+"""
+Tests for set-based tagging and the denormalized Contact.tag_ids
+"""
+
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.test import TestCase
+
+from ..models import Contact, ContactTag, ContactTagAssignment
+from ..serializers import ContactBulkTagSerializer
+from ..services import ContactTagService
+from . import requires_postgres
+
+
+class TagTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.poets = ContactTag.objects.create(name='Poets')
+        cls.patrons = ContactTag.objects.create(name='Patrons')
+        cls.donor = Contact.objects.create(
+            first_name='John', last_name='Keats', email='keats@example.com', contact_type='donor'
+        )
+        cls.prospect = Contact.objects.create(
+            first_name='Fanny', last_name='Brawne', email='brawne@example.com', contact_type='prospect'
+        )
+
+    def assertTagIdsMatchAssignments(self):
+        for contact in Contact.objects.all():
+            assigned = sorted(
+                ContactTagAssignment.objects.filter(contact=contact).values_list('tag_id', flat=True)
+            )
+            with self.subTest(contact=contact.email):
+                self.assertEqual(sorted(contact.tag_ids), assigned)
+
+
+@requires_postgres
+class BulkTaggingTest(TagTestCase):
+    """ContactTagService.add_tag and remove_tag (user-018)"""
+
+    def test_add_tag_by_filter(self):
+        contacts = ContactTagService.select_contacts(filters={'type': 'donor'})
+
+        added = ContactTagService.add_tag(self.poets, contacts)
+
+        self.assertEqual(added, 1)
+        self.assertEqual(list(self.poets.contact_assignments.values_list('contact_id', flat=True)), [self.donor.pk])
+        self.assertTagIdsMatchAssignments()
+
+    def test_add_tag_skips_tagged_contacts(self):
+        contacts = ContactTagService.select_contacts(contact_ids=[self.donor.pk, self.prospect.pk])
+        ContactTagService.add_tag(self.poets, ContactTagService.select_contacts(contact_ids=[self.donor.pk]))
+
+        self.assertEqual(ContactTagService.add_tag(self.poets, contacts), 1)
+        self.assertTagIdsMatchAssignments()
+
+    def test_unfiltered_selection_is_refused(self):
+        for filters in ({}, {'search': '', 'type': ''}):
+            with self.subTest(filters=filters):
+                contacts = ContactTagService.select_contacts(filters=filters)
+                with self.assertRaises(ValidationError):
+                    ContactTagService.add_tag(self.poets, contacts)
+                with self.assertRaises(ValidationError):
+                    ContactTagService.remove_tag(self.poets, contacts)
+
+        self.assertFalse(ContactTagAssignment.objects.exists())
+
+    def test_empty_id_list_tags_nobody(self):
+        contacts = ContactTagService.select_contacts(contact_ids=[])
+
+        self.assertEqual(ContactTagService.add_tag(self.poets, contacts), 0)
+        self.assertFalse(ContactTagAssignment.objects.exists())
+
+    def test_failed_sync_rolls_back_assignments(self):
+        contacts = ContactTagService.select_contacts(contact_ids=[self.donor.pk])
+
+        with mock.patch.object(ContactTagService, 'sync_tag_ids', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                ContactTagService.add_tag(self.poets, contacts)
+
+        self.assertFalse(ContactTagAssignment.objects.exists())
+        self.assertTagIdsMatchAssignments()
+
+    def test_remove_tag(self):
+        contacts = ContactTagService.select_contacts(contact_ids=[self.donor.pk, self.prospect.pk])
+        ContactTagService.add_tag(self.poets, contacts)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            removed = ContactTagService.remove_tag(self.poets, ContactTagService.select_contacts(
+                filters={'type': 'prospect'}
+            ))
+
+        self.assertEqual(removed, 1)
+        self.assertTagIdsMatchAssignments()
+
+    def test_serializer_requires_a_filter(self):
+        serializer = ContactBulkTagSerializer(data={'tag': self.poets.pk, 'filters': {'search': ''}})
+
+        self.assertFalse(serializer.is_valid())
+
+
+@requires_postgres
+class TagIdsSyncTest(TagTestCase):
+    """Contact.tag_ids follows assignments however they change (user-019)"""
+
+    def test_assignment_save_and_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            assignment = ContactTagAssignment.objects.create(contact=self.donor, tag=self.poets)
+        self.assertTagIdsMatchAssignments()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            assignment.delete()
+        self.assertTagIdsMatchAssignments()
+
+    def test_moved_assignment_updates_both_contacts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            assignment = ContactTagAssignment.objects.create(contact=self.donor, tag=self.poets)
+
+        assignment.contact = self.prospect
+        with self.captureOnCommitCallbacks(execute=True):
+            assignment.save()
+
+        self.assertTagIdsMatchAssignments()
+
+    def test_queryset_delete_syncs_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ContactTagService.add_tag(self.poets, Contact.objects.filter(pk__in=[self.donor.pk, self.prospect.pk]))
+            ContactTagService.add_tag(self.patrons, Contact.objects.filter(pk=self.donor.pk))
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                ContactTagAssignment.objects.filter(tag=self.poets).delete()
+
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertTagIdsMatchAssignments()
+
+    def test_tag_delete_cascade(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ContactTagService.add_tag(self.poets, Contact.objects.filter(pk=self.donor.pk))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ContactTag.objects.filter(pk=self.poets.pk).delete()
+
+        self.assertTagIdsMatchAssignments()
+
+    def test_rolled_back_assignment_leaves_tag_ids(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                try:
+                    with transaction.atomic():
+                        ContactTagAssignment.objects.create(contact=self.donor, tag=self.poets)
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                ContactTagAssignment.objects.create(contact=self.prospect, tag=self.patrons)
+
+        self.assertTagIdsMatchAssignments()
+
+    def test_tag_filter_uses_tag_ids(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ContactTagService.add_tag(self.patrons, Contact.objects.filter(pk=self.prospect.pk))
+
+        contacts = ContactTagService.select_contacts(filters={'tag': str(self.patrons.pk)})
+
+        self.assertEqual(list(contacts), [self.prospect])
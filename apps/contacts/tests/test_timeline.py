@@ -0,0 +1,102 @@
+"""
+Tests for the merged contact activity timeline
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.communications.models import Communication
+from apps.events.models import Event, EventAttendance
+from apps.transactions.models import Campaign, Transaction
+from ..models import Contact
+from ..pagination import InvalidCursor
+from ..timeline import ContactTimeline
+from . import requires_postgres
+
+
+def aware(day, hour=12):
+    return timezone.make_aware(datetime(2024, 2, day, hour))
+
+
+@requires_postgres
+class ContactTimelineTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.contact = Contact.objects.create(first_name='Mary', last_name='Shelley', email='mary@example.com')
+        other = Contact.objects.create(first_name='Percy', last_name='Shelley')
+        campaign = Campaign.objects.create(name='Spring Appeal', start_date=date(2024, 1, 1))
+        event = Event.objects.create(name='Poetry Night', event_type='reading', event_date=date(2024, 2, 10))
+
+        # Several entries share a timestamp, within and across sources
+        for contact in (cls.contact, other):
+            for day in (1, 3, 3, 5):
+                Transaction.objects.create(
+                    contact=contact, type='donation', amount=Decimal('10.00'), status='completed',
+                    payment_method='check', campaign=campaign, transaction_date=aware(day)
+                )
+            for day in (2, 3, 3):
+                communication = Communication.objects.create(
+                    contact=contact, type='email', direction='outbound', subject=f'Note {day}', content='Hello'
+                )
+                Communication.objects.filter(pk=communication.pk).update(created_at=aware(day))
+            attendance = EventAttendance.objects.create(contact=contact, event=event)
+            EventAttendance.objects.filter(pk=attendance.pk).update(registration_date=aware(3))
+
+    def expected(self):
+        rank = {kind: source[0] for kind, source in ContactTimeline.SOURCES.items()}
+        entries = [
+            (row.transaction_date, rank['transaction'], row.id) for row in self.contact.transactions.all()
+        ] + [
+            (row.created_at, rank['communication'], row.id) for row in self.contact.communications.all()
+        ] + [
+            (row.registration_date, rank['attendance'], row.id) for row in self.contact.event_attendance.all()
+        ]
+        return sorted(entries, reverse=True)
+
+    def walk(self, per_page):
+        timeline = ContactTimeline(self.contact, per_page=per_page)
+        entries, cursor = [], None
+        while True:
+            page = timeline.page(cursor)
+            entries.extend(page)
+            if not page.has_next():
+                return entries
+            cursor = page.next_cursor
+
+    def test_pages_follow_the_merged_order(self):
+        for per_page in (1, 2, 3, 25):
+            with self.subTest(per_page=per_page):
+                entries = self.walk(per_page)
+                self.assertEqual(
+                    [(entry['date'], ContactTimeline.SOURCES[entry['kind']][0], entry['id']) for entry in entries],
+                    self.expected()
+                )
+
+    def test_page_is_one_query_per_source(self):
+        timeline = ContactTimeline(self.contact, per_page=3)
+        cursor = timeline.page().next_cursor
+
+        with self.assertNumQueries(len(ContactTimeline.SOURCES)):
+            page = timeline.page(cursor)
+
+        self.assertEqual(len(page), 3)
+
+    def test_entries(self):
+        entries = self.walk(25)
+        by_kind = {entry['kind']: entry for entry in entries}
+
+        self.assertEqual(by_kind['transaction']['campaign'], 'Spring Appeal')
+        self.assertEqual(by_kind['attendance']['event'], 'Poetry Night')
+        self.assertTrue(by_kind['communication']['subject'].startswith('Note'))
+
+    def test_invalid_cursor(self):
+        timeline = ContactTimeline(self.contact)
+        unknown_kind = ContactTimeline.encode_cursor({'date': aware(1), 'kind': 'memo', 'id': self.contact.pk})
+        for cursor in ('bogus', unknown_kind):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidCursor):
+                    timeline.page(cursor)
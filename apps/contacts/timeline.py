@@ -0,0 +1,143 @@
+"""
+Merged activity timeline for a contact
+
+Transactions, communications and event attendance are read newest first
+through one keyset query per source, each bounded to a page and ordered by
+a ``(contact, date, id)`` index, and merged with ``heapq.merge``. A page
+therefore costs three index range scans however long the contact's history
+is. The cursor is the sort key of the last entry shown.
+"""
+
+import base64
+import heapq
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Optional
+from uuid import UUID
+
+from django.db.models import Q
+
+from .models import Contact
+from .pagination import InvalidCursor, KeysetPage
+
+
+class ContactTimeline:
+    """
+    Newest-first feed of a contact's activity.
+
+    Entries are ordered by ``(date, kind rank, id)`` descending, which is a
+    total order across the three sources, so entries sharing a timestamp are
+    never skipped or repeated between pages.
+    """
+
+    # kind: (rank, related name, date field)
+    SOURCES = {
+        'transaction': (2, 'transactions', 'transaction_date'),
+        'communication': (1, 'communications', 'created_at'),
+        'attendance': (0, 'event_attendance', 'registration_date'),
+    }
+
+    def __init__(self, contact: Contact, per_page: int = 25):
+        self.contact = contact
+        self.per_page = per_page
+
+    # Cursor tokens
+
+    @staticmethod
+    def encode_cursor(entry: dict) -> str:
+        position = [entry['date'].isoformat(), entry['kind'], str(entry['id'])]
+        payload = json.dumps({'p': position}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, token: str) -> tuple:
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            date, kind, entry_id = json.loads(base64.urlsafe_b64decode(padded.encode()))['p']
+            date = datetime.fromisoformat(date)
+            entry_id = UUID(entry_id)
+        except (TypeError, ValueError, KeyError):
+            raise InvalidCursor('Invalid cursor')
+        if kind not in self.SOURCES:
+            raise InvalidCursor('Invalid cursor')
+        return date, self.SOURCES[kind][0], entry_id
+
+    # Sources
+
+    def _queryset(self, kind: str):
+        _, related_name, _ = self.SOURCES[kind]
+        queryset = getattr(self.contact, related_name).all()
+        if kind == 'transaction':
+            return queryset.select_related('campaign')
+        if kind == 'attendance':
+            return queryset.select_related('event')
+        return queryset
+
+    def _seek(self, kind: str, position: Optional[tuple]) -> Q:
+        """Rows of one source after ``position`` in the merged order"""
+        if position is None:
+            return Q()
+        rank, _, date_field = self.SOURCES[kind]
+        date, cursor_rank, entry_id = position
+        if rank < cursor_rank:
+            return Q(**{f'{date_field}__lte': date})
+        if rank > cursor_rank:
+            return Q(**{f'{date_field}__lt': date})
+        return Q(**{f'{date_field}__lt': date}) | Q(**{date_field: date, 'id__lt': entry_id})
+
+    def _entries(self, kind: str, position: Optional[tuple], limit: int):
+        _, _, date_field = self.SOURCES[kind]
+        rows = self._queryset(kind).filter(self._seek(kind, position)).order_by(f'-{date_field}', '-id')[:limit]
+        for row in rows:
+            yield self._entry(kind, row)
+
+    def _entry(self, kind: str, row) -> dict:
+        if kind == 'transaction':
+            return {
+                'kind': kind,
+                'id': row.id,
+                'date': row.transaction_date,
+                'type': row.type,
+                'status': row.status,
+                'amount': row.amount,
+                'campaign': row.campaign.name if row.campaign else None,
+            }
+        if kind == 'communication':
+            return {
+                'kind': kind,
+                'id': row.id,
+                'date': row.created_at,
+                'type': row.type,
+                'direction': row.direction,
+                'subject': row.subject,
+            }
+        return {
+            'kind': kind,
+            'id': row.id,
+            'date': row.registration_date,
+            'event_id': row.event_id,
+            'event': row.event.name,
+            'attendance_status': row.attendance_status,
+        }
+
+    def _sort_key(self, entry: dict) -> tuple:
+        return entry['date'], self.SOURCES[entry['kind']][0], entry['id']
+
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        """The entries following the cursor, newest first"""
+        position = self.decode_cursor(cursor) if cursor else None
+
+        # No source can contribute more than a page, plus one to detect a next page
+        limit = self.per_page + 1
+        merged = heapq.merge(
+            *(self._entries(kind, position, limit) for kind in self.SOURCES),
+            key=self._sort_key,
+            reverse=True
+        )
+        entries = list(islice(merged, limit))
+
+        next_cursor = None
+        if len(entries) > self.per_page:
+            entries = entries[:self.per_page]
+            next_cursor = self.encode_cursor(entries[-1])
+        return KeysetPage(entries, next_cursor, None)
@@ -18,6 +18,7 @@ urlpatterns = [
     # Bulk operations
     path('bulk/export/', views.ContactExportView.as_view(), name='bulk_export'),
     path('bulk/import/', views.ContactImportView.as_view(), name='bulk_import'),
+    path('bulk/import/errors/<str:name>/', views.contact_import_errors, name='import_errors'),
     path('bulk/tag/', views.ContactBulkTagView.as_view(), name='bulk_tag'),
     
     # Relationships
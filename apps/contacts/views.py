@@ -1,17 +1,27 @@
+import os
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import (
-    ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
+    ListView, DetailView, CreateView, UpdateView, DeleteView, FormView, TemplateView, View
 )
-from django.http import JsonResponse, HttpResponse
-from django.db.models import Q, Count, Sum
+from django.http import FileResponse, Http404, JsonResponse, HttpResponse, StreamingHttpResponse
+from django.db.models import Count, Sum
 from django.contrib import messages
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
 from django.core.paginator import Paginator
 
 from .models import Contact, ContactRelationship, ContactTag, ContactTagAssignment
-from .forms import ContactForm, ContactSearchForm, ContactTagForm
+from .pagination import InvalidCursor, KeysetPaginator
+from .services import (
+    ContactExportService, ContactImportService, ContactNetworkService, ContactSearchService, ContactSummaryService,
+    ContactTagService
+)
+from .forms import BulkTagForm, ContactForm, ContactImportForm, ContactSearchForm, ContactTagForm
 
 
 class ContactListView(LoginRequiredMixin, ListView):
@@ -21,36 +31,42 @@ class ContactListView(LoginRequiredMixin, ListView):
     paginate_by = 25
     
     def get_queryset(self):
-        queryset = Contact.objects.all()
-        
-        # Search functionality
-        search_query = self.request.GET.get('search')
-        if search_query:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search_query) |
-                Q(last_name__icontains=search_query) |
-                Q(email__icontains=search_query)
-            )
-        
-        # Filter by contact type
-        contact_type = self.request.GET.get('type')
-        if contact_type:
-            queryset = queryset.filter(contact_type=contact_type)
-        
-        # Filter by donor segment
-        segment = self.request.GET.get('segment')
-        if segment:
-            queryset = queryset.filter(donor_segment=segment)
-        
-        # Filter by tags
-        tag = self.request.GET.get('tag')
-        if tag:
-            queryset = queryset.filter(tag_assignments__tag__id=tag)
+        ranked = self.is_ranked_search()
+        queryset = ContactSearchService.filter_contacts(self.request.GET, ranked=ranked)
+        if ranked:
+            return queryset  # already ranked by match quality
+        return queryset.select_related().order_by('last_name', 'first_name', 'id')
+    
+    def is_ranked_search(self):
+        return bool(self.request.GET.get('search')) and ContactSearchService.uses_trigrams()
+    
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Browse by name with keyset cursors so deep pages cost the same as the
+        first. Ranked search results are short and keep page numbers.
+        """
+        if self.is_ranked_search():
+            return super().paginate_queryset(queryset, page_size)
         
-        return queryset.select_related().order_by('last_name', 'first_name')
+        paginator = KeysetPaginator(queryset, page_size, ('last_name', 'first_name', 'id'))
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Invalid page cursor')
+        self.total_count, self.total_is_estimate = paginator.total()
+        return (paginator, page, page.object_list, page.has_other_pages())
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        if hasattr(self, 'total_count'):
+            context['total_count'] = self.total_count
+            context['total_is_estimate'] = self.total_is_estimate
+        
+        # Filters carried over by the pagination links
+        params = self.request.GET.copy()
+        params.pop('cursor', None)
+        params.pop('page', None)
+        context['filter_query'] = params.urlencode()
         context['search_form'] = ContactSearchForm(self.request.GET)
         context['contact_types'] = Contact.CONTACT_TYPES
         context['donor_segments'] = Contact.DONOR_SEGMENTS
@@ -65,26 +81,9 @@ class ContactDetailView(LoginRequiredMixin, DetailView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        contact = self.object
-        
-        # Get related data
-        context['recent_transactions'] = contact.transactions.filter(
-            status='completed'
-        ).order_by('-transaction_date')[:10]
-        
-        context['recent_communications'] = contact.communications.order_by(
-            '-created_at'
-        )[:10]
-        
-        context['event_attendance'] = contact.event_attendance.select_related(
-            'event'
-        ).order_by('-event__event_date')[:10]
-        
-        context['relationships'] = contact.relationships_from.select_related(
-            'to_contact'
-        ).all()
         
-        context['tags'] = contact.tag_assignments.select_related('tag').all()
+        # Recent transactions, communications, event attendance, relationships and tags
+        context.update(ContactSummaryService.get_summary(self.object))
         
         return context
 
@@ -122,16 +121,104 @@ class ContactDeleteView(LoginRequiredMixin, DeleteView):
         return super().delete(request, *args, **kwargs)
 
 
-class ContactExportView(LoginRequiredMixin, TemplateView):
-    template_name = 'contacts/contact_export.html'
+class ContactExportView(LoginRequiredMixin, View):
+    """
+    Stream the contacts matching the contact list filters as CSV (default)
+    or, with ``format=xlsx``, as an Excel workbook
+    """
+    
+    def get(self, request):
+        queryset = ContactSearchService.filter_contacts(request.GET, ranked=False)
+        filename = f"contacts-{timezone.localdate():%Y%m%d}"
+        
+        if request.GET.get('format') == 'xlsx':
+            return FileResponse(
+                ContactExportService.xlsx_file(queryset),
+                as_attachment=True,
+                filename=f"{filename}.xlsx",
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            )
+        
+        response = StreamingHttpResponse(
+            ContactExportService.csv_chunks(queryset),
+            content_type='text/csv'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+        return response
 
 
-class ContactImportView(LoginRequiredMixin, TemplateView):
+class ContactImportView(LoginRequiredMixin, FormView):
+    """Import contacts from a CSV upload and show the outcome"""
     template_name = 'contacts/contact_import.html'
+    form_class = ContactImportForm
+    
+    def form_valid(self, form):
+        result = ContactImportService.import_csv(
+            form.cleaned_data['csv_file'],
+            has_header=form.cleaned_data['has_header'],
+            update_existing=form.cleaned_data['update_existing'],
+            user=self.request.user
+        )
+        
+        messages.success(
+            self.request,
+            f"Import finished: {result['created']} created, {result['updated']} updated, "
+            f"{result['skipped']} skipped, {result['errors']} rejected."
+        )
+        context = self.get_context_data(form=self.form_class(), result=result)
+        if result['error_report']:
+            context['error_report_name'] = os.path.basename(result['error_report'])
+        return self.render_to_response(context)
 
 
-class ContactBulkTagView(LoginRequiredMixin, TemplateView):
+@login_required
+def contact_import_errors(request, name):
+    """Download the error report of a contact import"""
+    path = f"{ContactImportService.ERROR_REPORT_DIR}/{name}"
+    if '/' in name or not default_storage.exists(path):
+        raise Http404('Error report not found')
+    return FileResponse(default_storage.open(path), as_attachment=True, filename=name, content_type='text/csv')
+
+
+class ContactBulkTagView(LoginRequiredMixin, FormView):
+    """
+    Add or remove a tag on the contacts selected by id, or on every contact
+    matching the contact list filters in the query string
+    """
     template_name = 'contacts/contact_bulk_tag.html'
+    form_class = BulkTagForm
+    
+    def get_filters(self):
+        filters = self.request.GET.copy()
+        filters.pop('cursor', None)
+        filters.pop('page', None)
+        return filters
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        filters = self.get_filters()
+        context['filter_query'] = filters.urlencode()
+        context['matched_count'] = ContactSearchService.filter_contacts(filters, ranked=False).count()
+        return context
+    
+    def form_valid(self, form):
+        contacts = ContactTagService.select_contacts(
+            contact_ids=form.cleaned_data['contact_ids'],
+            filters=self.get_filters()
+        )
+        tag = form.cleaned_data['tag']
+        action = form.cleaned_data['action']
+        try:
+            affected = ContactTagService.apply(tag, action, contacts, user=self.request.user)
+        except ValidationError as e:
+            form.add_error(None, e)
+            return self.form_invalid(form)
+        
+        if action == 'remove':
+            messages.success(self.request, f"Removed tag '{tag.name}' from {affected} contacts.")
+        else:
+            messages.success(self.request, f"Added tag '{tag.name}' to {affected} contacts.")
+        return redirect(f"{reverse('contacts:list')}?{self.get_filters().urlencode()}")
 
 
 class ContactRelationshipView(LoginRequiredMixin, TemplateView):
@@ -143,6 +230,12 @@ class ContactRelationshipView(LoginRequiredMixin, TemplateView):
         context['contact'] = contact
         context['relationships_from'] = contact.relationships_from.select_related('to_contact').all()
         context['relationships_to'] = contact.relationships_to.select_related('from_contact').all()
+        
+        try:
+            depth = int(self.request.GET.get('depth', ContactNetworkService.DEFAULT_DEPTH))
+        except ValueError:
+            depth = ContactNetworkService.DEFAULT_DEPTH
+        context['network'] = ContactNetworkService.network(contact, depth=depth, include_giving=True)
         return context
 
 
@@ -167,13 +260,13 @@ def contact_search_ajax(request):
     if len(query) < 2:
         return JsonResponse({'results': []})
     
-    contacts = Contact.objects.filter(
-        Q(first_name__icontains=query) |
-        Q(last_name__icontains=query) |
-        Q(email__icontains=query)
-    )[:10]
+    results = ContactSearchService.autocomplete(query, limit=10)
+    if results:
+        return JsonResponse({'results': results})
+    
+    # Nothing starts with the query: fall back to the typo-tolerant search
+    contacts = ContactSearchService.search(query)[:10]
     
-    results = []
     for contact in contacts:
         results.append({
             'id': str(contact.id),
@@ -218,8 +311,13 @@ def update_rfm_ajax(request, pk):
     if request.method == 'POST':
         contact = get_object_or_404(Contact, pk=pk)
         contact.update_giving_totals()
-        contact.calculate_rfm_score()
-        contact.save()
+        contact.save(update_fields=[
+            'total_lifetime_giving',
+            'donation_count',
+            'last_donation_date',
+            'rfm_score',
+            'donor_segment'
+        ])
         
         return JsonResponse({
             'success': True,
@@ -319,6 +319,8 @@ class EventAttendance(models.Model):
             models.Index(fields=['attendance_status']),
             models.Index(fields=['registration_date']),
             models.Index(fields=['checked_in_at']),
+            # Contact timelines, newest first
+            models.Index(fields=['contact', '-registration_date', '-id']),
         ]
     
     def __str__(self):
@@ -1,11 +1,15 @@
 from django.contrib import admin
+from django.db import transaction as db_transaction
 from django.utils.html import format_html
-from .models import Campaign, Transaction, RecurringDonation, Pledge, TaxReceipt
+from .models import Campaign, CampaignDonor, Transaction, RecurringDonation, Pledge, TaxReceipt
+from apps.analytics.services import GivingFactService, RevenueRollupService
+from apps.contacts.services import ContactSummaryService
+from .services import GivingTotalsRefresher
 
 
 @admin.register(Campaign)
 class CampaignAdmin(admin.ModelAdmin):
-    list_display = ['name', 'start_date', 'end_date', 'goal_amount', 'total_raised', 'progress_display', 'is_active']
+    list_display = ['name', 'start_date', 'end_date', 'goal_amount', 'total_raised', 'donor_count', 'progress_display', 'is_active']
     list_filter = ['is_active', 'is_public', 'start_date']
     search_fields = ['name', 'description']
     readonly_fields = ['total_raised', 'donor_count', 'created_at', 'updated_at']
@@ -21,6 +25,19 @@ class CampaignAdmin(admin.ModelAdmin):
     progress_display.short_description = 'Progress'
 
 
+@admin.register(CampaignDonor)
+class CampaignDonorAdmin(admin.ModelAdmin):
+    list_display = ['campaign', 'contact', 'gift_count', 'total_amount']
+    list_filter = ['campaign']
+    search_fields = ['contact__first_name', 'contact__last_name', 'campaign__name']
+    
+    def has_add_permission(self, request):
+        return False  # Donor sets are maintained from transactions
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
     list_display = ['contact', 'type', 'amount', 'status', 'payment_method', 'transaction_date', 'campaign']
@@ -70,7 +87,23 @@ class TransactionAdmin(admin.ModelAdmin):
     actions = ['mark_as_completed', 'send_receipts']
     
     def mark_as_completed(self, request, queryset):
-        updated = queryset.filter(status__in=['pending', 'processing']).update(status='completed')
+        pending = queryset.filter(status__in=['pending', 'processing'])
+        affected = list(pending.values_list('contact_id', 'campaign_id', 'type', 'transaction_date'))
+        updated = pending.update(status='completed')
+        
+        # Bulk update bypasses Transaction.save, so queue the totals refresh here
+        GivingTotalsRefresher.mark_dirty(
+            contact_ids=[contact_id for contact_id, _, txn_type, _ in affected if txn_type == 'donation'],
+            campaign_ids=[campaign_id for _, campaign_id, _, _ in affected]
+        )
+        RevenueRollupService.schedule_rebuild(
+            RevenueRollupService.month_of(transaction_date) for *_, transaction_date in affected
+        )
+        GivingFactService.schedule_rebuild(
+            GivingFactService.date_of(transaction_date) for *_, transaction_date in affected
+        )
+        contact_ids = {contact_id for contact_id, *_ in affected}
+        db_transaction.on_commit(lambda: ContactSummaryService.invalidate(contact_ids))
         self.message_user(request, f"Marked {updated} transactions as completed.")
     mark_as_completed.short_description = "Mark selected as completed"
     
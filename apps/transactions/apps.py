@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class TransactionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.transactions'
-    verbose_name = 'Transaction Management'
\ No newline at end of file
+    verbose_name = 'Transaction Management'
+    
+    def ready(self):
+        """Import signal handlers when the app is ready"""
+        import apps.transactions.signals
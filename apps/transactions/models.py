@@ -56,14 +56,32 @@ class Campaign(models.Model):
         return self.start_date <= today <= self.end_date and self.is_active
     
     def update_totals(self):
-        """Update calculated fields based on transactions"""
-        completed_transactions = self.transactions.filter(status='completed')
-        self.total_raised = completed_transactions.aggregate(
-            total=models.Sum('amount')
-        )['total'] or Decimal('0.00')
+        """
+        Rebuild calculated fields and the donor set from transactions.
+        Day-to-day changes are applied incrementally by CampaignTotalsService.
+        """
+        from .services import GivingTotalsRefresher
         
-        self.donor_count = completed_transactions.values('contact').distinct().count()
-        self.save(update_fields=['total_raised', 'donor_count'])
+        GivingTotalsRefresher.refresh_campaigns([self.pk])
+        self.refresh_from_db(fields=['total_raised', 'donor_count'])
+
+
+class CampaignDonor(models.Model):
+    """
+    Membership of a contact in a campaign's donor set, maintained on every
+    completed transaction so donor_count never needs a DISTINCT scan
+    """
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='donor_memberships')
+    contact = models.ForeignKey('contacts.Contact', on_delete=models.CASCADE, 
+                               related_name='campaign_memberships')
+    gift_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    
+    class Meta:
+        unique_together = ['campaign', 'contact']
+    
+    def __str__(self):
+        return f"{self.contact} - {self.campaign}"
 
 
 class Transaction(models.Model):
@@ -121,6 +139,9 @@ class Transaction(models.Model):
         ('disputed', 'Disputed'),
     ]
     
+    # Fields whose changes affect Contact giving counters and Campaign totals
+    GIVING_TRACKED_FIELDS = ['contact_id', 'campaign_id', 'type', 'status', 'amount', 'transaction_date']
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     contact = models.ForeignKey('contacts.Contact', on_delete=models.CASCADE, related_name='transactions')
     
@@ -196,6 +217,8 @@ class Transaction(models.Model):
         ordering = ['-transaction_date']
         indexes = [
             models.Index(fields=['transaction_date']),
+            # Contact timelines and summaries, newest first
+            models.Index(fields=['contact', '-transaction_date', '-id']),
             models.Index(fields=['type']),
             models.Index(fields=['status']),
             models.Index(fields=['payment_method']),
@@ -208,7 +231,8 @@ class Transaction(models.Model):
         return f"{self.contact} - ${self.amount} ({self.type})"
     
     def get_absolute_url(self):
-        return reverse('transactions:detail', kwargs={'pk': self.pk})
+        # Transactions are edited in the admin; the app only routes reports
+        return reverse('admin:transactions_transaction_change', args=[self.pk])
     
     @property
     def net_amount(self):
@@ -218,27 +242,81 @@ class Transaction(models.Model):
     @property
     def deductible_amount(self):
         """Calculate tax-deductible amount"""
-        if not self.is_tax_deductible:
+        return self.deductible_amount_for(
+            self.is_tax_deductible, self.tax_deductible_amount, self.amount, self.quid_pro_quo_value
+        )
+    
+    @staticmethod
+    def deductible_amount_for(is_tax_deductible, tax_deductible_amount, amount, quid_pro_quo_value):
+        """Tax-deductible amount for the given field values"""
+        if not is_tax_deductible:
             return Decimal('0.00')
         
-        if self.tax_deductible_amount is not None:
-            return self.tax_deductible_amount
+        if tax_deductible_amount is not None:
+            return tax_deductible_amount
         
         # Default calculation: full amount minus quid pro quo value
-        return max(Decimal('0.00'), self.amount - self.quid_pro_quo_value)
+        return max(Decimal('0.00'), amount - quid_pro_quo_value)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Keep the loaded values so saves can apply giving deltas"""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
+    def _previous_values(self):
+        """
+        Values as last loaded from or saved to the database (None when new).
+        Fields deferred when the transaction was loaded are read from its row,
+        which still holds them until the save.
+        """
+        if self._state.adding:
+            return None
+        # An empty snapshot makes every field unknown and forces a rescan
+        previous = getattr(self, '_loaded_values', {})
+        missing = [field.attname for field in self._meta.concrete_fields if field.attname not in previous]
+        if previous and missing:
+            row = Transaction._base_manager.filter(pk=self.pk).values(*missing).first()
+            if row:
+                previous.update(row)
+        return previous
+    
+    def current_values(self, fields, previous=None):
+        """
+        Current values of ``fields``. Deferred fields have not changed since
+        ``previous`` was loaded, so they are taken from it instead of reloaded.
+        """
+        previous = previous or {}
+        return {
+            field: previous[field] if field not in self.__dict__ and field in previous else getattr(self, field)
+            for field in fields
+        }
+    
+    def _reset_loaded_values(self, previous, update_fields=None):
+        """
+        Snapshot the saved values on top of ``previous``. Deferred fields are
+        never read here, since each read would reload the row.
+        """
+        loaded = dict(previous or {})
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__:
+                continue
+            if update_fields is not None and field.name not in update_fields:
+                continue
+            loaded[field.attname] = self.__dict__[field.attname]
+        self._loaded_values = loaded
     
     def save(self, *args, **kwargs):
-        """Override save to update contact giving totals and campaign totals"""
-        is_new = self.pk is None
-        super().save(*args, **kwargs)
+        """Override save to apply giving deltas to contact and campaign totals"""
+        from .services import schedule_giving_refresh
         
-        # Update contact giving totals if this is a completed donation
-        if self.type == 'donation' and self.status == 'completed':
-            self.contact.update_giving_totals()
+        previous = self._previous_values()
+        super().save(*args, **kwargs)
         
-        # Update campaign totals
-        if self.campaign:
-            self.campaign.update_totals()
+        # Counters move by deltas; anything needing a rescan is coalesced per commit
+        schedule_giving_refresh(self, previous)
+        self._reset_loaded_values(previous, kwargs.get('update_fields'))
     
     def process_payment(self, processor_id=None, processor_fee=None):
         """Mark transaction as processed"""
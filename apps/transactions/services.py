@@ -0,0 +1,429 @@
+"""
+Giving aggregate services for MAKE CRM
+Coalesces donor and campaign total recalculation so each affected record is
+refreshed once per database transaction instead of once per saved row
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.db import IntegrityError, transaction as db_transaction
+from django.db.models import DEFERRED, Count, DateField, F, Max, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from apps.contacts.models import Contact, RFMThresholdSet
+from apps.contacts.services import HouseholdService
+from .models import Campaign, CampaignDonor, Transaction
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingRefresh:
+    """Dirty contact and campaign ids waiting for the current commit"""
+
+    def __init__(self, using: str):
+        self.using = using
+        self.contact_ids = set()
+        self.campaign_ids = set()
+        self.rescore_contact_ids = set()
+
+    def update(self, contact_ids, campaign_ids, rescore_contact_ids):
+        self.contact_ids.update(contact_ids)
+        self.campaign_ids.update(campaign_ids)
+        self.rescore_contact_ids.update(rescore_contact_ids)
+
+    def flush(self):
+        """Recompute everything collected for this commit"""
+        pending = _pending_refreshes()
+        if pending.get(self.using) is self:
+            del pending[self.using]
+
+        GivingTotalsRefresher.refresh_contacts(self.contact_ids)
+        GivingTotalsRefresher.rescore_contacts(self.rescore_contact_ids - self.contact_ids)
+        GivingTotalsRefresher.refresh_campaigns(self.campaign_ids)
+        HouseholdService.refresh_totals(self.contact_ids | self.rescore_contact_ids)
+
+
+_local = threading.local()
+
+
+def _pending_refreshes():
+    """Per-thread map of database alias to its pending refresh"""
+    if not hasattr(_local, 'pending'):
+        _local.pending = {}
+    return _local.pending
+
+
+class GivingTotalsRefresher:
+    """
+    Dirty-set refresher for Contact giving totals and Campaign totals.
+
+    Callers mark ids as dirty while saving transactions; the recalculation runs
+    once in ``transaction.on_commit`` using one grouped query per entity type.
+    Wrap imports and other batches in ``transaction.atomic()`` so every row in
+    the batch shares a single refresh. Outside an atomic block the refresh runs
+    immediately, exactly as ``on_commit`` does.
+    """
+
+    CONTACT_FIELDS = [
+        'total_lifetime_giving',
+        'donation_count',
+        'last_donation_date',
+        'rfm_score',
+        'donor_segment',
+    ]
+
+    CAMPAIGN_FIELDS = ['total_raised', 'donor_count']
+
+    @staticmethod
+    def mark_dirty(contact_ids: Iterable = (), campaign_ids: Iterable = (),
+                   rescore_contact_ids: Iterable = (), using: Optional[str] = None):
+        """
+        Queue records for a refresh when the transaction commits.
+
+        ``contact_ids`` get a full rescan of their donations, while
+        ``rescore_contact_ids`` already hold correct counters and only need
+        their RFM score recalculated.
+        """
+        contact_ids = {pk for pk in contact_ids if pk is not None}
+        campaign_ids = {pk for pk in campaign_ids if pk is not None}
+        rescore_contact_ids = {pk for pk in rescore_contact_ids if pk is not None}
+        if not contact_ids and not campaign_ids and not rescore_contact_ids:
+            return
+
+        connection = db_transaction.get_connection(using)
+        pending = _pending_refreshes().get(connection.alias)
+
+        if pending is None or not GivingTotalsRefresher._is_scheduled(connection, pending):
+            pending = _PendingRefresh(connection.alias)
+            pending.update(contact_ids, campaign_ids, rescore_contact_ids)
+            _pending_refreshes()[connection.alias] = pending
+            # Runs immediately when not inside an atomic block
+            db_transaction.on_commit(pending.flush, using=connection.alias)
+        else:
+            pending.update(contact_ids, campaign_ids, rescore_contact_ids)
+
+    @staticmethod
+    def _is_scheduled(connection, pending: _PendingRefresh) -> bool:
+        """Check the pending flush survived any rollback since it was registered"""
+        if not connection.in_atomic_block:
+            return False
+        return any(
+            getattr(callback[1], '__self__', None) is pending
+            for callback in connection.run_on_commit
+        )
+
+    @staticmethod
+    def refresh_contacts(contact_ids: Iterable) -> int:
+        """Recompute giving totals and RFM scores for the given contacts"""
+        contact_ids = list(contact_ids)
+        if not contact_ids:
+            return 0
+
+        totals = {
+            row['contact_id']: row
+            for row in Transaction.objects.filter(
+                contact_id__in=contact_ids,
+                type='donation',
+                status='completed'
+            ).order_by().values('contact_id').annotate(
+                total=Sum('amount'),
+                count=Count('id'),
+                latest=Max('transaction_date')
+            )
+        }
+
+        contacts = list(Contact.objects.filter(pk__in=contact_ids))
+        thresholds = RFMThresholdSet.get_active()
+        for contact in contacts:
+            row = totals.get(contact.pk)
+            contact.total_lifetime_giving = row['total'] if row else Decimal('0.00')
+            contact.donation_count = row['count'] if row else 0
+            contact.last_donation_date = row['latest'].date() if row else None
+            contact.calculate_rfm_score(thresholds)
+
+        Contact.objects.bulk_update(contacts, GivingTotalsRefresher.CONTACT_FIELDS)
+        logger.info(f"Refreshed giving totals for {len(contacts)} contacts")
+        return len(contacts)
+
+    @staticmethod
+    def rescore_contacts(contact_ids: Iterable) -> int:
+        """Recalculate RFM scores from the contacts' stored giving counters"""
+        contact_ids = list(contact_ids)
+        if not contact_ids:
+            return 0
+
+        contacts = list(Contact.objects.filter(pk__in=contact_ids).only(
+            'id', 'last_donation_date', 'donation_count', 'total_lifetime_giving'
+        ))
+        thresholds = RFMThresholdSet.get_active()
+        for contact in contacts:
+            contact.calculate_rfm_score(thresholds)
+
+        Contact.objects.bulk_update(contacts, ['rfm_score', 'donor_segment'])
+        return len(contacts)
+
+    @staticmethod
+    def refresh_campaigns(campaign_ids: Iterable) -> int:
+        """Rebuild raised totals, donor counts and donor sets for the given campaigns"""
+        campaign_ids = list(campaign_ids)
+        if not campaign_ids:
+            return 0
+
+        memberships = list(
+            Transaction.objects.filter(
+                campaign_id__in=campaign_ids,
+                status='completed'
+            ).order_by().values('campaign_id', 'contact_id').annotate(
+                total=Sum('amount'),
+                count=Count('id')
+            )
+        )
+
+        raised = defaultdict(lambda: Decimal('0.00'))
+        donors = defaultdict(int)
+        for row in memberships:
+            raised[row['campaign_id']] += row['total']
+            donors[row['campaign_id']] += 1
+
+        with db_transaction.atomic():
+            CampaignDonor.objects.filter(campaign_id__in=campaign_ids).delete()
+            CampaignDonor.objects.bulk_create([
+                CampaignDonor(
+                    campaign_id=row['campaign_id'],
+                    contact_id=row['contact_id'],
+                    gift_count=row['count'],
+                    total_amount=row['total']
+                )
+                for row in memberships
+            ], batch_size=1000)
+
+            campaigns = list(Campaign.objects.filter(pk__in=campaign_ids))
+            for campaign in campaigns:
+                campaign.total_raised = raised[campaign.pk]
+                campaign.donor_count = donors[campaign.pk]
+
+            Campaign.objects.bulk_update(campaigns, GivingTotalsRefresher.CAMPAIGN_FIELDS)
+
+        logger.info(f"Rebuilt totals for {len(campaigns)} campaigns")
+        return len(campaigns)
+
+
+class ContactGivingService:
+    """
+    Incremental maintenance of Contact giving counters.
+
+    Completing a donation adds its amount with ``F()`` expressions and moves
+    ``last_donation_date`` forward with ``Greatest()``; refunds, cancellations
+    and deletions subtract it again. Only edits that change the amount, date
+    or donor of a counted gift fall back to a full rescan, so a new gift costs
+    one UPDATE no matter how long the donor's history is.
+    """
+
+    @staticmethod
+    def counts_toward_giving(values: dict) -> bool:
+        """Whether a transaction's values make it a completed donation"""
+        return values['type'] == 'donation' and values['status'] == 'completed'
+
+    @staticmethod
+    def gift_date(transaction_date):
+        """Calendar date a donation is credited on"""
+        return transaction_date.date()
+
+    @staticmethod
+    def add_donation(contact_id, amount: Decimal, transaction_date):
+        """Apply a completed donation to the donor's counters"""
+        gift_date = Value(ContactGivingService.gift_date(transaction_date), output_field=DateField())
+        Contact.objects.filter(pk=contact_id).update(
+            total_lifetime_giving=F('total_lifetime_giving') + amount,
+            donation_count=F('donation_count') + 1,
+            last_donation_date=Greatest(Coalesce(F('last_donation_date'), gift_date), gift_date)
+        )
+        GivingTotalsRefresher.mark_dirty(rescore_contact_ids=[contact_id])
+
+    @staticmethod
+    def remove_donation(contact_id, amount: Decimal, transaction_date):
+        """Withdraw a previously counted donation from the donor's counters"""
+        # The latest gift date cannot be un-applied, so when the withdrawn gift
+        # may have been the latest one the donor is rescanned instead
+        updated = Contact.objects.filter(
+            pk=contact_id,
+            last_donation_date__gt=ContactGivingService.gift_date(transaction_date)
+        ).update(
+            total_lifetime_giving=F('total_lifetime_giving') - amount,
+            donation_count=F('donation_count') - 1
+        )
+
+        if updated:
+            GivingTotalsRefresher.mark_dirty(rescore_contact_ids=[contact_id])
+        else:
+            GivingTotalsRefresher.mark_dirty(contact_ids=[contact_id])
+
+    @staticmethod
+    def apply_change(previous: Optional[dict], current: Optional[dict]):
+        """
+        Move the donor's counters from a transaction's previous values to its
+        current ones. Either side is None when the row did not exist.
+        """
+        counted_before = previous is not None and ContactGivingService.counts_toward_giving(previous)
+        counted_now = current is not None and ContactGivingService.counts_toward_giving(current)
+
+        if counted_before and counted_now:
+            if any(previous[field] != current[field]
+                   for field in ('contact_id', 'amount', 'transaction_date')):
+                GivingTotalsRefresher.mark_dirty(
+                    contact_ids=[previous['contact_id'], current['contact_id']]
+                )
+        elif counted_now:
+            ContactGivingService.add_donation(
+                current['contact_id'], current['amount'], current['transaction_date']
+            )
+        elif counted_before:
+            ContactGivingService.remove_donation(
+                previous['contact_id'], previous['amount'], previous['transaction_date']
+            )
+
+
+class CampaignTotalsService:
+    """
+    Incremental maintenance of Campaign totals and the campaign donor set.
+
+    ``total_raised`` moves by atomic ``F()`` increments and ``donor_count``
+    only changes when a contact joins or leaves the ``CampaignDonor`` set, so
+    neither needs a SUM or DISTINCT scan over the campaign's transactions.
+    """
+
+    @staticmethod
+    def counts_toward_campaign(values: dict) -> bool:
+        """Whether a transaction's values count toward its campaign"""
+        return values['status'] == 'completed' and values['campaign_id'] is not None
+
+    @staticmethod
+    def add_gift(campaign_id, contact_id, amount: Decimal):
+        """Add a completed gift to the campaign and its donor set"""
+        joined = 0
+        updated = CampaignDonor.objects.filter(
+            campaign_id=campaign_id,
+            contact_id=contact_id
+        ).update(
+            gift_count=F('gift_count') + 1,
+            total_amount=F('total_amount') + amount
+        )
+
+        if not updated:
+            try:
+                with db_transaction.atomic():
+                    CampaignDonor.objects.create(
+                        campaign_id=campaign_id,
+                        contact_id=contact_id,
+                        gift_count=1,
+                        total_amount=amount
+                    )
+                joined = 1
+            except IntegrityError:
+                # A concurrent gift created the membership first
+                CampaignDonor.objects.filter(
+                    campaign_id=campaign_id,
+                    contact_id=contact_id
+                ).update(
+                    gift_count=F('gift_count') + 1,
+                    total_amount=F('total_amount') + amount
+                )
+
+        Campaign.objects.filter(pk=campaign_id).update(
+            total_raised=F('total_raised') + amount,
+            donor_count=F('donor_count') + joined
+        )
+
+    @staticmethod
+    def remove_gift(campaign_id, contact_id, amount: Decimal):
+        """Withdraw a previously counted gift from the campaign and its donor set"""
+        updated = CampaignDonor.objects.filter(
+            campaign_id=campaign_id,
+            contact_id=contact_id
+        ).update(
+            gift_count=F('gift_count') - 1,
+            total_amount=F('total_amount') - amount
+        )
+
+        if not updated:
+            # The donor set has drifted from the transactions; rebuild it
+            GivingTotalsRefresher.mark_dirty(campaign_ids=[campaign_id])
+            return
+
+        left, _ = CampaignDonor.objects.filter(
+            campaign_id=campaign_id,
+            contact_id=contact_id,
+            gift_count__lte=0
+        ).delete()
+
+        Campaign.objects.filter(pk=campaign_id).update(
+            total_raised=F('total_raised') - amount,
+            donor_count=F('donor_count') - left
+        )
+
+    @staticmethod
+    def apply_change(previous: Optional[dict], current: Optional[dict]):
+        """Move campaign totals from a transaction's previous values to its current ones"""
+        counted_before = previous is not None and CampaignTotalsService.counts_toward_campaign(previous)
+        counted_now = current is not None and CampaignTotalsService.counts_toward_campaign(current)
+
+        if counted_before and counted_now and all(
+            previous[field] == current[field]
+            for field in ('campaign_id', 'contact_id', 'amount')
+        ):
+            return
+
+        if counted_before:
+            CampaignTotalsService.remove_gift(
+                previous['campaign_id'], previous['contact_id'], previous['amount']
+            )
+        if counted_now:
+            CampaignTotalsService.add_gift(
+                current['campaign_id'], current['contact_id'], current['amount']
+            )
+
+
+def _tracked_values(transaction, previous: Optional[dict] = None) -> dict:
+    return transaction.current_values(Transaction.GIVING_TRACKED_FIELDS, previous)
+
+
+def _is_complete(values: dict) -> bool:
+    return all(
+        values.get(field, DEFERRED) is not DEFERRED
+        for field in Transaction.GIVING_TRACKED_FIELDS
+    )
+
+
+def schedule_giving_refresh(transaction, previous: Optional[dict] = None, deleted: bool = False):
+    """
+    Helper function to update the aggregates a transaction contributes to.
+
+    ``previous`` holds the values loaded from the database before the save,
+    or None for a newly created transaction.
+    """
+    if deleted:
+        # A deleted row cannot load deferred fields, so prefer the snapshot
+        previous = previous or _tracked_values(transaction)
+        current = None
+    else:
+        current = _tracked_values(transaction, previous)
+
+    if previous is not None and not _is_complete(previous):
+        # Nothing reliable to diff against, so rebuild every record involved
+        known = {
+            field: previous.get(field)
+            for field in ('contact_id', 'campaign_id')
+            if previous.get(field, DEFERRED) is not DEFERRED
+        }
+        GivingTotalsRefresher.mark_dirty(
+            contact_ids=[known.get('contact_id'), transaction.contact_id],
+            campaign_ids=[known.get('campaign_id'), transaction.campaign_id]
+        )
+        return
+
+    ContactGivingService.apply_change(previous, current)
+    CampaignTotalsService.apply_change(previous, current)
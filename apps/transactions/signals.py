@@ -0,0 +1,23 @@
+"""
+Django signals withdrawing deleted transactions from contact and campaign
+totals, including queryset deletes and cascades that skip Transaction.delete
+"""
+
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from .models import Transaction
+from .services import schedule_giving_refresh
+
+
+@receiver(pre_delete, sender=Transaction)
+def load_deleted_transaction_values(sender, instance, **kwargs):
+    """Read fields deferred when the transaction was loaded while its row still exists"""
+    instance._previous_values()
+
+
+@receiver(post_delete, sender=Transaction)
+def withdraw_deleted_transaction(sender, instance, **kwargs):
+    """Remove a deleted transaction from its donor's and campaign's totals"""
+    previous = getattr(instance, '_loaded_values', None)
+    schedule_giving_refresh(instance, previous, deleted=True)
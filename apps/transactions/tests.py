@@ -0,0 +1,276 @@
+"""
+Tests for the incrementally maintained giving totals
+
+Contact and Campaign totals move by deltas as transactions are saved and
+deleted; every test checks them against a rescan of the transactions.
+These tests need PostgreSQL, which Contact's ArrayField columns require.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.contacts.models import Contact
+from .models import Campaign, CampaignDonor, Transaction
+from .services import ContactGivingService
+
+requires_postgres = skipUnless(connection.vendor == 'postgresql', 'Needs PostgreSQL for ArrayField columns')
+
+
+def aware(year, month, day):
+    return timezone.make_aware(datetime(year, month, day, 12))
+
+
+class GivingTotalsTestCase(TestCase):
+    """Fixtures and a rescan to compare the maintained totals with"""
+
+    def setUp(self):
+        self.contact = Contact.objects.create(first_name='Ada', last_name='Donor', email='ada@example.com')
+        self.other = Contact.objects.create(first_name='Bo', last_name='Donor', email='bo@example.com')
+        self.campaign = Campaign.objects.create(name='Spring Appeal', start_date=aware(2024, 1, 1).date())
+
+    def give(self, contact, amount, when, campaign=None, status='completed', type='donation'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Transaction.objects.create(
+                contact=contact,
+                type=type,
+                amount=Decimal(amount),
+                status=status,
+                payment_method='credit_card',
+                campaign=campaign,
+                transaction_date=when
+            )
+
+    def assertTotalsMatchTransactions(self):
+        for contact in Contact.objects.all():
+            gifts = Transaction.objects.filter(contact=contact, type='donation', status='completed')
+            dates = [gift.transaction_date.date() for gift in gifts]
+            with self.subTest(contact=contact.email):
+                self.assertEqual(contact.total_lifetime_giving, sum((gift.amount for gift in gifts), Decimal('0.00')))
+                self.assertEqual(contact.donation_count, len(dates))
+                self.assertEqual(contact.last_donation_date, max(dates, default=None))
+
+        for campaign in Campaign.objects.all():
+            gifts = Transaction.objects.filter(campaign=campaign, status='completed')
+            donors = {}
+            for gift in gifts:
+                count, total = donors.get(gift.contact_id, (0, Decimal('0.00')))
+                donors[gift.contact_id] = (count + 1, total + gift.amount)
+            members = {
+                member.contact_id: (member.gift_count, member.total_amount)
+                for member in CampaignDonor.objects.filter(campaign=campaign)
+            }
+            with self.subTest(campaign=campaign.name):
+                self.assertEqual(campaign.total_raised, sum((gift.amount for gift in gifts), Decimal('0.00')))
+                self.assertEqual(campaign.donor_count, len(donors))
+                self.assertEqual(members, donors)
+
+
+@requires_postgres
+class GivingTotalsRefresherTest(GivingTotalsTestCase):
+    """The coalesced rescan run once per commit"""
+
+    def test_refund_of_only_gift_clears_donor(self):
+        gift = self.give(self.contact, '50.00', aware(2024, 2, 1))
+
+        gift.status = 'refunded'
+        with self.captureOnCommitCallbacks(execute=True):
+            gift.save()
+
+        self.contact.refresh_from_db()
+        self.assertIsNone(self.contact.last_donation_date)
+        self.assertEqual(self.contact.rfm_score, '111')
+        self.assertTotalsMatchTransactions()
+
+    def test_batch_refreshes_each_record_once(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            for day in range(1, 11):
+                Transaction.objects.create(
+                    contact=self.contact,
+                    type='donation',
+                    amount=Decimal('10.00'),
+                    status='completed',
+                    payment_method='credit_card',
+                    campaign=self.campaign,
+                    transaction_date=aware(2024, 2, day)
+                )
+
+        giving_flushes = [
+            callback for callback in callbacks
+            if getattr(callback, '__qualname__', '') == '_PendingRefresh.flush'
+        ]
+        self.assertEqual(len(giving_flushes), 1)
+        for callback in callbacks:
+            callback()
+        self.assertTotalsMatchTransactions()
+
+
+@requires_postgres
+class TransactionDeleteTest(GivingTotalsTestCase):
+    """Deleted transactions leave the totals, however they are deleted"""
+
+    def setUp(self):
+        super().setUp()
+        self.first = self.give(self.contact, '100.00', aware(2024, 2, 1), self.campaign)
+        self.latest = self.give(self.contact, '40.00', aware(2024, 3, 1), self.campaign)
+        self.give(self.other, '25.00', aware(2024, 2, 15), self.campaign)
+
+    def test_instance_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.latest.delete()
+
+        self.assertTotalsMatchTransactions()
+
+    def test_queryset_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.filter(contact=self.contact).delete()
+
+        self.assertTotalsMatchTransactions()
+        self.assertFalse(CampaignDonor.objects.filter(contact=self.contact).exists())
+
+    def test_delete_of_deferred_instance(self):
+        transaction = Transaction.objects.only('id').get(pk=self.first.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction.delete()
+
+        self.assertTotalsMatchTransactions()
+
+    def test_contact_cascade(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.contact.delete()
+
+        self.assertTotalsMatchTransactions()
+
+
+@requires_postgres
+class DeferredSaveTest(GivingTotalsTestCase):
+    """Saving a transaction loaded with only() applies deltas without reloading it"""
+
+    def test_completing_deferred_transaction(self):
+        gift = self.give(self.contact, '75.00', aware(2024, 4, 1), self.campaign, status='pending')
+        transaction = Transaction.objects.only('id', 'status').get(pk=gift.pk)
+
+        transaction.status = 'completed'
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction.save()
+
+        self.assertTrue({'notes', 'internal_notes', 'processor_fee'} <= transaction.get_deferred_fields())
+        self.assertEqual(transaction._loaded_values['status'], 'completed')
+        self.assertEqual(transaction._loaded_values['amount'], Decimal('75.00'))
+        self.assertTotalsMatchTransactions()
+
+        transaction.status = 'refunded'
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction.save()
+
+        self.assertTotalsMatchTransactions()
+
+
+@requires_postgres
+class GivingDeltaTest(GivingTotalsTestCase):
+    """Edits move the donor counters by deltas or fall back to a rescan"""
+
+    def edit(self, transaction, **changes):
+        for field, value in changes.items():
+            setattr(transaction, field, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction.save()
+
+    def test_new_gift_is_a_single_update(self):
+        self.give(self.contact, '10.00', aware(2024, 2, 1))
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertNumQueries(1):
+                ContactGivingService.add_donation(self.contact.pk, Decimal('5.00'), aware(2024, 1, 1))
+
+        for callback in callbacks:
+            callback()
+        self.contact.refresh_from_db()
+        self.assertEqual(self.contact.total_lifetime_giving, Decimal('15.00'))
+        self.assertEqual(self.contact.last_donation_date, aware(2024, 2, 1).date())
+
+    def test_older_gift_keeps_last_donation_date(self):
+        self.give(self.contact, '10.00', aware(2024, 3, 1))
+        self.give(self.contact, '20.00', aware(2024, 1, 1))
+
+        self.assertTotalsMatchTransactions()
+
+    def test_edits_to_counted_gift(self):
+        gift = self.give(self.contact, '10.00', aware(2024, 3, 1))
+        self.give(self.contact, '20.00', aware(2024, 1, 1))
+
+        for changes in (
+            {'amount': Decimal('15.00')},
+            {'transaction_date': aware(2023, 12, 1)},
+            {'contact': self.other},
+            {'status': 'refunded'},
+            {'status': 'completed'},
+            {'type': 'membership'},
+        ):
+            with self.subTest(changes=changes):
+                self.edit(gift, **changes)
+                self.assertTotalsMatchTransactions()
+
+    def test_pending_gift_is_not_counted(self):
+        self.give(self.contact, '10.00', aware(2024, 3, 1), status='pending')
+
+        self.assertTotalsMatchTransactions()
+
+
+@requires_postgres
+class CampaignDonorSetTest(GivingTotalsTestCase):
+    """Campaign.donor_count follows CampaignDonor membership"""
+
+    def test_repeat_donor_is_counted_once(self):
+        self.give(self.contact, '10.00', aware(2024, 2, 1), self.campaign)
+        self.give(self.contact, '15.00', aware(2024, 2, 2), self.campaign)
+        self.give(self.other, '5.00', aware(2024, 2, 3), self.campaign)
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.donor_count, 2)
+        self.assertTotalsMatchTransactions()
+
+    def test_donor_leaves_with_last_gift(self):
+        first = self.give(self.contact, '10.00', aware(2024, 2, 1), self.campaign)
+        second = self.give(self.contact, '15.00', aware(2024, 2, 2), self.campaign)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(CampaignDonor.objects.filter(campaign=self.campaign, contact=self.contact).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(CampaignDonor.objects.filter(campaign=self.campaign).exists())
+        self.assertTotalsMatchTransactions()
+
+    def test_gift_moved_between_campaigns(self):
+        autumn = Campaign.objects.create(name='Autumn Appeal', start_date=aware(2024, 9, 1).date())
+        gift = self.give(self.contact, '10.00', aware(2024, 2, 1), self.campaign)
+
+        gift.campaign = autumn
+        with self.captureOnCommitCallbacks(execute=True):
+            gift.save()
+
+        self.assertTotalsMatchTransactions()
+
+    def test_any_completed_transaction_counts(self):
+        self.give(self.contact, '30.00', aware(2024, 2, 1), self.campaign, type='event_ticket')
+        self.give(self.other, '30.00', aware(2024, 2, 1), self.campaign, status='pending')
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.donor_count, 1)
+        self.assertTotalsMatchTransactions()
+
+    def test_drifted_donor_set_is_rebuilt(self):
+        gift = self.give(self.contact, '10.00', aware(2024, 2, 1), self.campaign)
+        CampaignDonor.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            gift.delete()
+
+        self.assertTotalsMatchTransactions()
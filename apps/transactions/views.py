@@ -0,0 +1,93 @@
+from datetime import date
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.utils import timezone
+from django.views.generic import TemplateView
+
+from apps.analytics.services import GivingReportService
+from .models import Transaction
+
+
+def _report_date(value, default):
+    """Parse a YYYY-MM-DD query parameter, falling back to the default"""
+    try:
+        return date.fromisoformat(value) if value else default
+    except ValueError:
+        return default
+
+
+class GivingReportView(LoginRequiredMixin, TemplateView):
+    """Giving totals for a date range, answered from the daily giving facts"""
+    template_name = 'transactions/giving_report.html'
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        today = timezone.localdate()
+        
+        start = _report_date(self.request.GET.get('start'), today.replace(month=1, day=1))
+        end = _report_date(self.request.GET.get('end'), today)
+        transaction_type = self.request.GET.get('type', 'donation') or None
+        
+        context.update({
+            'start': start,
+            'end': end,
+            'transaction_type': transaction_type,
+            'transaction_types': Transaction.TRANSACTION_TYPES,
+            'report': GivingReportService.giving_summary(start, end, transaction_type),
+        })
+        return context
+
+
+class CampaignReportView(LoginRequiredMixin, TemplateView):
+    """Completed giving per campaign, answered from the daily giving facts"""
+    template_name = 'transactions/campaign_report.html'
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        start = _report_date(self.request.GET.get('start'), None)
+        end = _report_date(self.request.GET.get('end'), None)
+        
+        context.update({
+            'start': start,
+            'end': end,
+            'campaigns': GivingReportService.campaign_summary(start, end),
+        })
+        return context
+
+
+class HouseholdReportView(LoginRequiredMixin, TemplateView):
+    """Completed donations per household, answered from the daily giving facts"""
+    template_name = 'transactions/household_report.html'
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        start = _report_date(self.request.GET.get('start'), None)
+        end = _report_date(self.request.GET.get('end'), None)
+        
+        context.update({
+            'start': start,
+            'end': end,
+            'households': GivingReportService.household_summary(start, end),
+        })
+        return context
+
+
+class DonorRetentionReportView(LoginRequiredMixin, TemplateView):
+    """Year-over-year donor retention, answered from the daily giving facts"""
+    template_name = 'transactions/retention_report.html'
+    DEFAULT_YEARS = 5
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        current_year = timezone.localdate().year
+        
+        try:
+            years = max(1, int(self.request.GET.get('years', self.DEFAULT_YEARS)))
+        except ValueError:
+            years = self.DEFAULT_YEARS
+        
+        context.update({
+            'years': years,
+            'retention': GivingReportService.retention_by_year(current_year - years + 1, current_year),
+        })
+        return context
@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 from decouple import config
 import dj_database_url
+from celery.schedules import crontab
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -22,6 +23,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -227,6 +229,48 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Cache: Redis when CACHE_URL is set so every process shares it, otherwise
+# the per-process memory cache
+CACHE_URL = config('CACHE_URL', default='')
+CACHES = {
+    'default': {
+        'BACKEND': config(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.redis.RedisCache' if CACHE_URL
+            else 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': CACHE_URL,
+    }
+}
+
+# Periodic tasks (run by celery beat)
+CELERY_BEAT_SCHEDULE = {
+    'refresh-rfm-recency-nightly': {
+        'task': 'apps.contacts.tasks.refresh_rfm_recency',
+        'schedule': crontab(hour=2, minute=0),
+    },
+    'update-rfm-scores-weekly': {
+        'task': 'apps.contacts.tasks.update_rfm_scores',
+        'schedule': crontab(hour=3, minute=0, day_of_week='sunday'),
+    },
+    'compute-dashboard-metrics': {
+        'task': 'apps.analytics.tasks.compute_dashboard_metrics',
+        'schedule': crontab(minute='*/15'),
+    },
+    'calibrate-rfm-thresholds-monthly': {
+        'task': 'apps.contacts.tasks.calibrate_rfm_thresholds',
+        'schedule': crontab(hour=1, minute=0, day_of_month=1),
+    },
+    'rebuild-households-nightly': {
+        'task': 'apps.contacts.tasks.rebuild_households',
+        'schedule': crontab(hour=2, minute=30),
+    },
+    'find-duplicate-contacts-weekly': {
+        'task': 'apps.contacts.tasks.find_duplicate_contacts',
+        'schedule': crontab(hour=4, minute=0, day_of_week='saturday'),
+    },
+}
+
 # Email Configuration
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')